@@ -23,6 +23,7 @@ try:
     from utils.audio import AudioProcessor
     from utils.gamification import GamificationManager
     from utils.social_cards import SocialCardGenerator
+    from utils.request_loader import begin_request
     from pages import submission, community, admin, profile, analytics
 except ImportError as e:
     st.error(f"Import error: {e}")
@@ -156,6 +157,9 @@ def main():
     # Initialize session state
     init_session_state()
     
+    # Share database reads across everything rendered in this run
+    begin_request()
+    
     # Load custom CSS
     load_custom_css()
     
@@ -11,6 +11,8 @@ from typing import Dict, List, Any
 
 from utils.config import Config
 from utils.database import DatabaseManager
+from utils.sheet_frame import SUBMISSION_DTYPES, apply_dtypes
+from utils.services import get_database_manager, get_registry
 
 def show_admin_page():
     """Display the admin dashboard"""
@@ -25,7 +27,7 @@ def show_admin_page():
     
     # Initialize services
     config = Config()
-    db_manager = DatabaseManager()
+    db_manager = get_database_manager()
     
     # Create tabs for different admin functions
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "📝 Submissions", "👥 Users", "⚙️ Settings"])
@@ -142,6 +144,217 @@ def show_admin_overview(config: Config, db_manager: DatabaseManager):
     )
     fig.update_xaxis(tickangle=45)
     st.plotly_chart(fig, use_container_width=True)
+    
+    # Submissions cache health
+    with st.expander("🗄️ Data Cache"):
+        cache_stats = db_manager.get_cache_stats()
+        
+        if cache_stats:
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("Cached Rows", cache_stats.get("rows_cached", 0))
+            
+            with col2:
+                staleness = cache_stats.get("staleness_seconds")
+                st.metric("Staleness", f"{staleness:.0f}s" if staleness is not None else "n/a")
+            
+            with col3:
+                st.metric("Last Refresh", f"{cache_stats.get('last_refresh_seconds', 0.0) * 1000:.0f} ms")
+            
+            with col4:
+                st.metric("Rows Fetched", cache_stats.get("rows_fetched", 0))
+            
+            st.caption(
+                f"{cache_stats.get('full_loads', 0)} full loads, "
+                f"{cache_stats.get('incremental_loads', 0)} incremental refreshes, "
+                f"{cache_stats.get('stored_loads', 0)} starts from the local copy"
+                + (
+                    f" ({cache_stats['store'].get('file_bytes', 0) / 1e6:.1f} MB, "
+                    f"read in {cache_stats['store'].get('last_load_seconds', 0.0) * 1000:.0f} ms)"
+                    if cache_stats.get("store") else ""
+                )
+            )
+            
+            shard_stats = db_manager.get_shard_stats()
+            if shard_stats:
+                st.caption(
+                    f"Submission shards: {', '.join(shard_stats['shards'])} — "
+                    f"{shard_stats.get('closed_rows', 0)} rows in closed shards, "
+                    f"{shard_stats.get('open_rows') or 0} in the newest"
+                )
+            
+            like_stats = db_manager.get_like_buffer_stats()
+            if like_stats:
+                st.caption(
+                    f"Like buffer: {like_stats.get('pending_events', 0)} pending, "
+                    f"last flush {like_stats.get('last_flush_events', 0)} events in "
+                    f"{like_stats.get('last_flush_seconds', 0.0) * 1000:.0f} ms, "
+                    f"{like_stats.get('failed_flushes', 0)} failed flushes"
+                )
+            
+            user_stats_sync = db_manager.get_user_stats_sync_stats()
+            if user_stats_sync:
+                st.caption(
+                    f"User stats: {user_stats_sync.get('dirty_users', 0)} users waiting to be saved, "
+                    f"{user_stats_sync.get('persists', 0)} saves, {user_stats_sync.get('failed_persists', 0)} failed"
+                    + (f" — last error: {user_stats_sync['last_error']}" if user_stats_sync.get("last_error") else "")
+                )
+        else:
+            st.info("Google Sheets is not configured, so no data is cached.")
+        
+        mirror_stats = db_manager.get_mirror_stats()
+        if mirror_stats:
+            st.caption(
+                f"Airtable mirror: {mirror_stats.get('queue_depth', 0)} queued, "
+                f"{mirror_stats.get('records_mirrored', 0)} mirrored, "
+                f"{mirror_stats.get('failed_records', 0)} failed"
+            )
+            
+            last_check = db_manager.get_reconcile_stats().get("last_run", {})
+            if last_check:
+                st.caption(
+                    f"Last Sheets/Airtable check: {len(last_check['missing_in_airtable'])} missing, "
+                    f"{len(last_check['different'])} different, {len(last_check['extra_in_airtable'])} only in Airtable "
+                    f"({last_check['airtable_records_fetched']} records fetched)"
+                )
+            
+            if st.button("🔁 Reconcile with Airtable"):
+                with st.spinner("Comparing Sheets and Airtable..."):
+                    report = db_manager.reconcile_airtable()
+                if report:
+                    st.success(
+                        f"Checked {report['sheets_records']} submissions: {report['ranges_mismatched']} of "
+                        f"{report['nodes_compared']} compared ranges differed, {report['repaired']} records re-sent to Airtable"
+                    )
+                    if report["extra_in_airtable"]:
+                        st.warning(
+                            f"{len(report['extra_in_airtable'])} submissions are only in Airtable: "
+                            + ", ".join(report["extra_in_airtable"][:10])
+                        )
+        
+        read_stats = db_manager.get_read_stats()
+        if read_stats:
+            sheets_health = read_stats.get("primary", {})
+            st.caption(
+                f"Reads: {read_stats.get('primary_reads', 0)} from Sheets, "
+                f"{read_stats.get('fallback_reads', 0)} from Airtable, "
+                f"{read_stats.get('failovers', 0)} failovers; Sheets "
+                f"{'healthy' if sheets_health.get('healthy', True) else 'unhealthy'} "
+                f"({sheets_health.get('error_rate', 0.0):.0%} errors, "
+                f"{sheets_health.get('latency', 0.0) * 1000:.0f} ms mean)"
+            )
+        
+        journal_stats = db_manager.get_journal_stats()
+        if journal_stats:
+            oldest = journal_stats.get("oldest_pending_seconds")
+            st.caption(
+                f"Submission journal: {journal_stats.get('pending', 0)} waiting"
+                + (f" (oldest {oldest:.0f}s)" if oldest is not None else "")
+                + f", {journal_stats.get('replayed', 0)} replayed in {journal_stats.get('batches', 0)} batches, "
+                f"{journal_stats.get('failed_batches', 0)} failed batches, "
+                f"{journal_stats.get('dead_letters', 0)} dead letters"
+                + (f" — last error: {journal_stats['last_error']}" if journal_stats.get("last_error") else "")
+            )
+        
+        compaction_stats = db_manager.get_compaction_stats()
+        if compaction_stats:
+            last_run = compaction_stats.get("last_run", {})
+            st.caption(
+                f"Interactions: {last_run.get('rows_remaining', 'n/a')} raw rows kept, "
+                f"{compaction_stats.get('rows_compacted', 0)} compacted into rollups, "
+                f"{compaction_stats.get('cells_reclaimed', 0):,} cells reclaimed"
+                + (f", {last_run['cell_limit_used']:.2%} of the cell limit in use" if last_run else "")
+                + (f" — last error: {compaction_stats['last_error']}" if compaction_stats.get("last_error") else "")
+            )
+            
+            if st.button("🗜️ Compact Interactions Now", disabled=compaction_stats.get("running", False)):
+                with st.spinner("Compacting interactions..."):
+                    report = db_manager.compact_interactions()
+                if report.get("skipped"):
+                    st.info(f"Compaction skipped: {report['skipped']}")
+                elif report:
+                    st.success(
+                        f"Compacted {report['rows_compacted']} interactions before {report['cutoff_day']} "
+                        f"into {report['rollup_rows_written']} rollup rows, reclaiming {report['cells_reclaimed']:,} cells"
+                    )
+                    if report["rows_not_deleted"]:
+                        st.warning(
+                            f"{report['rows_not_deleted']} rolled-up interactions were not deleted because "
+                            "the sheet changed during the run; the next run deletes them"
+                        )
+        
+        previous_run = db_manager.get_request_stats().get("previous", {})
+        if previous_run.get("calls"):
+            st.caption("Database reads in the previous page render (calls → fetches):")
+            st.dataframe(pd.DataFrame({
+                "calls": previous_run["calls"],
+                "fetches": previous_run.get("fetches", {})
+            }).fillna(0).astype(int))
+    
+    # Outbound API quota usage
+    with st.expander("📶 API Quotas"):
+        quota_stats = db_manager.get_quota_stats()
+        
+        if not quota_stats:
+            st.info("No Google Sheets or Airtable requests have been made yet.")
+        
+        for name, stats in quota_stats.items():
+            st.markdown(f"**{name}**")
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric(
+                    "Last Minute",
+                    f"{stats['requests_last_minute']} / {stats['quota_per_minute']:.0f}",
+                    f"{stats['quota_used']:.0%} of quota",
+                    delta_color="off"
+                )
+            
+            with col2:
+                average_wait = stats["wait_seconds"] / stats["requests"] if stats["requests"] else 0.0
+                st.metric("Avg Wait", f"{average_wait * 1000:.0f} ms")
+            
+            with col3:
+                st.metric("Throttled (429)", stats["throttled"])
+            
+            with col4:
+                st.metric("Retries", stats["retries"])
+            
+            lanes = ", ".join(f"{lane_name} {count}" for lane_name, count in stats["lanes"].items())
+            st.caption(
+                f"{stats['requests']} requests ({lanes}), {stats['queued']} queued, "
+                f"{stats['server_errors']} server errors, {stats['failures']} gave up"
+            )
+    
+    # Shared services
+    with st.expander("🩺 Services"):
+        registry = get_registry()
+        
+        for name, status in registry.health().items():
+            col1, col2, col3 = st.columns([2, 4, 1])
+            
+            with col1:
+                icon = "⚪" if status["healthy"] is None else ("🟢" if status["healthy"] else "🔴")
+                st.markdown(f"{icon} **{name}**")
+            
+            with col2:
+                init_seconds = status["init_seconds"]
+                st.caption(status["detail"] + (f" (loaded in {init_seconds:.1f}s)" if init_seconds is not None else ""))
+            
+            with col3:
+                if status["initialized"] and st.button("Reload", key=f"reload_service_{name}"):
+                    registry.reload(name)
+                    st.rerun()
+        
+        dead_letters = db_manager.get_journal_dead_letters()
+        if dead_letters:
+            st.markdown(f"🔴 **Submission journal: {len(dead_letters)} dead letters**")
+            st.caption("Submissions that failed to replay too many times; later submissions kept replaying.")
+            st.dataframe(pd.DataFrame(dead_letters), use_container_width=True)
+            if st.button("🔁 Requeue dead letters", key="requeue_dead_letters"):
+                requeued = db_manager.requeue_journal_dead_letters()
+                st.success(f"Requeued {requeued} submissions for replay")
 
 def show_submissions_management(config: Config, db_manager: DatabaseManager):
     """Show submissions management interface"""
@@ -172,14 +385,11 @@ def show_submissions_management(config: Config, db_manager: DatabaseManager):
     search_query = st.text_input("🔍 Search submissions...", placeholder="Search by title, content, or user")
     
     # Get submissions
-    submissions = get_admin_submissions(db_manager, status_filter, language_filter, date_filter, search_query)
+    df = get_admin_submissions(db_manager, status_filter, language_filter, date_filter, search_query)
     
     # Display submissions table
-    if submissions:
-        st.markdown(f"**Found {len(submissions)} submissions**")
-        
-        # Create DataFrame for display
-        df = pd.DataFrame(submissions)
+    if not df.empty:
+        st.markdown(f"**Found {len(df)} submissions**")
         
         # Select columns to display
         display_columns = ["title", "language", "category", "content_type", "likes", "featured", "timestamp"]
@@ -190,7 +400,7 @@ def show_submissions_management(config: Config, db_manager: DatabaseManager):
             
             # Format timestamp
             if "timestamp" in display_df.columns:
-                display_df["timestamp"] = pd.to_datetime(display_df["timestamp"]).dt.strftime("%Y-%m-%d %H:%M")
+                display_df["timestamp"] = display_df["timestamp"].dt.strftime("%Y-%m-%d %H:%M")
             
             # Display with selection
             selected_rows = st.dataframe(
@@ -326,8 +536,46 @@ def show_admin_settings(config: Config):
             st.success("User data exported!")
 
 def get_admin_submissions(db_manager: DatabaseManager, status_filter: str, 
-                         language_filter: str, date_filter: str, search_query: str) -> List[Dict[str, Any]]:
-    """Get submissions for admin view with filters"""
+                         language_filter: str, date_filter: str, search_query: str) -> pd.DataFrame:
+    """Get submissions for admin view with filters, applied column-wise to a typed DataFrame"""
+    
+    start = None
+    if date_filter != "All Time":
+        now = pd.Timestamp.now(tz="UTC")
+        start = {
+            "Today": now.normalize(),
+            "This Week": now.normalize() - pd.Timedelta(days=now.weekday()),
+            "This Month": now.normalize().replace(day=1)
+        }[date_filter]
+    
+    # Date filters only scan the submission shards that cover the range
+    df = db_manager.get_submissions_frame(since=start)
+    if df.empty and db_manager.get_submissions_frame().empty:
+        df = apply_dtypes(pd.DataFrame(get_mock_admin_submissions()), SUBMISSION_DTYPES)
+    
+    mask = pd.Series(True, index=df.index)
+    
+    if status_filter == "Featured":
+        mask &= df["featured"]
+    elif status_filter == "Pending Review":
+        mask &= ~df["featured"] & (df["likes"] < 10)
+    
+    if language_filter != "All":
+        mask &= df["language"] == language_filter
+    
+    if start is not None:
+        mask &= df["timestamp"] >= start
+    
+    if search_query:
+        mask &= (
+            df["title"].astype(str).str.contains(search_query, case=False, regex=False)
+            | df["content"].astype(str).str.contains(search_query, case=False, regex=False)
+        )
+    
+    return df[mask]
+
+def get_mock_admin_submissions() -> List[Dict[str, Any]]:
+    """Get mock submissions for the admin demo"""
     
     # Mock data for demo
     mock_submissions = [
@@ -369,22 +617,4 @@ def get_admin_submissions(db_manager: DatabaseManager, status_filter: str,
         }
     ]
     
-    # Apply filters (simplified for demo)
-    filtered_submissions = mock_submissions
-    
-    if status_filter == "Featured":
-        filtered_submissions = [s for s in filtered_submissions if s.get("featured")]
-    elif status_filter == "Pending Review":
-        filtered_submissions = [s for s in filtered_submissions if not s.get("featured") and s.get("likes", 0) < 10]
-    
-    if language_filter != "All":
-        filtered_submissions = [s for s in filtered_submissions if s.get("language") == language_filter]
-    
-    if search_query:
-        search_lower = search_query.lower()
-        filtered_submissions = [
-            s for s in filtered_submissions 
-            if search_lower in s.get("title", "").lower() or search_lower in s.get("content", "").lower()
-        ]
-    
-    return filtered_submissions
+    return mock_submissions
@@ -11,6 +11,7 @@ from typing import Dict, List, Any
 
 from utils.config import Config
 from utils.database import DatabaseManager
+from utils.services import get_database_manager
 
 def show_analytics_page():
     """Display the analytics dashboard"""
@@ -19,7 +20,7 @@ def show_analytics_page():
     
     # Initialize services
     config = Config()
-    db_manager = DatabaseManager()
+    db_manager = get_database_manager()
     
     # Create tabs for different analytics views
     tab1, tab2, tab3, tab4 = st.tabs(["📈 Overview", "🌍 Languages", "🏷️ Categories", "👥 Community"])
@@ -8,8 +8,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
 from utils.config import Config
+from utils.backends.base import SUBMISSION_LIST_FIELDS
 from utils.database import DatabaseManager
 from utils.social_cards import SocialCardGenerator
+from utils.services import get_database_manager, get_social_card_generator
 
 def show_community_page():
     """Display the community page with story feed and interactions"""
@@ -18,8 +20,8 @@ def show_community_page():
     
     # Initialize services
     config = Config()
-    db_manager = DatabaseManager()
-    card_generator = SocialCardGenerator()
+    db_manager = get_database_manager()
+    card_generator = get_social_card_generator()
     
     # Create tabs for different views
     tab1, tab2, tab3 = st.tabs(["🌟 Featured", "🔥 Recent", "🔍 Search"])
@@ -40,7 +42,8 @@ def show_featured_stories(config: Config, db_manager: DatabaseManager, card_gene
     # Get featured stories
     featured_stories = db_manager.get_submissions(
         filters={"featured": True},
-        limit=10
+        limit=10,
+        fields=SUBMISSION_LIST_FIELDS
     )
     
     if not featured_stories:
@@ -50,6 +53,8 @@ def show_featured_stories(config: Config, db_manager: DatabaseManager, card_gene
     # Display featured story of the day
     if featured_stories:
         story_of_day = featured_stories[0]
+        if "content" not in story_of_day:
+            story_of_day = db_manager.get_submission(story_of_day.get("id", "")) or story_of_day
         display_featured_story_card(story_of_day, card_generator)
     
     # Display other featured stories
@@ -98,10 +103,22 @@ def show_recent_stories(config: Config, db_manager: DatabaseManager, card_genera
     if content_type_filter != "All Types":
         filters["content_type"] = content_type_filter
     
+    # Page with (timestamp, id) cursors; start over when the filters change
+    page_size = 20
+    if st.session_state.get("recent_filters") != filters:
+        st.session_state.recent_filters = filters
+        st.session_state.recent_cursors = []
+    cursors = st.session_state.recent_cursors
+    
     # Get recent stories
-    recent_stories = db_manager.get_submissions(filters=filters, limit=20)
+    recent_stories = db_manager.get_submissions(
+        filters=filters,
+        limit=page_size,
+        after=cursors[-1] if cursors else None,
+        fields=SUBMISSION_LIST_FIELDS
+    )
     
-    if not recent_stories:
+    if not recent_stories and not cursors:
         # Show mock recent stories for demo
         recent_stories = get_mock_recent_stories()
     
@@ -111,6 +128,21 @@ def show_recent_stories(config: Config, db_manager: DatabaseManager, card_genera
             display_story_card(story, db_manager, card_generator)
     else:
         st.info("No stories found matching your filters.")
+    
+    # Pagination
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if cursors and st.button("← Newer Stories", key="recent_newer"):
+            cursors.pop()
+            st.rerun()
+    
+    with col2:
+        last_story = recent_stories[-1] if recent_stories else {}
+        if len(recent_stories) == page_size and last_story.get("id"):
+            if st.button("Older Stories →", key="recent_older"):
+                cursors.append((last_story.get("timestamp", ""), last_story["id"]))
+                st.rerun()
 
 def show_search_interface(config: Config, db_manager: DatabaseManager, card_generator: SocialCardGenerator):
     """Show search interface"""
@@ -190,6 +222,12 @@ def display_story_card(story: Dict[str, Any], db_manager: Optional[DatabaseManag
     # Create card container
     card_style = "featured-story" if featured else "submission-card"
     
+    # List views load a preview; fetch the full text once the card is expanded
+    expanded_stories = st.session_state.setdefault("expanded_stories", set())
+    if "content" not in story and db_manager and story.get("id") in expanded_stories:
+        story = db_manager.get_submission(story["id"]) or story
+        expanded = True
+    
     with st.container():
         # Story header
         col1, col2, col3 = st.columns([3, 1, 1])
@@ -207,18 +245,26 @@ def display_story_card(story: Dict[str, Any], db_manager: Optional[DatabaseManag
         
         with col3:
             if st.button("📤 Share", key=f"share_{story.get('id', 'unknown')}"):
+                if "content" not in story and db_manager:
+                    story = db_manager.get_submission(story.get("id", "")) or story
                 show_share_options(story, card_generator)
         
         # Story content
-        content = story.get("content", "")
+        content = story.get("content", story.get("content_preview", ""))
+        content_length = story.get("content_length", len(content))
         if highlight_query and highlight_query.lower() in content.lower():
             content = content.replace(highlight_query, f"**{highlight_query}**")
         
-        if len(content) > 300 and not expanded:
+        if content_length > 300 and not expanded:
             content = content[:297] + "..."
         
         st.markdown(f"*{content}*")
         
+        if "content" not in story and db_manager:
+            if st.button("📖 Read full story", key=f"expand_{story.get('id', 'unknown')}"):
+                expanded_stories.add(story.get("id"))
+                st.rerun()
+        
         # Translation (if available)
         translation = story.get("english_translation", "")
         if translation and translation != content:
@@ -269,12 +315,10 @@ def handle_like_story(story: Dict[str, Any], db_manager: Optional[DatabaseManage
         story_id = story.get("id", "")
         user_id = st.session_state.get("user_id", f"anon_{hash(st.session_state.get('session_id', 'unknown'))}")
         
-        # Update likes in database
-        success = db_manager.update_submission_likes(story_id, 1)
+        # Queue the like and its interaction for the next batched write
+        success = db_manager.queue_like(story_id, user_id, 1)
         
         if success:
-            # Save interaction
-            db_manager.save_user_interaction(user_id, story_id, "like")
             st.success("❤️ Story liked!")
             st.rerun()
         else:
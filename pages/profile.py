@@ -11,6 +11,7 @@ from typing import Dict, List, Any
 from utils.config import Config
 from utils.database import DatabaseManager
 from utils.gamification import GamificationManager
+from utils.services import get_database_manager, get_gamification_manager
 
 def show_profile_page():
     """Display user profile page"""
@@ -18,8 +19,8 @@ def show_profile_page():
     
     # Initialize services
     config = Config()
-    db_manager = DatabaseManager()
-    gamification = GamificationManager()
+    db_manager = get_database_manager()
+    gamification = get_gamification_manager()
     
     # Get or create user ID
     user_id = get_or_create_user_id()
@@ -15,6 +15,10 @@ from utils.database import DatabaseManager
 from utils.translation import TranslationService
 from utils.categorization import CategorizationService
 from utils.audio import AudioProcessor
+from utils.services import (
+    get_database_manager, get_translation_service,
+    get_categorization_service, get_audio_processor
+)
 
 def show_submission_page():
     """Display the story submission page"""
@@ -23,10 +27,10 @@ def show_submission_page():
     
     # Initialize services
     config = Config()
-    db_manager = DatabaseManager()
-    translation_service = TranslationService()
-    categorization_service = CategorizationService()
-    audio_processor = AudioProcessor()
+    db_manager = get_database_manager()
+    translation_service = get_translation_service()
+    categorization_service = get_categorization_service()
+    audio_processor = get_audio_processor()
     
     # Create tabs for different input methods
     tab1, tab2 = st.tabs(["✍️ Text Input", "🎤 Voice Input"])
@@ -113,6 +117,12 @@ def show_text_submission_form(config: Config, db_manager: DatabaseManager,
                 value=True,
                 help="AI will suggest a category for your story"
             )
+            
+            allow_duplicate = st.checkbox(
+                "Submit even if a similar story exists",
+                value=False,
+                help="Use this when your story is a different version of one already shared"
+            )
         
         # Translation preview section
         if auto_translate and content:
@@ -155,7 +165,7 @@ def show_text_submission_form(config: Config, db_manager: DatabaseManager,
             handle_text_submission(
                 title, content, cultural_context, content_type, language, dialect, location,
                 auto_translate, auto_categorize, config, db_manager, 
-                translation_service, categorization_service
+                translation_service, categorization_service, allow_duplicate
             )
 
 def show_voice_submission_form(config: Config, db_manager: DatabaseManager,
@@ -251,6 +261,12 @@ def show_voice_submission_form(config: Config, db_manager: DatabaseManager,
                         height=100
                     )
                 
+                allow_duplicate = st.checkbox(
+                    "Submit even if a similar story exists",
+                    value=False,
+                    help="Use this when your story is a different version of one already shared"
+                )
+                
                 # Submit voice recording
                 voice_submitted = st.form_submit_button(
                     "🚀 Submit Voice Story",
@@ -262,15 +278,33 @@ def show_voice_submission_form(config: Config, db_manager: DatabaseManager,
                     handle_voice_submission(
                         title, content, cultural_context, content_type, 
                         transcription_language, dialect, location,
-                        config, db_manager, translation_service, categorization_service
+                        config, db_manager, translation_service, categorization_service,
+                        allow_duplicate
                     )
 
+def show_duplicates(content: str, db_manager: DatabaseManager) -> bool:
+    """Warn about near-identical stories already shared; returns True if any were found"""
+    duplicates = db_manager.find_duplicates(content)
+    if not duplicates:
+        return False
+    
+    st.warning("🔁 This story looks very similar to one already in the collection.")
+    for duplicate in duplicates:
+        title = duplicate.get("title") or "A story awaiting sync"
+        language = f" · {duplicate['language']}" if duplicate.get("language") else ""
+        st.write(f"**{title}**{language} · {duplicate['similarity']:.0%} similar")
+        if duplicate.get("content_preview"):
+            st.caption(duplicate["content_preview"])
+    st.info("If yours is a different version, tick \"Submit even if a similar story exists\" and submit again.")
+    return True
+
 def handle_text_submission(title: str, content: str, cultural_context: str,
                           content_type: str, language: str, dialect: str, location: str,
                           auto_translate: bool, auto_categorize: bool,
                           config: Config, db_manager: DatabaseManager,
                           translation_service: TranslationService,
-                          categorization_service: CategorizationService):
+                          categorization_service: CategorizationService,
+                          allow_duplicate: bool = False):
     """Handle text submission processing"""
     
     # Validation
@@ -278,6 +312,10 @@ def handle_text_submission(title: str, content: str, cultural_context: str,
         st.error("Please fill in all required fields (marked with *)")
         return
     
+    # Checked before translation and categorization so repeats cost no model calls
+    if not allow_duplicate and show_duplicates(content, db_manager):
+        return
+    
     with st.spinner("Processing your submission..."):
         try:
             # Prepare submission data
@@ -322,6 +360,10 @@ def handle_text_submission(title: str, content: str, cultural_context: str,
             if submission_id:
                 st.success("🎉 Your story has been submitted successfully!")
                 st.balloons()
+                if db_manager.is_submission_dead_lettered(submission_id):
+                    st.warning("⚠️ Your story is saved on this server but could not be synced to the community feed. An admin can retry it from the dashboard.")
+                elif db_manager.is_submission_pending(submission_id):
+                    st.info("💾 Your story is saved and will appear in the community feed once it syncs.")
                 
                 # Show submission summary
                 with st.expander("📋 Submission Summary", expanded=True):
@@ -350,7 +392,8 @@ def handle_voice_submission(title: str, content: str, cultural_context: str,
                            content_type: str, language: str, dialect: str, location: str,
                            config: Config, db_manager: DatabaseManager,
                            translation_service: TranslationService,
-                           categorization_service: CategorizationService):
+                           categorization_service: CategorizationService,
+                           allow_duplicate: bool = False):
     """Handle voice submission processing"""
     
     # Similar to text submission but with audio metadata
@@ -358,6 +401,9 @@ def handle_voice_submission(title: str, content: str, cultural_context: str,
         st.error("Please fill in all required fields (marked with *)")
         return
     
+    if not allow_duplicate and show_duplicates(content, db_manager):
+        return
+    
     with st.spinner("Processing your voice submission..."):
         try:
             submission_data = {
@@ -395,6 +441,10 @@ def handle_voice_submission(title: str, content: str, cultural_context: str,
             if submission_id:
                 st.success("🎉 Your voice story has been submitted successfully!")
                 st.balloons()
+                if db_manager.is_submission_dead_lettered(submission_id):
+                    st.warning("⚠️ Your story is saved on this server but could not be synced to the community feed. An admin can retry it from the dashboard.")
+                elif db_manager.is_submission_pending(submission_id):
+                    st.info("💾 Your story is saved and will appear in the community feed once it syncs.")
                 
                 # Clear session state
                 if "recorded_audio" in st.session_state:
@@ -0,0 +1,28 @@
+-- Add story fields and interactions used by the Python app's PostgreSQL backend
+ALTER TABLE public.stories ADD COLUMN IF NOT EXISTS location TEXT;
+ALTER TABLE public.stories ADD COLUMN IF NOT EXISTS cultural_context TEXT;
+
+-- Allow every content type the app offers, so they read back as submitted
+ALTER TABLE public.stories DROP CONSTRAINT IF EXISTS stories_content_type_check;
+ALTER TABLE public.stories ADD CONSTRAINT stories_content_type_check
+  CHECK (content_type IN ('proverb', 'folk_tale', 'saying', 'story', 'poem', 'song', 'riddle', 'legend'));
+
+-- Create story_interactions table for shares and other non-like events
+CREATE TABLE IF NOT EXISTS public.story_interactions (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  story_id UUID NOT NULL REFERENCES public.stories(id) ON DELETE CASCADE,
+  interaction_type TEXT NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Enable RLS
+ALTER TABLE public.story_interactions ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policies
+CREATE POLICY "story_interactions_select_all" ON public.story_interactions FOR SELECT USING (true);
+CREATE POLICY "story_interactions_insert_own" ON public.story_interactions FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+-- Create indexes
+CREATE INDEX IF NOT EXISTS idx_story_interactions_story_id ON public.story_interactions(story_id);
+CREATE INDEX IF NOT EXISTS idx_story_interactions_created_at ON public.story_interactions(created_at DESC);
@@ -250,6 +250,535 @@ def test_social_cards():
         print(f"❌ Social card test failed: {e}")
         return False
 
+def test_record_memory():
+    """Benchmark bytes per cached submission: dict rows vs Submission"""
+    print("\n🧮 Testing submission record memory...")
+    
+    try:
+        from utils.backends.base import SUBMISSION_FIELDS
+        from utils.submission import Submission
+        
+        def row(i):
+            """A sheet row as get_all_values() returns it: a fresh string per cell"""
+            cells = [
+                f"{i:08d}-3f2a-4c1b-9d7e-5a6b7c8d9e0f", f"2024-11-{1 + i % 28:02d}T10:{i % 60:02d}:00+00:00",
+                f"anon_{i % 200:08x}", f"Story number {i}",
+                "जैसे नदियाँ समुद्र में मिलकर एक हो जाती हैं, वैसे ही अलग-अलग संस्कृतियाँ मिलकर मानवता बनाती हैं। " * 4,
+                "Saying", ["Hindi", "Bengali", "Tamil", "English"][i % 4], "",
+                "Just as rivers merge into the ocean to become one, different cultures unite to form humanity. " * 4,
+                False, ["Wisdom & Life Lessons", "Family & Community"][i % 2], True, "", i % 50, i % 10 == 0,
+                ["Varanasi", "Kolkata", ""][i % 3],
+                "Shared at family gatherings to teach that diversity strengthens a community rather than dividing it. " * 3
+            ]
+            return [cell.encode().decode() if isinstance(cell, str) else cell for cell in cells]
+        
+        def deep_size(objects):
+            """Bytes held by the objects and everything they reference, counting shared objects once"""
+            seen = set()
+            stack = list(objects)
+            total = 0
+            while stack:
+                obj = stack.pop()
+                if id(obj) in seen:
+                    continue
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+                if isinstance(obj, dict):
+                    stack.extend(obj.keys())
+                    stack.extend(obj.values())
+                elif isinstance(obj, (list, tuple)):
+                    stack.extend(obj)
+                elif hasattr(type(obj), "__slots__"):
+                    stack.extend(getattr(obj, slot) for slot in type(obj).__slots__ if hasattr(obj, slot))
+            return total
+        
+        count = 2000
+        dict_rows = [dict(zip(SUBMISSION_FIELDS, row(i))) for i in range(count)]
+        slot_rows = [Submission(zip(SUBMISSION_FIELDS, row(i))) for i in range(count)]
+        
+        dict_bytes = deep_size(dict_rows) / count
+        slot_bytes = deep_size(slot_rows) / count
+        print(f"✅ dict records: {dict_bytes:,.0f} bytes per record")
+        print(f"✅ Submission records: {slot_bytes:,.0f} bytes per record ({dict_bytes / slot_bytes:.1f}x smaller)")
+        
+        assert dict(slot_rows[7]) == dict_rows[7]
+        return slot_bytes < dict_bytes
+    
+    except Exception as e:
+        print(f"❌ Record memory test failed: {e}")
+        return False
+
+def test_record_serialisation():
+    """Test that submissions leave the cache as JSON-serialisable dicts"""
+    print("\n📦 Testing submission serialisation...")
+    
+    try:
+        import json
+        import pickle
+        from utils.aggregates import SubmissionAggregates
+        from utils.airtable_mirror import to_airtable_fields
+        from utils.submission import Submission
+        
+        record = Submission({
+            "id": "abc", "timestamp": "2024-11-02T10:00:00+00:00", "user_id": "anon_1",
+            "title": "Story", "content": "नदियाँ समुद्र में मिलती हैं। " * 20, "language": "Hindi",
+            "category": "Wisdom & Life Lessons", "likes": 3, "featured": False
+        })
+        
+        assert json.loads(json.dumps(dict(record))) == dict(record)
+        assert json.loads(json.dumps(to_airtable_fields(record)))["ID"] == "abc"
+        assert dict(pickle.loads(pickle.dumps(record))) == dict(record)
+        
+        aggregates = SubmissionAggregates()
+        aggregates.rebuild([record])
+        json.dumps(aggregates.get_analytics())
+        
+        print("✅ Submission records serialise through dict() boundaries")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Record serialisation test failed: {e}")
+        return False
+
+def test_sharded_cold_start():
+    """Test that a cold start from the stored snapshot reads only the open shard"""
+    print("\n❄️ Testing sharded cold start from the stored snapshot...")
+    
+    try:
+        import tempfile
+        from utils.sharded_worksheet import ROWS, ShardedWorksheet
+        from utils.sheet_snapshot import SheetSnapshot
+        from utils.snapshot_store import SnapshotStore
+    except ImportError as e:
+        print(f"⚠️  Skipped: {e} (optional)")
+        return True
+    
+    try:
+        headers = ["id", "timestamp", "title"]
+        
+        class Worksheet:
+            """In-memory worksheet recording the requests made to it"""
+            
+            def __init__(self, rows, sheet_id):
+                self.rows = [headers] + rows
+                self.id = sheet_id
+                self.spreadsheet_id = "sheet"
+                self.calls = []
+            
+            def get_all_values(self, **kwargs):
+                self.calls.append("get_all_values")
+                return [list(row) for row in self.rows]
+            
+            def get_values(self, range_name, **kwargs):
+                self.calls.append(f"get_values {range_name}")
+                first_row = int("".join(c for c in range_name.split(":")[0] if c.isdigit()))
+                return [list(row) for row in self.rows[first_row - 1:]]
+            
+            def batch_get(self, ranges, **kwargs):
+                self.calls.append("batch_get")
+                return [[[row[0]] for row in self.rows[1:]] for _ in ranges]
+        
+        class Worksheets:
+            """Stand-in for the worksheet cache ShardedWorksheet reads titles and headers from"""
+            
+            def __init__(self, sheets):
+                self.sheets = sheets
+                self.spreadsheet = None
+            
+            def get(self, title):
+                return self.sheets[title]
+            
+            def headers(self, title):
+                return headers
+            
+            def titles(self):
+                return list(self.sheets)
+            
+            def invalidate(self):
+                pass
+        
+        def rows(start, count):
+            return [[f"id{i}", f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}", f"Story {i}"] for i in range(start, start + count)]
+        
+        sheets = {
+            "submissions": Worksheet(rows(0, 50), 1),
+            "submissions_0002": Worksheet(rows(50, 50), 2),
+            "submissions_0003": Worksheet(rows(100, 10), 3)
+        }
+        path = os.path.join(tempfile.mkdtemp(), "snapshot.arrow")
+        
+        warm = SheetSnapshot(ShardedWorksheet(Worksheets(sheets), "submissions", ROWS, 50), store=SnapshotStore(path, "sheet/1"))
+        warm.get_records()
+        warm.store._thread.join()
+        
+        sheets["submissions_0003"].rows.extend(rows(110, 2))
+        for sheet in sheets.values():
+            sheet.calls.clear()
+        
+        cold = SheetSnapshot(ShardedWorksheet(Worksheets(sheets), "submissions", ROWS, 50), store=SnapshotStore(path, "sheet/1"))
+        records = cold.get_records()
+        
+        calls = {title: sheet.calls for title, sheet in sheets.items()}
+        print(f"✅ {len(records)} records; Sheets calls per shard: {calls}")
+        assert [record["id"] for record in records] == [f"id{i}" for i in range(112)]
+        assert cold.stats["stored_loads"] == 1
+        assert not calls["submissions"] and not calls["submissions_0002"]
+        assert calls["submissions_0003"] == ["get_values A11:C"]  # The last stored row, then the new ones
+        return True
+    
+    except Exception as e:
+        print(f"❌ Sharded cold start test failed: {e}")
+        return False
+
+def test_journal_outage():
+    """Test that a store outage dead-letters nothing and a bad entry is dead-lettered alone"""
+    print("\n📓 Testing submission journal through an outage...")
+    
+    try:
+        import tempfile
+        from utils.submission_journal import SubmissionJournal
+        
+        class StoreError(Exception):
+            """Error carrying an HTTP status like the store clients raise"""
+            
+            def __init__(self, code):
+                super().__init__(f"HTTP {code}")
+                self.code = code
+        
+        stored = []
+        outage = {"calls": 4}
+        
+        def replay(submissions):
+            if outage["calls"]:
+                outage["calls"] -= 1
+                raise StoreError(503)
+            for submission in submissions:
+                if submission["id"] == "bad":
+                    raise StoreError(400)
+                if submission["id"] == "flaky":
+                    raise StoreError(500)
+            stored.extend(submission["id"] for submission in submissions)
+        
+        def journal_with(ids):
+            path = os.path.join(tempfile.mkdtemp(), "journal.db")
+            journal = SubmissionJournal(path, replay, batch_size=3, max_backoff=0.01, max_attempts=2)
+            for submission_id in ids:
+                journal.append({"id": submission_id})
+            return journal
+        
+        journal = journal_with(["s1", "s2", "s3", "s4"])
+        assert journal.drain(10), "journal did not drain after the outage"
+        assert sorted(stored) == ["s1", "s2", "s3", "s4"] and not journal.dead_letters(), (stored, journal.dead_letters())
+        print(f"✅ Outage: {journal.stats['failed_batches']} failed batches, nothing dead-lettered")
+        
+        stored.clear()
+        journal = journal_with(["bad", "flaky", "s5", "s6"])
+        assert journal.drain(10), "journal did not drain past the bad entries"
+        dead = [entry["submission_id"] for entry in journal.dead_letters()]
+        assert stored == ["s5", "s6"] and dead == ["bad", "flaky"], (stored, dead)
+        assert journal.is_pending("bad") and journal.is_dead_lettered("bad") and not journal.is_pending("s5")
+        print(f"✅ Bad entries dead-lettered alone: {dead}")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Journal outage test failed: {e}")
+        return False
+
+def test_like_buffer_unindexed():
+    """Test that likes for a row missing from the index or moved survive the flush"""
+    print("\n❤️ Testing like flush for rows not in the index...")
+    
+    try:
+        from gspread.utils import a1_to_rowcol
+        from utils.like_buffer import LikeBuffer
+    except ImportError as e:
+        print(f"⚠️  Skipped: {e} (optional)")
+        return True
+    
+    try:
+        class Worksheet:
+            """In-memory submissions sheet with id and likes columns"""
+            
+            def __init__(self, rows):
+                self.rows = [["id", "likes"]] + rows
+            
+            def batch_get(self, ranges, **kwargs):
+                values = []
+                for cell in ranges:
+                    row, col = a1_to_rowcol(cell)
+                    values.append([[self.rows[row - 1][col - 1]]] if row <= len(self.rows) else [])
+                return values
+            
+            def batch_update(self, data, **kwargs):
+                for update in data:
+                    row, col = a1_to_rowcol(update["range"])
+                    self.rows[row - 1][col - 1] = str(update["values"][0][0])
+            
+            def append_rows(self, rows, **kwargs):
+                pass
+        
+        class RowIndex:
+            """Row index built from the sheet on demand"""
+            
+            def __init__(self, ws):
+                self.ws = ws
+                self.rows = None
+            
+            def column(self, name):
+                return self.ws.rows[0].index(name) + 1
+            
+            def find_row(self, submission_id):
+                if self.rows is None:
+                    self.rows = {row[0]: number for number, row in enumerate(self.ws.rows[1:], start=2)}
+                return self.rows.get(submission_id)
+            
+            def invalidate(self):
+                self.rows = None
+        
+        ws = Worksheet([["s1", "5"]])
+        index = RowIndex(ws)
+        buffer = LikeBuffer(ws, ws, index)
+        
+        # The journal has not replayed s2 yet, so the index has no row for it
+        buffer.record("s1", 1)
+        buffer.record("s2", 2)
+        buffer.flush()
+        assert ws.rows[1] == ["s1", "6"] and buffer.outstanding() == {"s2": 2}, (ws.rows, buffer.outstanding())
+        
+        ws.rows.append(["s2", "0"])
+        index.invalidate()
+        buffer.flush()
+        assert ws.rows[2] == ["s2", "2"] and buffer.outstanding() == {}, (ws.rows, buffer.outstanding())
+        print("✅ Likes for an unindexed row kept and written once it appeared")
+        
+        # A row inserted above s1 moves it; the stale index points at the wrong row
+        ws.rows.insert(1, ["s0", "1"])
+        buffer.record("s1", 1)
+        buffer.flush()
+        assert buffer.outstanding() == {"s1": 1} and ws.rows[1] == ["s0", "1"], (ws.rows, buffer.outstanding())
+        buffer.flush()
+        assert ws.rows[2] == ["s1", "7"] and buffer.outstanding() == {}, (ws.rows, buffer.outstanding())
+        print("✅ Likes for a moved row re-resolved on the next flush")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Like buffer test failed: {e}")
+        return False
+
+def test_compaction_concurrent_change():
+    """Test that compaction skips the delete when the sheet changes after the read"""
+    print("\n🗜️ Testing interaction compaction against a changing sheet...")
+    
+    try:
+        from datetime import datetime, timezone
+        from gspread.utils import a1_to_rowcol
+        from utils.interaction_compactor import DAY, ROLLUP_HEADERS, InteractionCompactor
+    except ImportError as e:
+        print(f"⚠️  Skipped: {e} (optional)")
+        return True
+    
+    try:
+        class Worksheet:
+            """In-memory worksheet supporting the calls the compactor makes"""
+            
+            def __init__(self, rows):
+                self.rows = [list(row) for row in rows]
+                self.after_read = None
+            
+            def get_all_values(self, **kwargs):
+                values = [list(row) for row in self.rows]
+                if self.after_read:
+                    self.after_read()
+                    self.after_read = None
+                return values
+            
+            def get_values(self, range_name, **kwargs):
+                row, _ = a1_to_rowcol(range_name.split(":")[0])
+                return [list(self.rows[row - 1])] if row <= len(self.rows) else []
+            
+            def col_values(self, col, **kwargs):
+                return [row[col - 1] if col <= len(row) else "" for row in self.rows]
+            
+            def batch_get(self, ranges, **kwargs):
+                values = []
+                for cell in ranges:
+                    row, col = a1_to_rowcol(cell)
+                    values.append([[self.rows[row - 1][col - 1]]] if row <= len(self.rows) else [])
+                return values
+            
+            def batch_update(self, data, **kwargs):
+                for update in data:
+                    row, col = a1_to_rowcol(update["range"])
+                    values = [str(value) for value in update["values"][0]]
+                    self.rows[row - 1][col - 1:col - 1 + len(values)] = values
+            
+            def append_rows(self, rows, **kwargs):
+                self.rows.extend([str(value) for value in row] for row in rows)
+            
+            def delete_rows(self, start, end):
+                del self.rows[start - 1:end]
+        
+        now = datetime(2024, 6, 30, tzinfo=timezone.utc)
+        interactions = Worksheet(
+            [["id", "user_id", "submission_id", "interaction_type", "timestamp"]]
+            + [[f"i{day}", "u1", "s1", "like", f"2024-05-{day:02d}T10:00:00"] for day in range(1, 11)]
+            + [["i99", "u1", "s1", "like", "2024-06-29T10:00:00"]]
+        )
+        rollups = Worksheet([ROLLUP_HEADERS])
+        compactor = InteractionCompactor(interactions, rollups, retention_days=30, lease_settle_seconds=0)
+        
+        def day_total():
+            return sum(int(row[4]) for row in rollups.rows[1:] if row[0] == DAY)
+        
+        # Another process deletes the first two rows between the read and the delete
+        interactions.after_read = lambda: interactions.delete_rows(2, 3)
+        report = compactor.compact(now)
+        assert report["rows_compacted"] == 0 and report["rows_not_deleted"] == 10, report
+        assert [row[0] for row in interactions.rows[1:]] == [f"i{day}" for day in range(3, 11)] + ["i99"]
+        assert day_total() == 10
+        print(f"✅ Delete skipped after the sheet changed; {report['rows_not_deleted']} rows kept")
+        
+        report = compactor.compact(now)
+        assert report["rows_compacted"] == 8 and [row[0] for row in interactions.rows[1:]] == ["i99"], report
+        assert day_total() == 10, day_total()
+        print("✅ Next run deleted the rows it had folded in without counting them twice")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Compaction test failed: {e}")
+        return False
+
+def test_read_failover():
+    """Test that a read with a fallback fails over without waiting out quota retries"""
+    print("\n🔀 Testing read failover to the mirror...")
+    
+    try:
+        from utils.quota import QuotaScheduler
+        from utils.read_router import FALLBACK, PRIMARY, ReadRouter
+        
+        class QuotaError(Exception):
+            """Error carrying an HTTP status like the Sheets client raises"""
+            
+            def __init__(self):
+                super().__init__("HTTP 503")
+                self.code = 503
+        
+        calls = []
+        
+        def sheets():
+            calls.append("sheets")
+            raise QuotaError()
+        
+        scheduler = QuotaScheduler("test", rate=100, burst=100, max_retries=3, base_delay=0.01)
+        router = ReadRouter(max_error_rate=0.3)
+        
+        result, source = router.read(lambda: scheduler.call(sheets), lambda: "mirror")
+        assert (result, source) == ("mirror", FALLBACK) and len(calls) == 1, (result, source, calls)
+        print("✅ Failed over after one Sheets call")
+        
+        calls.clear()
+        try:
+            router.read(lambda: scheduler.call(sheets))
+            raise AssertionError("read without a fallback did not raise")
+        except QuotaError:
+            pass
+        assert len(calls) == 4, calls
+        print(f"✅ Without a fallback Sheets got its {len(calls) - 1} quota retries")
+        
+        # Sheets is now unhealthy; apart from the occasional probe, reads go to the mirror
+        router.choose()
+        assert not router.healthy(PRIMARY) and router.choose() == FALLBACK
+        print("✅ Reads routed to the mirror while Sheets is unhealthy")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Read failover test failed: {e}")
+        return False
+
+def test_airtable_reconciliation():
+    """Test that reconciliation finds drift, repairs it and deletes only confirmed extras"""
+    print("\n🌳 Testing Sheets/Airtable reconciliation...")
+    
+    try:
+        import re
+        from utils.airtable_mirror import to_airtable_fields
+        from utils.reconciliation import LAST_MODIFIED_FIELD, AirtableReconciler
+        
+        class Table:
+            """In-memory Airtable table answering the formulas the reconciler sends"""
+            
+            def __init__(self, submissions):
+                self.records = {}
+                self.fetched = 0
+                for position, submission in enumerate(submissions):
+                    self.put(to_airtable_fields(submission), f"2024-01-01T{position // 60:02d}:{position % 60:02d}:00.000Z")
+            
+            def put(self, fields, modified):
+                self.records[f"rec{fields['ID']}"] = dict(fields, **{LAST_MODIFIED_FIELD: modified})
+            
+            def all(self, formula=None, fields=None):
+                records = [{"id": record_id, "fields": dict(fields)} for record_id, fields in self.records.items()]
+                if formula and formula.startswith("OR("):
+                    wanted = set(re.findall(r"\{ID\}='([^']*)'", formula))
+                    records = [record for record in records if record["fields"]["ID"] in wanted]
+                elif formula:
+                    cursor = re.search(r"DATETIME_PARSE\('([^']*)'\)", formula).group(1)
+                    records = [record for record in records if record["fields"][LAST_MODIFIED_FIELD] >= cursor]
+                self.fetched += len(records)
+                return records
+            
+            def batch_delete(self, record_ids):
+                for record_id in record_ids:
+                    del self.records[record_id]
+        
+        class Mirror:
+            """Collects the records re-sent to Airtable"""
+            
+            def __init__(self):
+                self.queued = []
+            
+            def enqueue(self, fields):
+                self.queued.append(fields["ID"])
+        
+        submissions = [
+            {"id": f"s{i}", "timestamp": "2024-01-01T00:00:00", "user_id": "u1", "title": f"Story {i}", "content": "..."}
+            for i in range(300)
+        ]
+        table, mirror = Table(submissions), Mirror()
+        reconciler = AirtableReconciler(table, mirror)
+        reconciler.rebuild(submissions)
+        
+        report = reconciler.reconcile(submissions)
+        assert not (report["missing_in_airtable"] or report["extra_in_airtable"] or report["different"]), report
+        
+        # Drift: a local edit, an edit made in Airtable and a record only Airtable has
+        submissions[5]["title"] = "Edited"
+        reconciler.update(5, submissions[5], "title", "Story 5", "Edited")
+        table.put(dict(table.records["recs7"], Title="Changed in Airtable"), "2024-01-02T00:00:00.000Z")
+        table.put({"ID": "extra", "Title": "Stray"}, "2024-01-02T00:00:00.000Z")
+        table.fetched = 0
+        
+        report = reconciler.reconcile(submissions, delete_extra=True, confirm_extra=lambda ids: [])
+        assert report["different"] == ["s5", "s7"] and report["extra_in_airtable"] == ["extra"], report
+        assert report["deleted"] == 0 and "recextra" in table.records, report
+        assert sorted(mirror.queued) == ["s5", "s7"] and table.fetched < 20, (mirror.queued, table.fetched)
+        print(f"✅ Found the drift reading {table.fetched} of {len(table.records)} Airtable records")
+        
+        report = reconciler.reconcile(submissions, delete_extra=True, confirm_extra=lambda ids: ids)
+        assert report["deleted"] == 1 and "recextra" not in table.records, report
+        
+        # Deletions in Airtable only show up in the periodic full listing
+        del table.records["recs9"]
+        reconciler.full_sync_interval = 0
+        report = reconciler.reconcile(submissions, repair=False)
+        assert report["missing_in_airtable"] == ["s9"], report
+        print("✅ Extra record deleted only once Sheets confirmed it was absent")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Reconciliation test failed: {e}")
+        return False
+
 def test_file_structure():
     """Test file structure"""
     print("\n📁 Testing file structure...")
@@ -303,7 +832,15 @@ def run_all_tests():
         ("Categorization", test_categorization_service),
         ("Audio Processing", test_audio_service),
         ("Gamification", test_gamification),
-        ("Social Cards", test_social_cards)
+        ("Social Cards", test_social_cards),
+        ("Record Memory", test_record_memory),
+        ("Record Serialisation", test_record_serialisation),
+        ("Sharded Cold Start", test_sharded_cold_start),
+        ("Journal Outage", test_journal_outage),
+        ("Like Flush Unindexed", test_like_buffer_unindexed),
+        ("Compaction Concurrent Change", test_compaction_concurrent_change),
+        ("Read Failover", test_read_failover),
+        ("Airtable Reconciliation", test_airtable_reconciliation)
     ]
     
     results = {}
@@ -0,0 +1,197 @@
+"""
+Incrementally maintained submission aggregates with daily rollups
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+class SubmissionAggregates:
+    """
+    Keeps per-language, per-category, per-content-type and per-day counts,
+    distinct users and the newest submissions up to date as records are
+    loaded, so analytics reads never rescan the corpus.
+    
+    Attach it to a SheetSnapshot with ``snapshot.add_view()``; it is then
+    rebuilt on full loads and extended with appended rows.
+    """
+    
+    def __init__(self, recent_size: int = 10):
+        self.recent_size = recent_size
+        self._lock = threading.RLock()
+        self._last_persist: Optional[float] = None
+        self.reset()
+    
+    def reset(self):
+        """Clear all counts"""
+        with self._lock:
+            self.total = 0
+            self.languages: Dict[str, int] = {}
+            self.categories: Dict[str, int] = {}
+            self.content_types: Dict[str, int] = {}
+            self.days: Dict[str, Dict[str, Any]] = {}
+            self.user_first_day: Dict[str, str] = {}
+            self.recent_keys: List[Tuple[str, str]] = []  # (timestamp, id) ascending, newest last
+            self.recent: List[Dict[str, Any]] = []
+            self.dirty_days: Set[str] = set()
+    
+    def rebuild(self, records: List[Dict[str, Any]]):
+        """Recount every record"""
+        with self._lock:
+            self.reset()
+            self.extend(records, 0)
+    
+    def extend(self, records: List[Dict[str, Any]], start: int = 0):
+        """Count newly loaded or saved records"""
+        with self._lock:
+            for record in records:
+                self._add(record)
+    
+    def _add(self, record: Dict[str, Any]):
+        """Fold one record into the counts"""
+        language = record.get("language") or "Unknown"
+        category = record.get("category") or "Uncategorized"
+        content_type = record.get("content_type") or "Unknown"
+        timestamp = str(record.get("timestamp", ""))
+        day = timestamp[:10]
+        user_id = str(record.get("user_id", ""))
+        
+        self.total += 1
+        self.languages[language] = self.languages.get(language, 0) + 1
+        self.categories[category] = self.categories.get(category, 0) + 1
+        self.content_types[content_type] = self.content_types.get(content_type, 0) + 1
+        
+        rollup = self.days.setdefault(day, {
+            "submissions": 0,
+            "users": set(),
+            "new_users": set(),
+            "languages": {},
+            "categories": {},
+            "featured_story": ""
+        })
+        rollup["submissions"] += 1
+        rollup["users"].add(user_id)
+        rollup["languages"][language] = rollup["languages"].get(language, 0) + 1
+        rollup["categories"][category] = rollup["categories"].get(category, 0) + 1
+        if not rollup["featured_story"] and str(record.get("featured", "")).upper() == "TRUE":
+            rollup["featured_story"] = str(record.get("id", ""))
+        
+        first_day = self.user_first_day.get(user_id)
+        if first_day is None or day < first_day:
+            if first_day is not None and first_day in self.days:
+                self.days[first_day]["new_users"].discard(user_id)
+                self.dirty_days.add(first_day)
+            self.user_first_day[user_id] = day
+            rollup["new_users"].add(user_id)
+        self.dirty_days.add(day)
+        
+        key = (timestamp, str(record.get("id", "")))
+        if len(self.recent) < self.recent_size or key > self.recent_keys[0]:
+            position = bisect.bisect(self.recent_keys, key)
+            self.recent_keys.insert(position, key)
+            self.recent.insert(position, record)
+            if len(self.recent) > self.recent_size:
+                del self.recent_keys[0], self.recent[0]
+    
+    def update(self, position: int, record: Dict[str, Any], field: str, old_value: Any, new_value: Any):
+        """Local edits only touch likes, which these counts do not include"""
+    
+    def get_analytics(self) -> Dict[str, Any]:
+        """Get the analytics summary in the shape get_analytics_data() returns"""
+        with self._lock:
+            return {
+                "total_submissions": self.total,
+                "total_users": len(self.user_first_day),
+                "languages_count": len(self.languages),
+                "categories_distribution": dict(self.categories),
+                "languages_distribution": dict(self.languages),
+                "content_types_distribution": dict(self.content_types),
+                "daily_submissions": {day: rollup["submissions"] for day, rollup in sorted(self.days.items())},
+                "recent_activity": [dict(record) for record in reversed(self.recent)]
+            }
+    
+    def rollup_rows(self, days: Set[str] = None) -> Dict[str, List[Any]]:
+        """Get analytics worksheet rows keyed by date"""
+        with self._lock:
+            rows = {}
+            for day in sorted(days if days is not None else self.days):
+                rollup = self.days.get(day)
+                if not rollup or not day:
+                    continue
+                rows[day] = [
+                    day,
+                    rollup["submissions"],
+                    len(rollup["new_users"]),
+                    len(rollup["users"]),
+                    max(rollup["languages"], key=rollup["languages"].get),
+                    max(rollup["categories"], key=rollup["categories"].get),
+                    rollup["featured_story"]
+                ]
+            return rows
+    
+    def persist_rollups(self, worksheet) -> int:
+        """
+        Write changed daily rollups to the analytics worksheet
+        
+        Rows follow the worksheet's columns: date, total_submissions,
+        new_users, active_users, top_language, top_category and
+        featured_story. Existing date rows are overwritten in one batch_update and new dates
+        are added in one append_rows. Returns the number of rows written.
+        """
+        with self._lock:
+            days, self.dirty_days = self.dirty_days, set()
+            rows = self.rollup_rows(days)
+        
+        try:
+            existing = worksheet.get_all_values()
+            row_numbers = {
+                row[0]: row_number
+                for row_number, row in enumerate(existing[1:], start=2)  # Row 1 is the header
+                if row
+            }
+            stored = {row[0]: row for row in existing[1:] if row}
+            
+            updates = []
+            appends = []
+            for day, row in rows.items():
+                if [str(value) for value in row] == stored.get(day, [])[:len(row)]:
+                    continue
+                if day in row_numbers:
+                    updates.append({"range": f"A{row_numbers[day]}", "values": [row]})
+                else:
+                    appends.append(row)
+            
+            if updates:
+                worksheet.batch_update(updates, value_input_option="RAW")
+            if appends:
+                worksheet.append_rows(appends, value_input_option="RAW")
+            
+            self._last_persist = time.monotonic()
+            return len(updates) + len(appends)
+        
+        except Exception:
+            with self._lock:
+                self.dirty_days |= days
+            raise
+    
+    def rollups_due(self, interval: float) -> bool:
+        """Check whether some day changed and ``interval`` seconds have passed since the last write"""
+        if not self.dirty_days:
+            return False
+        return self._last_persist is None or time.monotonic() - self._last_persist >= interval
+
+_aggregates: Dict[Tuple[str, int], SubmissionAggregates] = {}
+_aggregates_lock = threading.Lock()
+
+def get_aggregates(snapshot, recent_size: int = 10) -> SubmissionAggregates:
+    """Get the process-wide aggregates for a snapshot, attaching them on first use"""
+    key = (snapshot.worksheet.spreadsheet_id, snapshot.worksheet.id)
+    
+    with _aggregates_lock:
+        aggregates = _aggregates.get(key)
+        if aggregates is None:
+            aggregates = SubmissionAggregates(recent_size)
+            snapshot.add_view(aggregates)
+            _aggregates[key] = aggregates
+        return aggregates
@@ -0,0 +1,156 @@
+"""
+Background, batched mirroring of submissions to Airtable
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any
+
+from utils.quota import BACKGROUND, lane
+
+# Airtable field names of the submission fields mirrored to the Submissions table
+AIRTABLE_FIELDS = {
+    "id": "ID",
+    "timestamp": "Timestamp",
+    "user_id": "User ID",
+    "title": "Title",
+    "content": "Content",
+    "content_type": "Content Type",
+    "language": "Language",
+    "english_translation": "English Translation",
+    "category": "Category",
+    "likes": "Likes"
+}
+
+class AirtableMirror:
+    """
+    Mirrors records to an Airtable table from a background worker.
+    
+    Records are sent up to 10 per request (Airtable's batch limit). Rate
+    limiting and retries belong to the quota scheduler the table is
+    proxied through; a batch it gives up on is kept in ``failed``. Writes
+    are upserts keyed on the ``ID`` field, so a retried batch that
+    partially landed the first time never creates duplicate rows.
+    """
+    
+    BATCH_SIZE = 10
+    
+    def __init__(self, table, key_field: str = "ID"):
+        self.table = table
+        self.key_field = key_field
+        
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        
+        self.stats = {
+            "requests": 0,
+            "records_mirrored": 0,
+            "failed_records": 0,
+            "last_batch_size": 0,
+            "last_request_seconds": 0.0,
+            "last_error": ""
+        }
+        self.failed: List[Dict[str, Any]] = []
+    
+    def enqueue(self, fields: Dict[str, Any]):
+        """Queue a record for mirroring; a newer copy of the same ID replaces the queued one"""
+        with self._condition:
+            key = fields[self.key_field]
+            self._pending.pop(key, None)
+            self._pending[key] = fields
+            self._condition.notify()
+        
+        self.start()
+    
+    def queue_depth(self) -> int:
+        """Number of records queued or currently being sent"""
+        with self._condition:
+            return len(self._pending) + self._in_flight
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and mirroring throughput"""
+        stats = dict(self.stats)
+        stats["queue_depth"] = self.queue_depth()
+        return stats
+    
+    def start(self):
+        """Start the background worker if it is not running"""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="airtable-mirror", daemon=True)
+            self._thread.start()
+    
+    def drain(self, timeout: float = 30) -> bool:
+        """Block until the queue is empty; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self.queue_depth():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
+    def _run(self):
+        """Take up to BATCH_SIZE records at a time and send them"""
+        with lane(BACKGROUND):
+            while True:
+                with self._condition:
+                    while not self._pending:
+                        self._condition.wait()
+                    
+                    batch = []
+                    while self._pending and len(batch) < self.BATCH_SIZE:
+                        _, fields = self._pending.popitem(last=False)
+                        batch.append(fields)
+                    self._in_flight = len(batch)
+                
+                try:
+                    self._send(batch)
+                finally:
+                    with self._condition:
+                        self._in_flight = 0
+    
+    def _send(self, batch: List[Dict[str, Any]]):
+        """Upsert a batch, keeping it in ``failed`` if the scheduler's retries run out"""
+        started = time.monotonic()
+        try:
+            self.table.batch_upsert(
+                [{"fields": fields} for fields in batch],
+                key_fields=[self.key_field]
+            )
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+            self.stats["failed_records"] += len(batch)
+            self.failed.extend(batch)
+            return
+        
+        self.stats["requests"] += 1
+        self.stats["records_mirrored"] += len(batch)
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["last_request_seconds"] = time.monotonic() - started
+
+def to_airtable_fields(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """Lay a submission out as Airtable fields; likes start at 0 and are not mirrored afterwards"""
+    fields = {name: submission.get(field, "") for field, name in AIRTABLE_FIELDS.items()}
+    fields["ID"] = submission["id"]
+    fields["Timestamp"] = submission["timestamp"]
+    fields["User ID"] = submission.get("user_id", "anonymous")
+    fields["Likes"] = 0
+    return fields
+
+_mirrors: Dict[str, AirtableMirror] = {}
+_mirrors_lock = threading.Lock()
+
+def get_airtable_mirror(base, table_name: str = "Submissions") -> AirtableMirror:
+    """Get the process-wide mirror for an Airtable table, creating it on first use"""
+    key = f"{base.id}/{table_name}"
+    
+    with _mirrors_lock:
+        mirror = _mirrors.get(key)
+        if mirror is None:
+            mirror = AirtableMirror(base.table(table_name))
+            _mirrors[key] = mirror
+        return mirror
@@ -0,0 +1,98 @@
+"""
+Submission reads served from the Airtable mirror with filterByFormula and sort
+"""
+
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from utils.airtable_mirror import AIRTABLE_FIELDS
+from utils.search_index import rank_records, tokenize
+
+# List-view fields computed from the content, e.g. by project_record()
+DERIVED_FIELDS = ("content_preview", "content_length")
+
+# Mirrored fields full-text search looks in
+AIRTABLE_SEARCH_FIELDS = ("title", "content", "english_translation")
+
+class AirtableReader:
+    """
+    Answers submission list and search reads from the Airtable mirror.
+    
+    Filters and the keyset cursor become one ``filterByFormula`` and the
+    newest-first order a server-side ``sort``, so Airtable returns only
+    the page asked for. Search narrows to records containing any query
+    term server-side, then ranks them with the same BM25 scoring the
+    snapshot uses.
+    
+    Only mirrored fields can be filtered on; check ``can_filter()`` first.
+    Likes are not mirrored after the first write, so counts read here may
+    be behind the sheet's.
+    """
+    
+    def __init__(self, table, search_limit: int = 100):
+        self.table = table
+        self.search_limit = search_limit
+    
+    def can_filter(self, filters: Optional[Dict[str, Any]]) -> bool:
+        """Check whether every filtered field is mirrored to Airtable"""
+        return all(field in AIRTABLE_FIELDS for field in (filters or {}))
+    
+    def get_submissions(self, limit: int = 50, filters: Dict[str, Any] = None,
+                        after: Optional[Tuple[str, str]] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get one page of submissions matching the filters, newest first"""
+        conditions = self._filter_conditions(filters)
+        if after:
+            # Airtable formulas cannot compare text ordering, so the cursor
+            # seeks by time; submissions sharing the cursor's exact
+            # timestamp are skipped
+            conditions.append(f"IS_BEFORE(DATETIME_PARSE({{Timestamp}}), DATETIME_PARSE({_quote(after[0])}))")
+        
+        records = self._select(conditions, limit, fields)
+        return [_from_airtable(record) for record in records]
+    
+    def search_submissions(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Get submissions containing any query term, best BM25 score first"""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        
+        text = " & ' ' & ".join(f"{{{AIRTABLE_FIELDS[field]}}}" for field in AIRTABLE_SEARCH_FIELDS)
+        matches = [f"FIND({_quote(term)}, LOWER({text}))" for term in terms]
+        conditions = self._filter_conditions(filters) + [f"OR({', '.join(matches)})"]
+        
+        records = [_from_airtable(record) for record in self._select(conditions, self.search_limit)]
+        return rank_records(records, query, AIRTABLE_SEARCH_FIELDS)
+    
+    def _filter_conditions(self, filters: Optional[Dict[str, Any]]) -> List[str]:
+        """Formula conditions for equality filters on mirrored fields"""
+        return [f"{{{AIRTABLE_FIELDS[field]}}}={_quote(value)}" for field, value in (filters or {}).items()]
+    
+    def _select(self, conditions: List[str], limit: int, fields: Iterable[str] = None) -> List[Dict[str, Any]]:
+        """List matching records newest first, asking only for the wanted fields"""
+        options: Dict[str, Any] = {"sort": ["-Timestamp"], "max_records": limit}
+        if conditions:
+            options["formula"] = conditions[0] if len(conditions) == 1 else f"AND({', '.join(conditions)})"
+        if fields:
+            # Derived fields are computed from the content afterwards
+            wanted = {"content" if field in DERIVED_FIELDS else field for field in fields}
+            options["fields"] = [name for field, name in AIRTABLE_FIELDS.items() if field in wanted]
+        return self.table.all(**options)
+
+def _quote(value: Any) -> str:
+    """Airtable formula literal for a filter value"""
+    if isinstance(value, bool):
+        return "TRUE()" if value else "FALSE()"
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+def _from_airtable(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Submission record from an Airtable record; Airtable leaves out empty fields"""
+    fields = record.get("fields", {})
+    submission = {field: fields.get(name, "") for field, name in AIRTABLE_FIELDS.items()}
+    try:
+        submission["likes"] = int(submission["likes"] or 0)
+    except (TypeError, ValueError):
+        submission["likes"] = 0
+    return submission
@@ -0,0 +1,118 @@
+"""
+Storage backend interface shared by DatabaseManager implementations
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional, Tuple
+
+# Columns of a submission record, in the order of the "submissions" worksheet
+SUBMISSION_FIELDS = [
+    "id", "timestamp", "user_id", "title", "content", "content_type",
+    "language", "dialect", "english_translation", "ai_translated",
+    "category", "ai_categorized", "audio_url", "likes", "featured",
+    "location", "cultural_context"
+]
+
+# Characters of content kept in a list view's content_preview
+PREVIEW_LENGTH = 300
+
+# Fields list views (feeds) need; content_preview and content_length stand in for the full text
+SUBMISSION_LIST_FIELDS = [
+    "id", "timestamp", "user_id", "title", "content_preview", "content_length",
+    "content_type", "language", "category", "likes", "featured", "location"
+]
+
+# Fields backends search in, matched by substring and ranked by BM25
+BACKEND_SEARCH_FIELDS = ("title", "content", "english_translation")
+
+def project_record(record: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keep only the requested fields of a full record, deriving the content preview and length"""
+    projected = {}
+    for field in fields:
+        if field == "content_preview":
+            projected[field] = str(record.get("content", ""))[:PREVIEW_LENGTH]
+        elif field == "content_length":
+            projected[field] = len(str(record.get("content", "")))
+        else:
+            projected[field] = record.get(field, "")
+    return projected
+
+class StorageBackend(ABC):
+    """Interface for stores that DatabaseManager can delegate to instead of Google Sheets"""
+    
+    # Local stores are written directly instead of through the submission journal
+    is_local = False
+    
+    @abstractmethod
+    def save_submission(self, submission_data: Dict[str, Any]) -> str:
+        """Save a new submission and return its id"""
+    
+    @abstractmethod
+    def get_submissions(self, limit: int = 50, filters: Dict[str, Any] = None,
+                        after: Optional[Tuple[str, str]] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get the newest submissions matching all filters, older than the (timestamp, id) cursor if given, with only ``fields`` if given"""
+    
+    @abstractmethod
+    def get_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Get one full submission record, or None if it does not exist"""
+    
+    @abstractmethod
+    def update_submission_likes(self, submission_id: str, increment: int = 1) -> bool:
+        """Change a submission's likes count"""
+    
+    @abstractmethod
+    def save_user_interaction(self, user_id: str, submission_id: str, interaction_type: str):
+        """Record a like, share or other interaction"""
+    
+    @abstractmethod
+    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Get submission, like, language and category totals and the current streak for a user"""
+    
+    @abstractmethod
+    def get_analytics_data(self) -> Dict[str, Any]:
+        """Get platform-wide distributions and recent activity"""
+    
+    @abstractmethod
+    def search_submissions(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Search title, content and translation"""
+    
+    def save_submissions(self, submissions: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save several submissions; backends with a bulk path override this
+        
+        Backends that override it keep an "id" given in the submission data
+        and skip ids they already have, so replaying a batch is safe.
+        """
+        return [self.save_submission(submission_data) for submission_data in submissions]
+    
+    def record_like(self, submission_id: str, user_id: str) -> bool:
+        """Record a user's like; backends with a likes table override this"""
+        if not self.update_submission_likes(submission_id, 1):
+            return False
+        self.save_user_interaction(user_id, submission_id, "like")
+        return True
+    
+    def close(self):
+        """Release connections held by the backend"""
+
+def create_backend(config) -> Optional[StorageBackend]:
+    """
+    Create the backend selected by config.STORAGE_BACKEND
+    
+    Returns None for "sheets", which DatabaseManager handles itself.
+    """
+    backend_name = config.STORAGE_BACKEND.lower()
+    
+    if backend_name == "sheets":
+        return None
+    
+    if backend_name == "sqlite":
+        from utils.backends.sqlite_backend import get_sqlite_backend
+        return get_sqlite_backend(config.SQLITE_PATH)
+    
+    if backend_name == "postgres":
+        from utils.backends.postgres_backend import get_postgres_backend
+        return get_postgres_backend(config.POSTGRES_DSN, config.POSTGRES_POOL_MIN, config.POSTGRES_POOL_MAX)
+    
+    raise ValueError(f"Unknown storage backend: {config.STORAGE_BACKEND}")
@@ -0,0 +1,456 @@
+"""
+PostgreSQL storage backend for the schema in scripts/*.sql
+"""
+
+import csv
+import io
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+
+from utils.backends.base import BACKEND_SEARCH_FIELDS, PREVIEW_LENGTH, StorageBackend
+from utils.search_index import rank_records, tokenize
+
+# App user ids such as "anon_1a2b3c4d" are mapped to stable UUIDs for auth.users
+USER_NAMESPACE = uuid.UUID("6f1d7a52-3c1e-4d59-9a8e-2b7c0e9d4f11")
+
+# stories.content_type only allows these values (scripts/004_create_stories.sql,
+# widened by scripts/009_add_story_app_fields.sql); unknown types are stored as "story"
+CONTENT_TYPES_TO_DB = {
+    "Proverb": "proverb",
+    "Folk Tale": "folk_tale",
+    "Saying": "saying",
+    "Short Story": "story",
+    "Poem": "poem",
+    "Song": "song",
+    "Riddle": "riddle",
+    "Legend": "legend"
+}
+CONTENT_TYPES_FROM_DB = {value: name for name, value in CONTENT_TYPES_TO_DB.items()}
+
+RECORD_FROM = """
+FROM public.stories s
+LEFT JOIN public.languages l ON l.id = s.language_id
+LEFT JOIN public.categories c ON c.id = s.category_id
+LEFT JOIN auth.users u ON u.id = s.user_id
+"""
+
+SELECT_RECORD = """
+SELECT s.id::text AS id, s.created_at AS timestamp,
+       COALESCE(u.raw_user_meta_data->>'app_user_id', s.user_id::text) AS user_id,
+       s.title, s.content, s.content_type, l.name AS language, s.dialect,
+       s.english_translation, s.ai_generated_translation AS ai_translated,
+       c.name AS category, s.ai_categorized, s.audio_url,
+       s.likes_count AS likes, s.is_featured AS featured,
+       s.location, s.cultural_context
+""" + RECORD_FROM
+
+# Record field -> SQL expression, for reads that select only some fields
+SELECT_COLUMNS = {
+    "id": "s.id::text",
+    "timestamp": "s.created_at",
+    "user_id": "COALESCE(u.raw_user_meta_data->>'app_user_id', s.user_id::text)",
+    "title": "s.title",
+    "content": "s.content",
+    "content_preview": f"left(s.content, {PREVIEW_LENGTH})",
+    "content_length": "char_length(s.content)",
+    "content_type": "s.content_type",
+    "language": "l.name",
+    "dialect": "s.dialect",
+    "english_translation": "s.english_translation",
+    "ai_translated": "s.ai_generated_translation",
+    "category": "c.name",
+    "ai_categorized": "s.ai_categorized",
+    "audio_url": "s.audio_url",
+    "likes": "s.likes_count",
+    "featured": "s.is_featured",
+    "location": "s.location",
+    "cultural_context": "s.cultural_context"
+}
+
+STORY_COLUMNS = [
+    "id", "user_id", "title", "content", "content_type", "language_id", "dialect",
+    "english_translation", "ai_generated_translation", "category_id", "ai_categorized",
+    "audio_url", "location", "cultural_context", "created_at"
+]
+
+class PostgresBackend(StorageBackend):
+    """
+    Stores submissions in PostgreSQL using the Supabase schema from scripts/.
+    
+    Connections come from a bounded pool; callers wait for a free connection
+    instead of opening new ones. Filtering, ordering and pagination run on
+    the server, feeds page by keyset on (created_at, id) so they walk
+    idx_stories_created_at, and likes rely on the update_story_likes_count
+    trigger rather than a read-modify-write.
+    """
+    
+    def __init__(self, dsn: str, min_connections: int = 1, max_connections: int = 10):
+        self.pool = ThreadedConnectionPool(min_connections, max_connections, dsn)
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lookup_cache: Dict[Tuple[str, str], str] = {}
+        self._known_users: set = set()
+        self._cache_lock = threading.Lock()
+    
+    @contextmanager
+    def _cursor(self):
+        """Borrow a pooled connection for one transaction"""
+        self._slots.acquire()
+        connection = self.pool.getconn()
+        try:
+            with connection:
+                with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                    yield cursor
+        finally:
+            self.pool.putconn(connection)
+            self._slots.release()
+    
+    def _user_uuid(self, user_id: str) -> str:
+        """Map an app user id to the UUID stored in auth.users"""
+        try:
+            return str(uuid.UUID(user_id))
+        except (ValueError, TypeError, AttributeError):
+            return str(uuid.uuid5(USER_NAMESPACE, user_id or "anonymous"))
+    
+    def _ensure_users(self, cursor, user_ids: List[str]):
+        """Create auth.users rows for app users seen for the first time"""
+        for user_id in set(user_ids):
+            user_uuid = self._user_uuid(user_id)
+            if user_uuid in self._known_users:
+                continue
+            cursor.execute(
+                """
+                INSERT INTO auth.users (id, raw_user_meta_data)
+                VALUES (%s, jsonb_build_object('display_name', %s::text, 'app_user_id', %s::text))
+                ON CONFLICT (id) DO NOTHING
+                """,
+                (user_uuid, user_id, user_id)
+            )
+            with self._cache_lock:
+                self._known_users.add(user_uuid)
+    
+    def _lookup_id(self, cursor, table: str, name: str, create: bool = True) -> Optional[str]:
+        """Resolve a language or category name to its id, creating it if needed"""
+        if not name or table not in ("languages", "categories"):
+            return None
+        
+        key = (table, name)
+        if key in self._lookup_cache:
+            return self._lookup_cache[key]
+        
+        if create:
+            cursor.execute(f"INSERT INTO public.{table} (name) VALUES (%s) ON CONFLICT (name) DO NOTHING", (name,))
+        cursor.execute(f"SELECT id::text AS id FROM public.{table} WHERE name = %s", (name,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        
+        with self._cache_lock:
+            self._lookup_cache[key] = row["id"]
+        return row["id"]
+    
+    def _to_record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a row into a submission record"""
+        record = dict(row)
+        if isinstance(record.get("timestamp"), datetime):
+            record["timestamp"] = record["timestamp"].isoformat()
+        if "content_type" in record:
+            record["content_type"] = CONTENT_TYPES_FROM_DB.get(record["content_type"], record["content_type"])
+        for field, value in record.items():
+            if value is None:
+                record[field] = ""
+        return record
+    
+    def _select(self, fields: Optional[List[str]]) -> str:
+        """SELECT_RECORD, or a SELECT of just the given fields; all fields if none of them are known"""
+        known = [field for field in fields or [] if field in SELECT_COLUMNS]
+        if not known:
+            return SELECT_RECORD
+        columns = ", ".join(f"{SELECT_COLUMNS[field]} AS {field}" for field in known)
+        return f"SELECT {columns}" + RECORD_FROM
+    
+    def _where(self, cursor, filters: Dict[str, Any]) -> Optional[Tuple[List[str], List[Any]]]:
+        """
+        Translate record filters into SQL on indexed columns
+        
+        Returns None when a filter names a language or category that does
+        not exist, since nothing can match.
+        """
+        conditions = []
+        params = []
+        for key, value in (filters or {}).items():
+            if key in ("language", "category"):
+                lookup_id = self._lookup_id(cursor, "languages" if key == "language" else "categories", value, create=False)
+                if lookup_id is None:
+                    return None
+                conditions.append(f"s.{key}_id = %s")
+                params.append(lookup_id)
+            elif key == "user_id":
+                conditions.append("s.user_id = %s")
+                params.append(self._user_uuid(value))
+            elif key == "content_type":
+                conditions.append("s.content_type = %s")
+                params.append(CONTENT_TYPES_TO_DB.get(value, value))
+            elif key == "featured":
+                conditions.append("s.is_featured = %s")
+                params.append(bool(value))
+            elif key == "ai_translated":
+                conditions.append("s.ai_generated_translation = %s")
+                params.append(bool(value))
+            elif key in ("id", "dialect", "ai_categorized", "location"):
+                conditions.append(f"s.{key} = %s")
+                params.append(value)
+        return conditions, params
+    
+    def _story_row(self, cursor, submission_id: str, submission_data: Dict[str, Any]) -> List[Any]:
+        """Build a stories row in STORY_COLUMNS order"""
+        return [
+            submission_id,
+            self._user_uuid(submission_data.get("user_id", "anonymous")),
+            submission_data.get("title", ""),
+            submission_data.get("content", ""),
+            CONTENT_TYPES_TO_DB.get(submission_data.get("content_type", ""), "story"),
+            self._lookup_id(cursor, "languages", submission_data.get("language", "")),
+            submission_data.get("dialect", ""),
+            submission_data.get("english_translation", ""),
+            bool(submission_data.get("ai_translated", False)),
+            self._lookup_id(cursor, "categories", submission_data.get("category", "")),
+            bool(submission_data.get("ai_categorized", False)),
+            submission_data.get("audio_url", ""),
+            submission_data.get("location", ""),
+            submission_data.get("cultural_context", ""),
+            submission_data.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        ]
+    
+    def save_submission(self, submission_data: Dict[str, Any]) -> str:
+        """Insert a new story"""
+        submission_id = str(uuid.uuid4())
+        
+        with self._cursor() as cursor:
+            self._ensure_users(cursor, [submission_data.get("user_id", "anonymous")])
+            placeholders = ", ".join(["%s"] * len(STORY_COLUMNS))
+            cursor.execute(
+                f"INSERT INTO public.stories ({', '.join(STORY_COLUMNS)}) VALUES ({placeholders})",
+                self._story_row(cursor, submission_id, submission_data)
+            )
+        
+        return submission_id
+    
+    def save_submissions(self, submissions: List[Dict[str, Any]]) -> List[str]:
+        """Bulk insert stories with COPY into a staging table, skipping ids already stored"""
+        submission_ids = [submission_data.get("id") or str(uuid.uuid4()) for submission_data in submissions]
+        
+        with self._cursor() as cursor:
+            self._ensure_users(cursor, [data.get("user_id", "anonymous") for data in submissions])
+            
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for submission_id, submission_data in zip(submission_ids, submissions):
+                row = self._story_row(cursor, submission_id, submission_data)
+                writer.writerow(["" if value is None else ("t" if value is True else "f" if value is False else value) for value in row])
+            buffer.seek(0)
+            
+            columns = ", ".join(STORY_COLUMNS)
+            cursor.execute("CREATE TEMP TABLE stories_staging (LIKE public.stories INCLUDING DEFAULTS) ON COMMIT DROP")
+            cursor.copy_expert(f"COPY stories_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO public.stories ({columns}) SELECT {columns} FROM stories_staging ON CONFLICT (id) DO NOTHING"
+            )
+        
+        return submission_ids
+    
+    def get_submissions(self, limit: int = 50, filters: Dict[str, Any] = None,
+                        after: Optional[Tuple[str, str]] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get the newest stories matching all filters
+        
+        Args:
+            after: (timestamp, id) of the last record on the previous page
+            fields: Record fields to select; all of them if not given
+        """
+        with self._cursor() as cursor:
+            where = self._where(cursor, filters)
+            if where is None:
+                return []
+            conditions, params = where
+            
+            if after:
+                conditions.append("(s.created_at, s.id) < (%s::timestamptz, %s::uuid)")
+                params.extend(after)
+            
+            sql = self._select(fields)
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += " ORDER BY s.created_at DESC, s.id DESC LIMIT %s"
+            
+            cursor.execute(sql, params + [limit])
+            return [self._to_record(row) for row in cursor.fetchall()]
+    
+    def get_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Get one full story by id"""
+        try:
+            uuid.UUID(submission_id)
+        except ValueError:
+            return None
+        
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_RECORD + " WHERE s.id = %s", (submission_id,))
+            row = cursor.fetchone()
+            return self._to_record(row) if row else None
+    
+    def update_submission_likes(self, submission_id: str, increment: int = 1) -> bool:
+        """Adjust likes_count atomically on the server"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                "UPDATE public.stories SET likes_count = GREATEST(0, likes_count + %s), updated_at = NOW() WHERE id = %s",
+                (increment, submission_id)
+            )
+            return cursor.rowcount > 0
+    
+    def record_like(self, submission_id: str, user_id: str) -> bool:
+        """Insert into likes and let update_story_likes_count() bump the counter"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT 1 FROM public.stories WHERE id = %s", (submission_id,))
+            if cursor.fetchone() is None:
+                return False
+            
+            self._ensure_users(cursor, [user_id])
+            cursor.execute(
+                "INSERT INTO public.likes (user_id, story_id) VALUES (%s, %s) ON CONFLICT (user_id, story_id) DO NOTHING",
+                (self._user_uuid(user_id), submission_id)
+            )
+        return True
+    
+    def save_user_interaction(self, user_id: str, submission_id: str, interaction_type: str):
+        """Record an interaction; likes go through the likes table"""
+        if interaction_type == "like":
+            self.record_like(submission_id, user_id)
+            return
+        
+        with self._cursor() as cursor:
+            self._ensure_users(cursor, [user_id])
+            cursor.execute(
+                "INSERT INTO public.story_interactions (user_id, story_id, interaction_type) VALUES (%s, %s, %s)",
+                (self._user_uuid(user_id), submission_id, interaction_type)
+            )
+    
+    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Aggregate a user's stories using idx_stories_user_id"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT COUNT(*) AS total_submissions,
+                       COALESCE(SUM(s.likes_count), 0) AS total_likes,
+                       ARRAY_REMOVE(ARRAY_AGG(DISTINCT l.name), NULL) AS languages_used,
+                       ARRAY_REMOVE(ARRAY_AGG(DISTINCT c.name), NULL) AS categories_used
+                FROM public.stories s
+                LEFT JOIN public.languages l ON l.id = s.language_id
+                LEFT JOIN public.categories c ON c.id = s.category_id
+                WHERE s.user_id = %s
+                """,
+                (self._user_uuid(user_id),)
+            )
+            row = cursor.fetchone()
+            
+            cursor.execute(
+                "SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::date AS day FROM public.stories WHERE user_id = %s",
+                (self._user_uuid(user_id),)
+            )
+            days = {day_row["day"] for day_row in cursor.fetchall()}
+        
+        # Consecutive submission days ending today
+        streak = 0
+        today = datetime.now(timezone.utc).date()
+        while today - timedelta(days=streak) in days:
+            streak += 1
+        
+        return {
+            "total_submissions": row["total_submissions"],
+            "total_likes": int(row["total_likes"]),
+            "languages_used": list(row["languages_used"] or []),
+            "categories_used": list(row["categories_used"] or []),
+            "streak": streak,
+            "badges": []
+        }
+    
+    def get_analytics_data(self) -> Dict[str, Any]:
+        """Compute distributions with GROUP BY on the server"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total_submissions, COUNT(DISTINCT user_id) AS total_users FROM public.stories")
+            totals = cursor.fetchone()
+            
+            cursor.execute(
+                """
+                SELECT COALESCE(l.name, 'Unknown') AS name, COUNT(*) AS count
+                FROM public.stories s LEFT JOIN public.languages l ON l.id = s.language_id
+                GROUP BY 1
+                """
+            )
+            languages_distribution = {row["name"]: row["count"] for row in cursor.fetchall()}
+            
+            cursor.execute(
+                """
+                SELECT COALESCE(c.name, 'Uncategorized') AS name, COUNT(*) AS count
+                FROM public.stories s LEFT JOIN public.categories c ON c.id = s.category_id
+                GROUP BY 1
+                """
+            )
+            categories_distribution = {row["name"]: row["count"] for row in cursor.fetchall()}
+            
+            cursor.execute(SELECT_RECORD + " ORDER BY s.created_at DESC, s.id DESC LIMIT 10")
+            recent = [self._to_record(row) for row in cursor.fetchall()]
+        
+        return {
+            "total_submissions": totals["total_submissions"],
+            "total_users": totals["total_users"],
+            "languages_count": len(languages_distribution),
+            "categories_distribution": categories_distribution,
+            "languages_distribution": languages_distribution,
+            "recent_activity": recent
+        }
+    
+    def search_submissions(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Get stories containing any query term, best BM25 score first"""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        
+        with self._cursor() as cursor:
+            where = self._where(cursor, filters)
+            if where is None:
+                return []
+            conditions, params = where
+            
+            matches = []
+            patterns = []
+            for term in terms:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                matches.extend(f"s.{field} ILIKE %s" for field in BACKEND_SEARCH_FIELDS)
+                patterns.extend([pattern] * len(BACKEND_SEARCH_FIELDS))
+            conditions.insert(0, "(" + " OR ".join(matches) + ")")
+            
+            cursor.execute(SELECT_RECORD + " WHERE " + " AND ".join(conditions), patterns + params)
+            records = [self._to_record(row) for row in cursor.fetchall()]
+        return rank_records(records, query, BACKEND_SEARCH_FIELDS)
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.closeall()
+
+_backends: Dict[str, PostgresBackend] = {}
+_backends_lock = threading.Lock()
+
+def get_postgres_backend(dsn: str, min_connections: int = 1, max_connections: int = 10) -> PostgresBackend:
+    """Get the process-wide backend for a DSN, creating its pool on first use"""
+    with _backends_lock:
+        backend = _backends.get(dsn)
+        if backend is None:
+            backend = PostgresBackend(dsn, min_connections, max_connections)
+            _backends[dsn] = backend
+        return backend
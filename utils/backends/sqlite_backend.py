@@ -0,0 +1,407 @@
+"""
+Embedded SQLite storage backend mirroring the stories and likes tables in scripts/
+"""
+
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.backends.base import BACKEND_SEARCH_FIELDS, PREVIEW_LENGTH, StorageBackend
+from utils.search_index import rank_records, tokenize
+
+# Mirrors scripts/004_create_stories.sql and 005_create_likes.sql. Language and
+# category are stored by name because the app works with names, not lookup ids;
+# location and cultural_context match the extra "submissions" worksheet columns.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  title TEXT NOT NULL,
+  content TEXT NOT NULL,
+  content_type TEXT NOT NULL,
+  language TEXT,
+  dialect TEXT,
+  english_translation TEXT,
+  ai_generated_translation INTEGER DEFAULT 0,
+  category TEXT,
+  ai_categorized INTEGER DEFAULT 0,
+  audio_url TEXT,
+  is_featured INTEGER DEFAULT 0,
+  likes_count INTEGER DEFAULT 0,
+  location TEXT,
+  cultural_context TEXT,
+  created_at TEXT NOT NULL,
+  updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_stories_user_id ON stories(user_id);
+CREATE INDEX IF NOT EXISTS idx_stories_language ON stories(language);
+CREATE INDEX IF NOT EXISTS idx_stories_category ON stories(category);
+DROP INDEX IF EXISTS idx_stories_created_at;
+CREATE INDEX IF NOT EXISTS idx_stories_created_at_id ON stories(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_stories_featured ON stories(is_featured) WHERE is_featured = 1;
+
+CREATE TABLE IF NOT EXISTS likes (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  story_id TEXT NOT NULL REFERENCES stories(id) ON DELETE CASCADE,
+  created_at TEXT NOT NULL,
+  UNIQUE(user_id, story_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_likes_user_id ON likes(user_id);
+CREATE INDEX IF NOT EXISTS idx_likes_story_id ON likes(story_id);
+
+CREATE TABLE IF NOT EXISTS interactions (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  submission_id TEXT NOT NULL,
+  interaction_type TEXT NOT NULL,
+  timestamp TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_interactions_submission_id ON interactions(submission_id);
+
+-- Same behaviour as update_story_likes_count() in scripts/008_create_triggers.sql
+CREATE TRIGGER IF NOT EXISTS trigger_update_likes_count_insert
+AFTER INSERT ON likes
+BEGIN
+  UPDATE stories SET likes_count = likes_count + 1 WHERE id = NEW.story_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trigger_update_likes_count_delete
+AFTER DELETE ON likes
+BEGIN
+  UPDATE stories SET likes_count = likes_count - 1 WHERE id = OLD.story_id;
+END;
+"""
+
+# Record field -> SQL column, for fields that can be filtered on
+FILTER_COLUMNS = {
+    "id": "id",
+    "user_id": "user_id",
+    "content_type": "content_type",
+    "language": "language",
+    "dialect": "dialect",
+    "category": "category",
+    "featured": "is_featured",
+    "ai_translated": "ai_generated_translation",
+    "ai_categorized": "ai_categorized",
+    "location": "location"
+}
+
+# Selects stories with the same field names as the "submissions" worksheet
+SELECT_RECORD = """
+SELECT id, created_at AS timestamp, user_id, title, content, content_type,
+       language, dialect, english_translation,
+       ai_generated_translation AS ai_translated, category, ai_categorized,
+       audio_url, likes_count AS likes, is_featured AS featured,
+       location, cultural_context
+FROM stories
+"""
+
+# Record field -> SQL expression, for reads that select only some fields
+SELECT_COLUMNS = {
+    "id": "id",
+    "timestamp": "created_at",
+    "user_id": "user_id",
+    "title": "title",
+    "content": "content",
+    "content_preview": f"substr(content, 1, {PREVIEW_LENGTH})",
+    "content_length": "length(content)",
+    "content_type": "content_type",
+    "language": "language",
+    "dialect": "dialect",
+    "english_translation": "english_translation",
+    "ai_translated": "ai_generated_translation",
+    "category": "category",
+    "ai_categorized": "ai_categorized",
+    "audio_url": "audio_url",
+    "likes": "likes_count",
+    "featured": "is_featured",
+    "location": "location",
+    "cultural_context": "cultural_context"
+}
+
+INSERT_STORY = """
+INSERT INTO stories (
+  id, user_id, title, content, content_type, language, dialect,
+  english_translation, ai_generated_translation, category, ai_categorized,
+  audio_url, is_featured, likes_count, location, cultural_context,
+  created_at, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 0, ?, ?, ?, ?)
+"""
+
+# Bulk and replayed inserts keep the caller's id and skip ids already stored
+INSERT_STORY_IF_NEW = INSERT_STORY.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+
+BOOLEAN_FIELDS = ("ai_translated", "ai_categorized", "featured")
+
+class SQLiteBackend(StorageBackend):
+    """
+    Stores submissions in a local SQLite database.
+    
+    Each thread gets its own connection in WAL mode so Streamlit sessions
+    can read while another writes. Queries are fixed, parameterised SQL so
+    sqlite3's statement cache reuses the prepared statements, and filters,
+    sorting and limits all run inside SQLite.
+    """
+    
+    is_local = True
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._connection().executescript(SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, cached_statements=256)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.create_function("casefold", 1, lambda text: (text or "").casefold(), deterministic=True)
+            self._local.connection = connection
+        return connection
+    
+    def _to_record(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a row into a submission record"""
+        record = dict(row)
+        for field in BOOLEAN_FIELDS:
+            if field in record:
+                record[field] = bool(record[field])
+        for field, value in record.items():
+            if value is None:
+                record[field] = ""
+        return record
+    
+    def _select(self, fields: Optional[List[str]]) -> str:
+        """SELECT_RECORD, or a SELECT of just the given fields; all fields if none of them are known"""
+        known = [field for field in fields or [] if field in SELECT_COLUMNS]
+        if not known:
+            return SELECT_RECORD
+        columns = ", ".join(f"{SELECT_COLUMNS[field]} AS {field}" for field in known)
+        return f"SELECT {columns}\nFROM stories\n"
+    
+    def _where(self, filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Translate record filters into SQL conditions; unknown keys are ignored like the Sheets path"""
+        conditions = []
+        params = []
+        for key, value in (filters or {}).items():
+            column = FILTER_COLUMNS.get(key)
+            if column is None:
+                continue
+            conditions.append(f"{column} = ?")
+            params.append(int(value) if isinstance(value, bool) else value)
+        return conditions, params
+    
+    def save_submission(self, submission_data: Dict[str, Any]) -> str:
+        """Insert a new story"""
+        submission_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
+        
+        with self._connection() as connection:
+            connection.execute(INSERT_STORY, self._story_params(submission_id, submission_data, now))
+        
+        return submission_id
+    
+    def save_submissions(self, submissions: List[Dict[str, Any]]) -> List[str]:
+        """Insert many stories in one transaction with executemany, skipping ids already stored"""
+        submission_ids = [submission_data.get("id") or str(uuid.uuid4()) for submission_data in submissions]
+        now = datetime.now(timezone.utc).isoformat()
+        
+        with self._connection() as connection:
+            connection.executemany(INSERT_STORY_IF_NEW, [
+                self._story_params(submission_id, submission_data, now)
+                for submission_id, submission_data in zip(submission_ids, submissions)
+            ])
+        
+        return submission_ids
+    
+    def _story_params(self, submission_id: str, submission_data: Dict[str, Any], now: str) -> Tuple[Any, ...]:
+        """Build INSERT_STORY parameters"""
+        return (
+            submission_id,
+            submission_data.get("user_id", "anonymous"),
+            submission_data.get("title", ""),
+            submission_data.get("content", ""),
+            submission_data.get("content_type", ""),
+            submission_data.get("language", ""),
+            submission_data.get("dialect", ""),
+            submission_data.get("english_translation", ""),
+            int(bool(submission_data.get("ai_translated", False))),
+            submission_data.get("category", ""),
+            int(bool(submission_data.get("ai_categorized", False))),
+            submission_data.get("audio_url", ""),
+            submission_data.get("location", ""),
+            submission_data.get("cultural_context", ""),
+            submission_data.get("timestamp") or now,
+            now
+        )
+    
+    def get_submissions(self, limit: int = 50, filters: Dict[str, Any] = None,
+                        after: Optional[Tuple[str, str]] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get the newest stories matching all filters, seeking past the (timestamp, id) cursor"""
+        conditions, params = self._where(filters)
+        if after:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(str(value) for value in after)
+        
+        sql = self._select(fields)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        
+        rows = self._connection().execute(sql, params + [limit]).fetchall()
+        return [self._to_record(row) for row in rows]
+    
+    def get_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Get one full story by id"""
+        row = self._connection().execute(SELECT_RECORD + " WHERE id = ?", (submission_id,)).fetchone()
+        return self._to_record(row) if row else None
+    
+    def update_submission_likes(self, submission_id: str, increment: int = 1) -> bool:
+        """Change the likes count in place without a read-modify-write"""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE stories SET likes_count = MAX(0, likes_count + ?), updated_at = ? WHERE id = ?",
+                (increment, datetime.now(timezone.utc).isoformat(), submission_id)
+            )
+        return cursor.rowcount > 0
+    
+    def record_like(self, submission_id: str, user_id: str) -> bool:
+        """Insert into likes; the trigger bumps likes_count, and repeat likes are ignored"""
+        now = datetime.now(timezone.utc).isoformat()
+        with self._connection() as connection:
+            exists = connection.execute("SELECT 1 FROM stories WHERE id = ?", (submission_id,)).fetchone()
+            if not exists:
+                return False
+            connection.execute(
+                "INSERT OR IGNORE INTO likes (id, user_id, story_id, created_at) VALUES (?, ?, ?, ?)",
+                (str(uuid.uuid4()), user_id, submission_id, now)
+            )
+            connection.execute(
+                "INSERT INTO interactions (id, user_id, submission_id, interaction_type, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (str(uuid.uuid4()), user_id, submission_id, "like", now)
+            )
+        return True
+    
+    def save_user_interaction(self, user_id: str, submission_id: str, interaction_type: str):
+        """Append an interaction"""
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO interactions (id, user_id, submission_id, interaction_type, timestamp) VALUES (?, ?, ?, ?, ?)",
+                (str(uuid.uuid4()), user_id, submission_id, interaction_type, datetime.now(timezone.utc).isoformat())
+            )
+    
+    def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Aggregate a user's stories using idx_stories_user_id"""
+        connection = self._connection()
+        totals = connection.execute(
+            "SELECT COUNT(*) AS total_submissions, COALESCE(SUM(likes_count), 0) AS total_likes FROM stories WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
+        languages = connection.execute(
+            "SELECT DISTINCT language FROM stories WHERE user_id = ? AND language != ''",
+            (user_id,)
+        ).fetchall()
+        categories = connection.execute(
+            "SELECT DISTINCT category FROM stories WHERE user_id = ? AND category != ''",
+            (user_id,)
+        ).fetchall()
+        days = {
+            row[0] for row in connection.execute(
+                "SELECT DISTINCT substr(created_at, 1, 10) FROM stories WHERE user_id = ?",
+                (user_id,)
+            )
+        }
+        
+        # Consecutive submission days ending today
+        streak = 0
+        today = datetime.now(timezone.utc).date()
+        while (today - timedelta(days=streak)).isoformat() in days:
+            streak += 1
+        
+        return {
+            "total_submissions": totals["total_submissions"],
+            "total_likes": totals["total_likes"],
+            "languages_used": [row[0] for row in languages],
+            "categories_used": [row[0] for row in categories],
+            "streak": streak,
+            "badges": []
+        }
+    
+    def get_analytics_data(self) -> Dict[str, Any]:
+        """Compute distributions with GROUP BY"""
+        connection = self._connection()
+        totals = connection.execute(
+            "SELECT COUNT(*) AS total_submissions, COUNT(DISTINCT user_id) AS total_users FROM stories"
+        ).fetchone()
+        languages = connection.execute(
+            "SELECT COALESCE(NULLIF(language, ''), 'Unknown') AS name, COUNT(*) FROM stories GROUP BY name"
+        ).fetchall()
+        categories = connection.execute(
+            "SELECT COALESCE(NULLIF(category, ''), 'Uncategorized') AS name, COUNT(*) FROM stories GROUP BY name"
+        ).fetchall()
+        recent = connection.execute(SELECT_RECORD + " ORDER BY created_at DESC LIMIT 10").fetchall()
+        
+        languages_distribution = {row[0]: row[1] for row in languages}
+        return {
+            "total_submissions": totals["total_submissions"],
+            "total_users": totals["total_users"],
+            "languages_count": len(languages_distribution),
+            "categories_distribution": {row[0]: row[1] for row in categories},
+            "languages_distribution": languages_distribution,
+            "recent_activity": [self._to_record(row) for row in recent]
+        }
+    
+    def search_submissions(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Get stories containing any query term, best BM25 score first"""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        
+        conditions, params = self._where(filters)
+        matches = []
+        needles = []
+        for term in terms:
+            matches.extend(f"instr(casefold({field}), ?) > 0" for field in BACKEND_SEARCH_FIELDS)
+            needles.extend([term] * len(BACKEND_SEARCH_FIELDS))
+        conditions.insert(0, "(" + " OR ".join(matches) + ")")
+        
+        sql = SELECT_RECORD + " WHERE " + " AND ".join(conditions)
+        rows = self._connection().execute(sql, needles + params).fetchall()
+        return rank_records([self._to_record(row) for row in rows], query, BACKEND_SEARCH_FIELDS)
+    
+    def close(self):
+        """Close this thread's connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+_backends: Dict[str, SQLiteBackend] = {}
+_backends_lock = threading.Lock()
+
+def get_sqlite_backend(path: str) -> SQLiteBackend:
+    """Get the process-wide backend for a database file, creating it on first use"""
+    key = os.path.abspath(path)
+    
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = SQLiteBackend(path)
+            _backends[key] = backend
+        return backend
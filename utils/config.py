@@ -9,10 +9,51 @@ class Config:
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
 
     # Database
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "sheets")  # "sheets", "sqlite" or "postgres"
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "data/bharat_voices.db")
+    POSTGRES_DSN: str = os.getenv("POSTGRES_DSN", "postgresql://localhost:5432/bharat_voices")
+    POSTGRES_POOL_MIN: int = int(os.getenv("POSTGRES_POOL_MIN", "1"))
+    POSTGRES_POOL_MAX: int = int(os.getenv("POSTGRES_POOL_MAX", "10"))
     GOOGLE_SHEETS_URL: str = os.getenv("GOOGLE_SHEETS_URL", "")
     GOOGLE_CREDENTIALS_PATH: str = os.getenv("GOOGLE_CREDENTIALS_PATH", "credentials.json")
     AIRTABLE_API_KEY: str = os.getenv("AIRTABLE_API_KEY", "")
     AIRTABLE_BASE_ID: str = os.getenv("AIRTABLE_BASE_ID", "")
+    AIRTABLE_REQUESTS_PER_SECOND: int = int(os.getenv("AIRTABLE_REQUESTS_PER_SECOND", "5"))
+
+    # Caching
+    SNAPSHOT_REFRESH_INTERVAL: int = int(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "30"))
+    SNAPSHOT_FULL_RELOAD_INTERVAL: int = int(os.getenv("SNAPSHOT_FULL_RELOAD_INTERVAL", "600"))
+    SNAPSHOT_STORE_DIR: str = os.getenv("SNAPSHOT_STORE_DIR", "data/snapshots")  # "" always loads the full sheet on start
+    SNAPSHOT_STORE_MAX_AGE: int = int(os.getenv("SNAPSHOT_STORE_MAX_AGE", "86400"))  # Older local copies are ignored
+    SUBMISSION_SHARD_BY: str = os.getenv("SUBMISSION_SHARD_BY", "month")  # "month", "rows" or "" for one worksheet
+    SUBMISSION_SHARD_MAX_ROWS: int = int(os.getenv("SUBMISSION_SHARD_MAX_ROWS", "50000"))
+    SUBMISSION_CLOSED_SHARD_RELOAD_INTERVAL: int = int(os.getenv("SUBMISSION_CLOSED_SHARD_RELOAD_INTERVAL", "3600"))
+    LIKE_FLUSH_INTERVAL: int = int(os.getenv("LIKE_FLUSH_INTERVAL", "5"))
+    LIKE_FLUSH_MAX_EVENTS: int = int(os.getenv("LIKE_FLUSH_MAX_EVENTS", "50"))
+    ANALYTICS_ROLLUP_INTERVAL: int = int(os.getenv("ANALYTICS_ROLLUP_INTERVAL", "300"))
+    USER_STATS_SYNC_INTERVAL: int = int(os.getenv("USER_STATS_SYNC_INTERVAL", "300"))
+    SUBMISSION_JOURNAL_PATH: str = os.getenv("SUBMISSION_JOURNAL_PATH", "data/submission_journal.db")  # "" writes submissions directly
+    SUBMISSION_JOURNAL_BATCH_SIZE: int = int(os.getenv("SUBMISSION_JOURNAL_BATCH_SIZE", "25"))
+    SUBMISSION_JOURNAL_MAX_ATTEMPTS: int = int(os.getenv("SUBMISSION_JOURNAL_MAX_ATTEMPTS", "5"))  # Then the entry is dead-lettered
+    INTERACTION_RETENTION_DAYS: int = int(os.getenv("INTERACTION_RETENTION_DAYS", "30"))  # Raw interactions kept before rollup
+    INTERACTION_COMPACTION_INTERVAL: int = int(os.getenv("INTERACTION_COMPACTION_INTERVAL", "86400"))
+    
+    # Duplicate detection
+    DUPLICATE_SIMILARITY_THRESHOLD: float = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.8"))
+    DUPLICATE_SCAN_LIMIT: int = int(os.getenv("DUPLICATE_SCAN_LIMIT", "100000"))  # Submissions indexed from a non-Sheets backend
+    
+    # API quotas
+    SHEETS_REQUESTS_PER_MINUTE: int = int(os.getenv("SHEETS_REQUESTS_PER_MINUTE", "60"))
+    SHEETS_BURST: int = int(os.getenv("SHEETS_BURST", "10"))
+    API_MAX_RETRIES: int = int(os.getenv("API_MAX_RETRIES", "5"))
+    
+    # Read failover to the Airtable mirror
+    READ_FAILOVER: bool = os.getenv("READ_FAILOVER", "True").lower() == "true"
+    READ_FAILOVER_MAX_ERROR_RATE: float = float(os.getenv("READ_FAILOVER_MAX_ERROR_RATE", "0.3"))  # Of the last 20 Sheets reads
+    READ_FAILOVER_MAX_LATENCY: float = float(os.getenv("READ_FAILOVER_MAX_LATENCY", "2.0"))  # Mean seconds of the last 20 Sheets reads
+    READ_FAILOVER_PROBE_INTERVAL: int = int(os.getenv("READ_FAILOVER_PROBE_INTERVAL", "30"))
+    READ_FAILOVER_SEARCH_LIMIT: int = int(os.getenv("READ_FAILOVER_SEARCH_LIMIT", "100"))  # Airtable records ranked per search
+    AIRTABLE_RECONCILE_FULL_SYNC_INTERVAL: int = int(os.getenv("AIRTABLE_RECONCILE_FULL_SYNC_INTERVAL", "86400"))  # Full Airtable listing, to catch deletions
 
     # AI
     HUGGINGFACE_API_KEY: str = os.getenv("HUGGINGFACE_API_KEY", "")
@@ -3,6 +3,7 @@ Database manager for Google Sheets and Airtable integration
 """
 
 import gspread
+from gspread.utils import rowcol_to_a1
 import pandas as pd
 from google.auth import default
 from google.oauth2.service_account import Credentials
@@ -10,13 +11,38 @@ import streamlit as st
 from datetime import datetime, timezone
 import json
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import os
-from pyairtable import Api
+from pyairtable import Api, Table
 from utils.config import Config
+from utils.sheet_snapshot import SheetSnapshot, get_snapshot
+from utils.sheet_frame import SUBMISSION_DTYPES, frame_from_records
+from utils.submission import Submission
+from utils.submission_journal import SubmissionJournal, get_submission_journal
+from utils.row_index import RowIndex, get_row_index
+from utils.like_buffer import LikeBuffer, get_like_buffer
+from utils.airtable_mirror import AirtableMirror, get_airtable_mirror, to_airtable_fields
+from utils.airtable_reader import AirtableReader
+from utils.reconciliation import AirtableReconciler, get_reconciler
+from utils.read_router import ReadRouter, get_read_router
+from utils.aggregates import SubmissionAggregates, get_aggregates
+from utils.duplicate_index import DuplicateIndex, get_duplicate_index
+from utils.interaction_compactor import ROLLUP_HEADERS, InteractionCompactor, get_interaction_compactor
+from utils.user_stats import UserStatsStore, get_user_stats_store
+from utils.request_loader import request_scoped, invalidates_request, get_request_loader, get_request_stats, call_key
+from utils.backends.base import SUBMISSION_FIELDS, SUBMISSION_LIST_FIELDS, create_backend, project_record
+from utils.worksheet_cache import WorksheetCache
+from utils.sharded_worksheet import ShardedWorksheet, get_sharded_worksheet
+from utils.quota import ANALYTICS, BACKGROUND, ScheduledProxy, get_scheduler, get_all_stats, lane
+
+# Submission fields the feed, profile and featured views filter on
+SUBMISSION_INDEX_FIELDS = ("language", "category", "content_type", "user_id", "featured")
+
+# Submission fields covered by full-text search
+SUBMISSION_SEARCH_FIELDS = ("title", "content", "english_translation", "cultural_context")
 
 class DatabaseManager:
-    """Manages data storage and retrieval from Google Sheets or Airtable"""
+    """Manages data storage and retrieval from Google Sheets, Airtable or a configured StorageBackend"""
     
     def __init__(self):
         self.config = Config()
@@ -24,7 +50,17 @@ class DatabaseManager:
         self.airtable_client = None
         self.spreadsheet = None
         self.base = None
-        self._initialize_clients()
+        self._snapshot = None
+        self._row_index = None
+        self._like_buffer = None
+        self._user_stats = None
+        self._duplicate_index = None
+        self._worksheets = None
+        self.backend = create_backend(self.config)
+        
+        # Google Sheets and Airtable are only used when no other backend is configured
+        if not self.backend:
+            self._initialize_clients()
     
     def _initialize_clients(self):
         """Initialize Google Sheets and Airtable clients"""
@@ -43,15 +79,41 @@ class DatabaseManager:
                 
                 # Open or create spreadsheet
                 try:
-                    self.spreadsheet = self.sheets_client.open("Bharat Voices Database")
+                    spreadsheet = self.sheets_client.open("Bharat Voices Database")
+                    created = False
                 except gspread.SpreadsheetNotFound:
-                    self.spreadsheet = self.sheets_client.create("Bharat Voices Database")
+                    spreadsheet = self.sheets_client.create("Bharat Voices Database")
+                    created = True
+                
+                # Every Sheets request is admitted through the quota scheduler for this credential
+                sheets_scheduler = get_scheduler(
+                    "sheets",
+                    creds.service_account_email,
+                    rate=self.config.SHEETS_REQUESTS_PER_MINUTE / 60,
+                    burst=self.config.SHEETS_BURST,
+                    max_retries=self.config.API_MAX_RETRIES
+                )
+                self.spreadsheet = ScheduledProxy(spreadsheet, sheets_scheduler, wrap_types=(gspread.Worksheet,))
+                
+                if created:
                     self._setup_sheets()
             
             # Initialize Airtable
             if self.config.AIRTABLE_API_KEY and self.config.AIRTABLE_BASE_ID:
                 self.airtable_client = Api(self.config.AIRTABLE_API_KEY)
-                self.base = self.airtable_client.base(self.config.AIRTABLE_BASE_ID)
+                airtable_scheduler = get_scheduler(
+                    "airtable",
+                    self.config.AIRTABLE_BASE_ID,
+                    rate=self.config.AIRTABLE_REQUESTS_PER_SECOND,
+                    burst=self.config.AIRTABLE_REQUESTS_PER_SECOND,
+                    max_retries=self.config.API_MAX_RETRIES
+                )
+                self.base = ScheduledProxy(
+                    self.airtable_client.base(self.config.AIRTABLE_BASE_ID),
+                    airtable_scheduler,
+                    local=("table",),
+                    wrap_types=(Table,)
+                )
                 
         except Exception as e:
             st.error(f"Database initialization error: {str(e)}")
@@ -74,6 +136,7 @@ class DatabaseManager:
                 "interactions": [
                     "id", "user_id", "submission_id", "interaction_type", "timestamp"
                 ],
+                "interaction_rollups": ROLLUP_HEADERS,
                 "analytics": [
                     "date", "total_submissions", "new_users", "active_users",
                     "top_language", "top_category", "featured_story"
@@ -81,98 +144,508 @@ class DatabaseManager:
             }
             
             for sheet_name, headers in worksheets.items():
-                try:
-                    worksheet = self.spreadsheet.worksheet(sheet_name)
-                except gspread.WorksheetNotFound:
-                    worksheet = self.spreadsheet.add_worksheet(
-                        title=sheet_name, 
-                        rows=1000, 
-                        cols=len(headers)
-                    )
-                    worksheet.append_row(headers)
+                self._ensure_worksheet(sheet_name, headers)
                     
         except Exception as e:
             st.error(f"Sheet setup error: {str(e)}")
     
+    def _ensure_worksheet(self, title: str, headers: List[str]) -> gspread.Worksheet:
+        """Get a worksheet, creating it with a header row if the spreadsheet does not have it yet"""
+        try:
+            return self._worksheet(title)
+        except gspread.WorksheetNotFound:
+            worksheet = self.spreadsheet.add_worksheet(
+                title=title, 
+                rows=1000, 
+                cols=len(headers)
+            )
+            worksheet.append_row(headers)
+            self._worksheets.add(title, worksheet)
+            return worksheet
+    
+    def _worksheet(self, title: str) -> gspread.Worksheet:
+        """Get a cached worksheet handle; the first lookup lists all worksheets in one call"""
+        if self._worksheets is None:
+            self._worksheets = WorksheetCache(self.spreadsheet)
+        return self._worksheets.get(title)
+    
+    def _worksheet_headers(self, title: str) -> List[str]:
+        """Get a worksheet's cached header row"""
+        self._worksheet(title)
+        return self._worksheets.headers(title)
+    
+    def _invalidate_worksheets(self):
+        """Re-resolve worksheets and headers after a Sheets error, in case one was renamed or removed"""
+        if self._worksheets is not None:
+            self._worksheets.invalidate()
+    
+    def _submissions_worksheet(self):
+        """Get the submissions worksheet, or its shards behind one worksheet-like handle"""
+        worksheet = self._worksheet("submissions")
+        if not self.config.SUBMISSION_SHARD_BY:
+            return worksheet
+        
+        return get_sharded_worksheet(
+            self._worksheets,
+            "submissions",
+            shard_by=self.config.SUBMISSION_SHARD_BY,
+            max_rows=self.config.SUBMISSION_SHARD_MAX_ROWS,
+            closed_reload_interval=self.config.SUBMISSION_CLOSED_SHARD_RELOAD_INTERVAL
+        )
+    
+    def _get_snapshot(self) -> Optional[SheetSnapshot]:
+        """Get the process-wide snapshot of the submissions worksheet"""
+        if not self.spreadsheet:
+            return None
+        
+        if self._snapshot is None:
+            worksheet = self._submissions_worksheet()
+            
+            # A local copy of the last full load lets a fresh process start without downloading the sheet
+            store = None
+            if self.config.SNAPSHOT_STORE_DIR:
+                from utils.snapshot_store import get_snapshot_store
+                store = get_snapshot_store(self.config.SNAPSHOT_STORE_DIR, worksheet, self.config.SNAPSHOT_STORE_MAX_AGE)
+            
+            self._snapshot = get_snapshot(
+                worksheet,
+                refresh_interval=self.config.SNAPSHOT_REFRESH_INTERVAL,
+                full_reload_interval=self.config.SNAPSHOT_FULL_RELOAD_INTERVAL,
+                indexed_fields=SUBMISSION_INDEX_FIELDS,
+                search_fields=SUBMISSION_SEARCH_FIELDS,
+                dtypes=SUBMISSION_DTYPES,
+                record_type=Submission,
+                store=store
+            )
+        
+        return self._snapshot
+    
+    def _get_row_index(self) -> Optional[RowIndex]:
+        """Get the process-wide id-to-row index of the submissions worksheet"""
+        if not self.spreadsheet:
+            return None
+        
+        if self._row_index is None:
+            self._row_index = get_row_index(self._get_snapshot().worksheet)
+        
+        return self._row_index
+    
+    def _get_like_buffer(self) -> Optional[LikeBuffer]:
+        """Get the process-wide write-behind buffer for likes and interactions"""
+        if not self.spreadsheet:
+            return None
+        
+        if self._like_buffer is None:
+            self._like_buffer = get_like_buffer(
+                self._get_snapshot().worksheet,
+                self._worksheet("interactions"),
+                self._get_row_index(),
+                self._get_snapshot(),
+                flush_interval=self.config.LIKE_FLUSH_INTERVAL,
+                max_events=self.config.LIKE_FLUSH_MAX_EVENTS
+            )
+        
+        return self._like_buffer
+    
+    def _get_airtable_mirror(self) -> Optional[AirtableMirror]:
+        """Get the process-wide background mirror of the Airtable Submissions table"""
+        if not self.base:
+            return None
+        
+        return get_airtable_mirror(self.base, "Submissions")
+    
+    def _get_read_router(self) -> Optional[ReadRouter]:
+        """Get the process-wide router between Sheets and the Airtable mirror, if both are configured"""
+        if not (self.spreadsheet and self.base and self.config.READ_FAILOVER):
+            return None
+        
+        return get_read_router(
+            f"{self.spreadsheet.id}/{self.base.id}",
+            max_error_rate=self.config.READ_FAILOVER_MAX_ERROR_RATE,
+            max_latency=self.config.READ_FAILOVER_MAX_LATENCY,
+            probe_interval=self.config.READ_FAILOVER_PROBE_INTERVAL
+        )
+    
+    def _airtable_reader(self) -> AirtableReader:
+        """Reader over the Airtable Submissions mirror"""
+        return AirtableReader(self.base.table("Submissions"), self.config.READ_FAILOVER_SEARCH_LIMIT)
+    
+    def _read_sheets(self, from_sheets, from_airtable, filters: Optional[Dict[str, Any]]) -> Any:
+        """
+        Serve a read from Sheets, or from the Airtable mirror when Sheets is throttled or slow
+        
+        Filters on fields Airtable does not mirror (e.g. ``featured``) are
+        always answered by Sheets.
+        """
+        router = self._get_read_router()
+        if not router:
+            return from_sheets()
+        
+        reader = self._airtable_reader()
+        fallback = (lambda: from_airtable(reader)) if reader.can_filter(filters) else None
+        result, _ = router.read(from_sheets, fallback)
+        return result
+    
+    def get_read_stats(self) -> Dict[str, Any]:
+        """Get reads served by Sheets and by the Airtable mirror, and each one's recent health"""
+        router = self._get_read_router()
+        return router.get_stats() if router else {}
+    
+    def _get_reconciler(self) -> Optional[AirtableReconciler]:
+        """Get the process-wide reconciler between the submissions snapshot and the Airtable mirror"""
+        snapshot = self._get_snapshot()
+        if not (snapshot and self.base):
+            return None
+        
+        return get_reconciler(
+            snapshot,
+            self.base,
+            self._get_airtable_mirror(),
+            "Submissions",
+            full_sync_interval=self.config.AIRTABLE_RECONCILE_FULL_SYNC_INTERVAL
+        )
+    
+    def _get_aggregates(self) -> Optional[SubmissionAggregates]:
+        """Get the process-wide analytics aggregates kept in step with the snapshot"""
+        snapshot = self._get_snapshot()
+        return get_aggregates(snapshot) if snapshot else None
+    
+    def _get_duplicate_index(self) -> Optional[DuplicateIndex]:
+        """Get the near-duplicate index over submission content"""
+        snapshot = self._get_snapshot()
+        if snapshot:
+            return get_duplicate_index(snapshot)
+        
+        if self.backend and self._duplicate_index is None:
+            # Backends have no snapshot to follow, so index their content once and add saves as they happen
+            index = DuplicateIndex()
+            index.rebuild(self.backend.get_submissions(self.config.DUPLICATE_SCAN_LIMIT, fields=["id", "content"]))
+            self._duplicate_index = index
+        
+        return self._duplicate_index
+    
+    def _get_interaction_compactor(self) -> Optional[InteractionCompactor]:
+        """Get the process-wide compactor of the interactions worksheet"""
+        if not self.spreadsheet:
+            return None
+        
+        return get_interaction_compactor(
+            self._worksheet("interactions"),
+            self._ensure_worksheet("interaction_rollups", ROLLUP_HEADERS),
+            retention_days=self.config.INTERACTION_RETENTION_DAYS
+        )
+    
+    def _get_user_stats_store(self) -> Optional[UserStatsStore]:
+        """Get the process-wide per-user stats kept in step with the snapshot"""
+        snapshot = self._get_snapshot()
+        if not snapshot:
+            return None
+        
+        if self._user_stats is None:
+            self._user_stats = get_user_stats_store(snapshot, self._worksheet("users"))
+        
+        return self._user_stats
+    
+    def _sync_user_stats(self, store: UserStatsStore, force: bool = False):
+        """Have the store's background writer save changed user stats now and then"""
+        store.schedule_persist(self.config.USER_STATS_SYNC_INTERVAL, force=force)
+    
+    def _get_submission_records(self, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Get submission records from the snapshot, using its indexes for filters (read-only)"""
+        snapshot = self._get_snapshot()
+        if not snapshot:
+            return []
+        return snapshot.select(filters) if filters else snapshot.get_records()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get staleness and refresh cost of the submissions snapshot"""
+        snapshot = self._get_snapshot()
+        return snapshot.get_stats() if snapshot else {}
+    
+    def get_shard_stats(self) -> Dict[str, Any]:
+        """Get the submissions shards and their sizes, if submissions are sharded"""
+        snapshot = self._get_snapshot()
+        worksheet = snapshot.worksheet if snapshot else None
+        return worksheet.get_stats() if isinstance(worksheet, ShardedWorksheet) else {}
+    
+    def get_like_buffer_stats(self) -> Dict[str, Any]:
+        """Get flush size, latency and backlog of the like buffer"""
+        like_buffer = self._get_like_buffer()
+        return like_buffer.get_stats() if like_buffer else {}
+    
+    def get_user_stats_sync_stats(self) -> Dict[str, Any]:
+        """Get write counts and backlog of the user stats writer"""
+        store = self._get_user_stats_store()
+        return store.get_stats() if store else {}
+    
+    def get_quota_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get request rates, waits, retries and quota usage per API credential"""
+        return get_all_stats()
+    
+    def get_compaction_stats(self) -> Dict[str, Any]:
+        """Get totals and the last report of interaction compaction"""
+        compactor = self._get_interaction_compactor()
+        return compactor.get_stats() if compactor else {}
+    
+    def compact_interactions(self) -> Dict[str, Any]:
+        """
+        Fold interactions older than INTERACTION_RETENTION_DAYS into daily rollups now
+        
+        Returns the run's report: rows compacted, rollup rows written and
+        cells reclaimed and remaining. Only the Sheets store needs this;
+        database tables have no cell limit.
+        """
+        try:
+            compactor = self._get_interaction_compactor()
+            if not compactor:
+                return {}
+            with lane(ANALYTICS):
+                return compactor.compact()
+        
+        except Exception as e:
+            self._invalidate_worksheets()
+            st.error(f"Error compacting interactions: {str(e)}")
+            return {}
+    
+    def get_reconcile_stats(self) -> Dict[str, Any]:
+        """Get totals and the last report of Sheets/Airtable reconciliation"""
+        reconciler = self._get_reconciler()
+        return reconciler.get_stats() if reconciler else {}
+    
+    def reconcile_airtable(self, repair: bool = True, delete_extra: bool = False) -> Dict[str, Any]:
+        """
+        Find submissions that differ between Sheets and the Airtable mirror, and re-send them
+        
+        Returns the check's report: ids missing from Airtable, only in
+        Airtable, and different, with the records fetched to find them.
+        Sheets is the source of truth; records only in Airtable are deleted
+        only with ``delete_extra``, once the sheet itself confirms they are
+        absent.
+        """
+        try:
+            reconciler = self._get_reconciler()
+            if not reconciler:
+                return {}
+            row_index = self._get_row_index()
+            
+            def confirm_extra(submission_ids: List[str]) -> List[str]:
+                # Looked up in the sheet, so rows appended since the last refresh are found
+                row_index.invalidate()
+                return [submission_id for submission_id in submission_ids if row_index.find_row(submission_id) is None]
+            
+            with lane(BACKGROUND):
+                return reconciler.reconcile(self._get_snapshot().get_records(), repair, delete_extra, confirm_extra)
+        
+        except Exception as e:
+            st.error(f"Error reconciling with Airtable: {str(e)}")
+            return {}
+    
+    def get_mirror_stats(self) -> Dict[str, Any]:
+        """Get queue depth and throughput of the Airtable mirror"""
+        mirror = self._get_airtable_mirror()
+        return mirror.get_stats() if mirror else {}
+    
+    @invalidates_request
     def save_submission(self, submission_data: Dict[str, Any]) -> str:
-        """Save a new submission to the database"""
+        """
+        Save a new submission to the database
+        
+        With the submission journal enabled the submission is committed to
+        the local journal and written to the primary store in the
+        background, so saving does not wait on Sheets or Postgres.
+        """
         try:
+            journal = self._get_journal()
+            if self.backend and journal is None:
+                submission_id = self.backend.save_submission(submission_data)
+                self._index_duplicate(submission_id, submission_data.get("content", ""))
+                return submission_id
+            
             # Generate unique ID
             submission_id = str(uuid.uuid4())
             
             # Prepare data
-            row_data = [
-                submission_id,
-                datetime.now(timezone.utc).isoformat(),
-                submission_data.get("user_id", "anonymous"),
-                submission_data.get("title", ""),
-                submission_data.get("content", ""),
-                submission_data.get("content_type", ""),
-                submission_data.get("language", ""),
-                submission_data.get("dialect", ""),
-                submission_data.get("english_translation", ""),
-                submission_data.get("ai_translated", False),
-                submission_data.get("category", ""),
-                submission_data.get("ai_categorized", False),
-                submission_data.get("audio_url", ""),
-                0,  # initial likes
-                False,  # not featured initially
-                submission_data.get("location", ""),
-                submission_data.get("cultural_context", "")
-            ]
-            
-            # Save to Google Sheets
-            if self.spreadsheet:
-                worksheet = self.spreadsheet.worksheet("submissions")
-                worksheet.append_row(row_data)
-            
-            # Save to Airtable (if configured)
-            if self.base:
-                airtable_data = {
-                    "ID": submission_id,
-                    "Timestamp": datetime.now(timezone.utc).isoformat(),
-                    "User ID": submission_data.get("user_id", "anonymous"),
-                    "Title": submission_data.get("title", ""),
-                    "Content": submission_data.get("content", ""),
-                    "Content Type": submission_data.get("content_type", ""),
-                    "Language": submission_data.get("language", ""),
-                    "English Translation": submission_data.get("english_translation", ""),
-                    "Category": submission_data.get("category", ""),
-                    "Likes": 0
-                }
-                self.base.table("Submissions").create(airtable_data)
+            values = {
+                "id": submission_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "user_id": submission_data.get("user_id", "anonymous"),
+                "title": submission_data.get("title", ""),
+                "content": submission_data.get("content", ""),
+                "content_type": submission_data.get("content_type", ""),
+                "language": submission_data.get("language", ""),
+                "dialect": submission_data.get("dialect", ""),
+                "english_translation": submission_data.get("english_translation", ""),
+                "ai_translated": submission_data.get("ai_translated", False),
+                "category": submission_data.get("category", ""),
+                "ai_categorized": submission_data.get("ai_categorized", False),
+                "audio_url": submission_data.get("audio_url", ""),
+                "likes": 0,  # initial likes
+                "featured": False,  # not featured initially
+                "location": submission_data.get("location", ""),
+                "cultural_context": submission_data.get("cultural_context", "")
+            }
+            
+            if journal:
+                journal.append(values)
+            else:
+                self._write_submissions([values], skip_existing=False)
             
+            # Count it as a duplicate source now, not once the snapshot picks it up
+            self._index_duplicate(submission_id, values["content"])
             return submission_id
             
         except Exception as e:
             st.error(f"Error saving submission: {str(e)}")
             return ""
     
-    def get_submissions(self, limit: int = 50, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Retrieve submissions from database"""
+    def _index_duplicate(self, submission_id: str, content: str):
+        """Add a just-saved submission to the duplicate index; a failure here must not fail the save"""
+        if not submission_id:
+            return
+        try:
+            index = self._get_duplicate_index()
+            if index:
+                index.add(submission_id, content)
+        except Exception as e:
+            st.warning(f"Could not index submission for duplicate checks: {str(e)}")
+    
+    def find_duplicates(self, content: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Find saved submissions whose content nearly matches, most similar first
+        
+        Returns list-view fields of each match plus its estimated
+        "similarity" (0-1). Meant to run before translation and
+        categorization, so repeats are caught before any model is called.
+        """
         try:
+            index = self._get_duplicate_index()
+            if not index or not str(content or "").strip():
+                return []
+            
+            duplicates = []
+            for submission_id, similarity in index.query(content, self.config.DUPLICATE_SIMILARITY_THRESHOLD, limit):
+                # Submissions still in the journal are not readable yet
+                submission = self.get_submission(submission_id) or {"id": submission_id}
+                duplicate = project_record(submission, SUBMISSION_LIST_FIELDS)
+                duplicate["similarity"] = similarity
+                duplicates.append(duplicate)
+            return duplicates
+        
+        except Exception as e:
+            st.error(f"Error checking for duplicates: {str(e)}")
+            return []
+    
+    def _get_journal(self) -> Optional[SubmissionJournal]:
+        """Get the process-wide journal that stands between submit and a remote primary store"""
+        if not self.config.SUBMISSION_JOURNAL_PATH:
+            return None
+        if not (self.spreadsheet or (self.backend and not self.backend.is_local)):
+            return None
+        
+        return get_submission_journal(
+            self.config.SUBMISSION_JOURNAL_PATH,
+            self._write_submissions,
+            batch_size=self.config.SUBMISSION_JOURNAL_BATCH_SIZE,
+            max_attempts=self.config.SUBMISSION_JOURNAL_MAX_ATTEMPTS
+        )
+    
+    def _write_submissions(self, submissions: List[Dict[str, Any]], skip_existing: bool = True):
+        """
+        Write prepared submissions to the primary store
+        
+        The journal replays through this with ``skip_existing``, so ids the
+        sheet already has are not appended again. Raises on failure so the
+        journal keeps the batch and tries again.
+        """
+        if self.backend:
+            self.backend.save_submissions(submissions)
+            return
+        
+        # Save to Google Sheets
+        if self.spreadsheet:
+            try:
+                row_index = self._get_row_index()
+                new_submissions = submissions
+                if skip_existing:
+                    missing = set(row_index.missing([submission["id"] for submission in submissions]))
+                    new_submissions = [submission for submission in submissions if submission["id"] in missing]
+                
+                if new_submissions:
+                    # Lay the rows out by the sheet's own header order
+                    headers = self._worksheet_headers("submissions") or SUBMISSION_FIELDS
+                    rows = [[submission.get(header, "") for header in headers] for submission in new_submissions]
+                    
+                    snapshot = self._get_snapshot()
+                    response = snapshot.worksheet.append_rows(rows)
+                    snapshot.invalidate()
+                    row_index.add_from_append_rows([submission["id"] for submission in new_submissions], response)
+            
+            except Exception:
+                self._invalidate_worksheets()
+                raise
+        
+        # Mirror to Airtable in the background (if configured); upserts on ID are idempotent
+        if self.base:
+            for submission in submissions:
+                self._get_airtable_mirror().enqueue(to_airtable_fields(submission))
+    
+    def get_journal_stats(self) -> Dict[str, Any]:
+        """Get backlog and replay throughput of the submission journal"""
+        journal = self._get_journal()
+        return journal.get_stats() if journal else {}
+    
+    def get_journal_dead_letters(self) -> List[Dict[str, Any]]:
+        """Get the submissions the journal gave up replaying"""
+        journal = self._get_journal()
+        return journal.dead_letters() if journal else []
+    
+    def requeue_journal_dead_letters(self) -> int:
+        """Put dead-lettered submissions back in the journal for another try"""
+        journal = self._get_journal()
+        return journal.requeue_dead_letters() if journal else 0
+    
+    def is_submission_pending(self, submission_id: str) -> bool:
+        """Check whether a saved submission is still in the journal, dead-lettered or not"""
+        journal = self._get_journal()
+        return journal.is_pending(submission_id) if journal else False
+    
+    def is_submission_dead_lettered(self, submission_id: str) -> bool:
+        """Check whether the journal gave up replaying a saved submission"""
+        journal = self._get_journal()
+        return journal.is_dead_lettered(submission_id) if journal else False
+    
+    @request_scoped
+    def get_submissions(self, limit: int = 50, filters: Dict[str, Any] = None,
+                        after: Optional[Tuple[str, str]] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve submissions from database, newest first
+        
+        Args:
+            limit: Page size
+            filters: Field values every submission must match
+            after: (timestamp, id) of the last submission on the previous page
+            fields: Fields to return, e.g. SUBMISSION_LIST_FIELDS; all if not given
+        """
+        try:
+            if self.backend:
+                return self.backend.get_submissions(limit, filters, after, fields)
+            
             submissions = []
             
             if self.spreadsheet:
-                worksheet = self.spreadsheet.worksheet("submissions")
-                records = worksheet.get_all_records()
-                
-                # Apply filters
-                if filters:
-                    filtered_records = []
-                    for record in records:
-                        match = True
-                        for key, value in filters.items():
-                            if key in record and record[key] != value:
-                                match = False
-                                break
-                        if match:
-                            filtered_records.append(record)
-                    records = filtered_records
-                
-                # Sort by timestamp (newest first) and limit
-                records = sorted(records, key=lambda x: x.get("timestamp", ""), reverse=True)
-                submissions = records[:limit]
+                submissions = self._read_sheets(
+                    lambda: self._get_snapshot().page(filters, limit, after),
+                    lambda reader: reader.get_submissions(limit, filters, after, fields),
+                    filters
+                )
+                if fields:
+                    # The snapshot already holds full rows for search and
+                    # analytics, so projection only trims what callers copy
+                    submissions = [project_record(submission, fields) for submission in submissions]
+                else:
+                    # Plain dicts, so pages can serialise them (json, st.json, Airtable)
+                    submissions = [dict(submission) for submission in submissions]
             
             return submissions
             
@@ -180,73 +653,193 @@ class DatabaseManager:
             st.error(f"Error retrieving submissions: {str(e)}")
             return []
     
+    def get_submissions_frame(self, limit: int = 1000, since: Optional[datetime] = None,
+                              until: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Get submissions as a DataFrame with SUBMISSION_DTYPES for vectorized filtering
+        
+        The Sheets path returns every row of the snapshot; other backends
+        return the newest ``limit`` submissions. ``since`` and ``until``
+        (timezone-aware) keep submissions timestamped in that range; when
+        submissions are sharded, only rows of the shards that overlap the
+        range are scanned.
+        """
+        try:
+            if self.backend:
+                frame = frame_from_records(self.backend.get_submissions(limit), SUBMISSION_DTYPES)
+            elif self.spreadsheet:
+                snapshot = self._get_snapshot()
+                frame = snapshot.get_frame()
+                if (since is not None or until is not None) and isinstance(snapshot.worksheet, ShardedWorksheet):
+                    spans = snapshot.worksheet.spans_between(since, until)
+                    frame = pd.concat([frame.iloc[start:stop] for start, stop in spans]) if spans else frame.iloc[0:0]
+            else:
+                return pd.DataFrame()
+            
+            if frame.empty:
+                return frame
+            if since is not None:
+                frame = frame[frame["timestamp"] >= since]
+            if until is not None:
+                frame = frame[frame["timestamp"] <= until]
+            return frame
+        
+        except Exception as e:
+            st.error(f"Error retrieving submissions: {str(e)}")
+            return pd.DataFrame()
+    
+    @request_scoped
+    def get_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Get one full submission, e.g. when a list view card is expanded"""
+        try:
+            if self.backend:
+                return self.backend.get_submission(submission_id)
+            
+            if not self.spreadsheet:
+                return None
+            
+            snapshot = self._get_snapshot()
+            records = snapshot.get_records()
+            row_number = self._get_row_index().find_row(submission_id)
+            if row_number is not None and 0 <= row_number - 2 < len(records):
+                record = records[row_number - 2]
+                if str(record.get("id")) == submission_id:
+                    return dict(record)
+            
+            # Row numbers shift if rows are deleted; fall back to a scan
+            matches = [record for record in records if str(record.get("id")) == submission_id]
+            return dict(matches[0]) if matches else None
+        
+        except Exception as e:
+            st.error(f"Error retrieving submission: {str(e)}")
+            return None
+    
+    @invalidates_request
     def update_submission_likes(self, submission_id: str, increment: int = 1) -> bool:
         """Update likes count for a submission"""
         try:
+            if self.backend:
+                return self.backend.update_submission_likes(submission_id, increment)
+            
             if self.spreadsheet:
-                worksheet = self.spreadsheet.worksheet("submissions")
-                records = worksheet.get_all_records()
+                snapshot = self._get_snapshot()
+                row_index = self._get_row_index()
                 
-                for i, record in enumerate(records, start=2):  # Start from row 2 (after header)
-                    if record.get("id") == submission_id:
-                        current_likes = int(record.get("likes", 0))
-                        new_likes = max(0, current_likes + increment)
-                        worksheet.update_cell(i, 14, new_likes)  # Column 14 is likes
-                        return True
+                for attempt in range(2):
+                    row_number = row_index.find_row(submission_id)
+                    if row_number is None:
+                        return False
+                    
+                    id_col = row_index.column("id")
+                    likes_col = row_index.column("likes")
+                    
+                    # Read the id and likes cells together to confirm the row hasn't moved
+                    id_range, likes_range = snapshot.worksheet.batch_get([
+                        rowcol_to_a1(row_number, id_col),
+                        rowcol_to_a1(row_number, likes_col)
+                    ])
+                    stored_id = id_range[0][0] if id_range and id_range[0] else ""
+                    
+                    if stored_id != submission_id:
+                        row_index.invalidate()
+                        continue
+                    
+                    current_likes = int(likes_range[0][0] or 0) if likes_range and likes_range[0] else 0
+                    new_likes = max(0, current_likes + increment)
+                    snapshot.worksheet.update_cell(row_number, likes_col, new_likes)
+                    
+                    # Keep buffered likes not yet written on top of the new count
+                    with snapshot.hold():
+                        pending = self._get_like_buffer().outstanding().get(submission_id, 0)
+                        snapshot.update_local(row_number, "likes", max(0, new_likes + pending))
+                    return True
             
             return False
             
         except Exception as e:
+            self._invalidate_worksheets()
             st.error(f"Error updating likes: {str(e)}")
             return False
     
+    @invalidates_request
+    def queue_like(self, submission_id: str, user_id: str, increment: int = 1) -> bool:
+        """
+        Record a like and its interaction through the write-behind buffer
+        
+        The cached likes count is updated immediately; the sheet is written
+        on the buffer's next flush.
+        """
+        try:
+            if self.backend:
+                return self.backend.record_like(submission_id, user_id)
+            
+            if self.spreadsheet:
+                row_number = self._get_row_index().find_row(submission_id)
+                if row_number is None:
+                    return False
+                
+                interaction_data = self._build_interaction_row(user_id, submission_id, "like")
+                self._get_like_buffer().record(submission_id, increment, interaction_data, row_number)
+                return True
+            
+            return False
+        
+        except Exception as e:
+            self._invalidate_worksheets()
+            st.error(f"Error recording like: {str(e)}")
+            return False
+    
+    def _build_interaction_row(self, user_id: str, submission_id: str, interaction_type: str) -> List[Any]:
+        """Build a row for the interactions worksheet, in its header order"""
+        values = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "submission_id": submission_id,
+            "interaction_type": interaction_type,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        headers = self._worksheet_headers("interactions") if self.spreadsheet else []
+        return [values.get(header, "") for header in headers or values]
+    
+    @invalidates_request
     def save_user_interaction(self, user_id: str, submission_id: str, interaction_type: str):
         """Save user interaction (like, share, etc.)"""
         try:
-            interaction_data = [
-                str(uuid.uuid4()),
-                user_id,
-                submission_id,
-                interaction_type,
-                datetime.now(timezone.utc).isoformat()
-            ]
+            if self.backend:
+                return self.backend.save_user_interaction(user_id, submission_id, interaction_type)
+            
+            interaction_data = self._build_interaction_row(user_id, submission_id, interaction_type)
             
             if self.spreadsheet:
-                worksheet = self.spreadsheet.worksheet("interactions")
+                worksheet = self._worksheet("interactions")
                 worksheet.append_row(interaction_data)
                 
         except Exception as e:
+            self._invalidate_worksheets()
             st.error(f"Error saving interaction: {str(e)}")
     
+    @request_scoped
     def get_user_stats(self, user_id: str) -> Dict[str, Any]:
         """Get user statistics"""
         try:
+            if self.backend:
+                return self.backend.get_user_stats(user_id)
+            
             stats = {
                 "total_submissions": 0,
                 "total_likes": 0,
-                "languages_used": set(),
-                "categories_used": set(),
+                "languages_used": [],
+                "categories_used": [],
                 "streak": 0,
                 "badges": []
             }
             
             if self.spreadsheet:
-                # Get submissions by user
-                worksheet = self.spreadsheet.worksheet("submissions")
-                records = worksheet.get_all_records()
-                
-                user_submissions = [r for r in records if r.get("user_id") == user_id]
-                stats["total_submissions"] = len(user_submissions)
-                
-                for submission in user_submissions:
-                    stats["total_likes"] += int(submission.get("likes", 0))
-                    if submission.get("language"):
-                        stats["languages_used"].add(submission["language"])
-                    if submission.get("category"):
-                        stats["categories_used"].add(submission["category"])
-                
-                stats["languages_used"] = list(stats["languages_used"])
-                stats["categories_used"] = list(stats["categories_used"])
+                # Kept current as submissions load and likes change, so this is one lookup
+                store = self._get_user_stats_store()
+                self._get_snapshot().get_records()
+                stats = store.get(user_id)
+                self._sync_user_stats(store)
             
             return stats
             
@@ -254,9 +847,73 @@ class DatabaseManager:
             st.error(f"Error getting user stats: {str(e)}")
             return {}
     
+    def get_user_stats_many(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get statistics for several users
+        
+        Within a script run, users already loaded by get_user_stats() are
+        served from the run's cache and the rest are fetched together.
+        """
+        def fetch_many(keys):
+            users = {key: key[0][0] for key in keys}
+            stats = self._fetch_user_stats_many(list(users.values()))
+            return {key: stats.get(user_id, {}) for key, user_id in users.items()}
+        
+        loader = get_request_loader()
+        if loader is None:
+            return self._fetch_user_stats_many(user_ids)
+        
+        keys = {user_id: call_key(user_id) for user_id in user_ids}
+        results = loader.load_many("get_user_stats", keys.values(), fetch_many)
+        return {user_id: results[key] for user_id, key in keys.items()}
+    
+    def _fetch_user_stats_many(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several users with one snapshot refresh"""
+        try:
+            if self.backend:
+                return {user_id: self.backend.get_user_stats(user_id) for user_id in user_ids}
+            
+            if self.spreadsheet:
+                store = self._get_user_stats_store()
+                self._get_snapshot().get_records()
+                return {user_id: store.get(user_id) for user_id in user_ids}
+            
+            return {}
+        
+        except Exception as e:
+            st.error(f"Error getting user stats: {str(e)}")
+            return {}
+    
+    def get_request_stats(self) -> Dict[str, Any]:
+        """Get per-method call and fetch counts for this and the previous script run"""
+        return get_request_stats()
+    
+    @invalidates_request
+    def award_badge(self, user_id: str, badge_key: str) -> bool:
+        """Store a newly earned badge in the user's stats"""
+        try:
+            if self.backend:
+                return False
+            
+            if self.spreadsheet:
+                store = self._get_user_stats_store()
+                if store.add_badge(user_id, badge_key):
+                    self._sync_user_stats(store, force=True)
+                    return True
+            
+            return False
+        
+        except Exception as e:
+            st.error(f"Error saving badge: {str(e)}")
+            return False
+    
+    @request_scoped
     def get_analytics_data(self) -> Dict[str, Any]:
         """Get platform analytics data"""
         try:
+            if self.backend:
+                return self.backend.get_analytics_data()
+            
             analytics = {
                 "total_submissions": 0,
                 "total_users": 0,
@@ -267,30 +924,23 @@ class DatabaseManager:
             }
             
             if self.spreadsheet:
-                # Get submissions data
-                submissions_ws = self.spreadsheet.worksheet("submissions")
-                submissions = submissions_ws.get_all_records()
-                
-                analytics["total_submissions"] = len(submissions)
+                # Counts are maintained as the snapshot loads rows, so no rescan here
+                aggregates = self._get_aggregates()
+                self._get_snapshot().get_records()
+                analytics.update(aggregates.get_analytics())
                 
-                # Count languages and categories
-                languages = {}
-                categories = {}
+                # Save daily rollups to the analytics sheet now and then
+                if aggregates.rollups_due(self.config.ANALYTICS_ROLLUP_INTERVAL):
+                    try:
+                        with lane(ANALYTICS):
+                            aggregates.persist_rollups(self._worksheet("analytics"))
+                    except Exception as e:
+                        st.warning(f"Could not save analytics rollups: {str(e)}")
                 
-                for submission in submissions:
-                    lang = submission.get("language", "Unknown")
-                    cat = submission.get("category", "Uncategorized")
-                    
-                    languages[lang] = languages.get(lang, 0) + 1
-                    categories[cat] = categories.get(cat, 0) + 1
-                
-                analytics["languages_distribution"] = languages
-                analytics["categories_distribution"] = categories
-                analytics["languages_count"] = len(languages)
-                
-                # Get recent activity (last 10 submissions)
-                recent = sorted(submissions, key=lambda x: x.get("timestamp", ""), reverse=True)[:10]
-                analytics["recent_activity"] = recent
+                # Keep the interactions sheet bounded; runs in the background
+                compactor = self._get_interaction_compactor()
+                if compactor.compaction_due(self.config.INTERACTION_COMPACTION_INTERVAL):
+                    compactor.start()
             
             return analytics
             
@@ -298,37 +948,23 @@ class DatabaseManager:
             st.error(f"Error getting analytics: {str(e)}")
             return {}
     
+    @request_scoped
     def search_submissions(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Search submissions by content, title, or metadata"""
+        """Search submissions by content, title, or metadata, most relevant first"""
         try:
+            if self.backend:
+                return self.backend.search_submissions(query, filters)
+            
             results = []
             
             if self.spreadsheet:
-                worksheet = self.spreadsheet.worksheet("submissions")
-                records = worksheet.get_all_records()
-                
-                query_lower = query.lower()
-                
-                for record in records:
-                    # Search in title, content, and translation
-                    searchable_text = " ".join([
-                        record.get("title", ""),
-                        record.get("content", ""),
-                        record.get("english_translation", "")
-                    ]).lower()
-                    
-                    if query_lower in searchable_text:
-                        # Apply additional filters if provided
-                        if filters:
-                            match = True
-                            for key, value in filters.items():
-                                if key in record and record[key] != value:
-                                    match = False
-                                    break
-                            if match:
-                                results.append(record)
-                        else:
-                            results.append(record)
+                # Ranked by BM25 over the snapshot's inverted index
+                results = self._read_sheets(
+                    lambda: self._get_snapshot().search(query, filters),
+                    lambda reader: reader.search_submissions(query, filters),
+                    filters
+                )
+                results = [dict(result) for result in results]
             
             return results
             
@@ -0,0 +1,187 @@
+"""
+MinHash/LSH index for spotting near-duplicate submissions
+"""
+
+import threading
+import unicodedata
+import zlib
+from typing import Dict, List, Any, Hashable, Set, Tuple
+
+import numpy as np
+
+from utils.search_index import TOKEN_PATTERN
+
+# Base of the rolling polynomial hash over a shingle's code points
+ROLLING_BASE = 1000003
+
+class DuplicateIndex:
+    """
+    Finds stored texts whose content nearly matches a new one.
+    
+    Content is normalised (case, Unicode form, punctuation and spacing
+    ignored), cut into overlapping character shingles and summarised as a
+    MinHash signature. Signatures are split into bands and each band is
+    hashed into a bucket, so a query only compares against texts sharing
+    at least one bucket instead of the whole corpus. Two texts whose
+    shingle sets have Jaccard similarity s share a bucket with probability
+    1 - (1 - s^rows)^bands.
+    
+    Attach it to a SheetSnapshot with ``snapshot.add_view()`` to index the
+    sheet's records by id; ``add()`` indexes texts the snapshot has not
+    loaded yet, such as journaled submissions.
+    """
+    
+    def __init__(self, field: str = "content", shingle_size: int = 5, bands: int = 16,
+                 rows: int = 4, seed: int = 1):
+        self.field = field
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+        
+        # (a * x + b) mod 2^32 with odd a permutes the 32-bit shingle hashes
+        generator = np.random.RandomState(seed)
+        permutations = bands * rows
+        self._a = generator.randint(0, 1 << 32, size=(permutations, 1), dtype=np.uint32) | np.uint32(1)
+        self._b = generator.randint(0, 1 << 32, size=(permutations, 1), dtype=np.uint32)
+        self._powers = np.array([pow(ROLLING_BASE, i, 1 << 64) for i in range(shingle_size)], dtype=np.uint64)
+        
+        self._lock = threading.RLock()
+        self.reset()
+    
+    def reset(self):
+        """Forget every indexed text"""
+        with self._lock:
+            self.buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(self.bands)]
+            self.signatures: Dict[Hashable, Tuple[int, bytes]] = {}  # key -> (checksum, signature)
+    
+    def rebuild(self, records: List[Dict[str, Any]]):
+        """Re-index every record, reusing signatures of content that has not changed"""
+        with self._lock:
+            previous = self.signatures
+            self.reset()
+            for record in records:
+                self._add_record(record, previous)
+    
+    def extend(self, records: List[Dict[str, Any]], start: int = 0):
+        """Index newly loaded records"""
+        with self._lock:
+            for record in records:
+                self._add_record(record, self.signatures)
+    
+    def update(self, position: int, record: Dict[str, Any], field: str, old_value: Any, new_value: Any):
+        """Re-index a record whose content was edited locally"""
+        if field == self.field:
+            self.add(record.get("id"), new_value)
+    
+    def add(self, key: Hashable, text: str):
+        """Index one text under a key, replacing what was indexed under it before"""
+        packed = self._signature(self.normalize(text)).tobytes()
+        with self._lock:
+            self._insert(key, _checksum(text), packed)
+    
+    def query(self, text: str, threshold: float = 0.8, limit: int = 5) -> List[Tuple[Hashable, float]]:
+        """Get (key, estimated similarity) of indexed texts at or above the threshold, most similar first"""
+        signature = self._signature(self.normalize(text))
+        packed = signature.tobytes()
+        
+        with self._lock:
+            candidates = set()
+            for band, buckets in enumerate(self.buckets):
+                candidates.update(buckets.get(self._band_key(packed, band), ()))
+            
+            matches = []
+            for key in candidates:
+                stored = np.frombuffer(self.signatures[key][1], dtype=np.uint32)
+                similarity = float(np.mean(stored == signature))
+                if similarity >= threshold:
+                    matches.append((key, similarity))
+        
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
+    
+    def normalize(self, text: Any) -> str:
+        """Reduce text to case-folded words separated by single spaces, as search tokenizes it"""
+        folded = unicodedata.normalize("NFC", str(text or "")).casefold()
+        words = " ".join(TOKEN_PATTERN.findall(folded))
+        return words.replace("\u200c", "").replace("\u200d", "").replace("_", "")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of indexed texts and buckets"""
+        with self._lock:
+            return {
+                "texts": len(self.signatures),
+                "buckets": sum(len(buckets) for buckets in self.buckets),
+                "bands": self.bands,
+                "rows_per_band": self.rows
+            }
+    
+    def _add_record(self, record: Dict[str, Any], previous: Dict[Hashable, Tuple[int, bytes]]):
+        """Index a record by id, skipping the MinHash if its content is unchanged"""
+        key = record.get("id")
+        if not key:
+            return
+        
+        text = record.get(self.field)
+        checksum = _checksum(text)
+        cached = previous.get(key)
+        packed = cached[1] if cached and cached[0] == checksum else self._signature(self.normalize(text)).tobytes()
+        self._insert(key, checksum, packed)
+    
+    def _insert(self, key: Hashable, checksum: int, packed: bytes):
+        """Store a signature and file the key under each band's bucket"""
+        self._remove(key)
+        self.signatures[key] = (checksum, packed)
+        for band, buckets in enumerate(self.buckets):
+            buckets.setdefault(self._band_key(packed, band), set()).add(key)
+    
+    def _remove(self, key: Hashable):
+        """Take a key out of its buckets"""
+        cached = self.signatures.pop(key, None)
+        if cached is None:
+            return
+        for band, buckets in enumerate(self.buckets):
+            band_key = self._band_key(cached[1], band)
+            members = buckets.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del buckets[band_key]
+    
+    def _band_key(self, packed: bytes, band: int) -> bytes:
+        """Bytes of one band of a packed signature"""
+        width = self.rows * 4
+        return packed[band * width:(band + 1) * width]
+    
+    def _signature(self, normalized: str) -> np.ndarray:
+        """MinHash signature of a normalised text's character shingles"""
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        if len(codes) < self.shingle_size:
+            codes = np.concatenate([codes, np.zeros(self.shingle_size - len(codes), dtype=np.uint64)])
+        
+        # Rolling polynomial hash of every shingle at once, folded to 32 bits
+        count = len(codes) - self.shingle_size + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            shingles += codes[offset:offset + count] * self._powers[offset]
+        shingles = ((shingles ^ (shingles >> np.uint64(32))) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        
+        return (self._a * shingles + self._b).min(axis=1)
+
+def _checksum(text: Any) -> int:
+    """Cheap fingerprint of raw content, to tell whether a signature is still current"""
+    return zlib.crc32(str(text or "").encode("utf-8"))
+
+_duplicate_indexes: Dict[Tuple[str, int], DuplicateIndex] = {}
+_duplicate_indexes_lock = threading.Lock()
+
+def get_duplicate_index(snapshot) -> DuplicateIndex:
+    """Get the process-wide duplicate index for a snapshot, attaching it on first use"""
+    key = (snapshot.worksheet.spreadsheet_id, snapshot.worksheet.id)
+    
+    with _duplicate_indexes_lock:
+        index = _duplicate_indexes.get(key)
+        if index is None:
+            index = DuplicateIndex()
+            snapshot.add_view(index)
+            _duplicate_indexes[key] = index
+        return index
@@ -6,14 +6,18 @@ import streamlit as st
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from utils.config import Config
-from utils.database import DatabaseManager
+from utils.services import get_database_manager
 
 class GamificationManager:
     """Manages badges, achievements, streaks, and leaderboards"""
     
     def __init__(self):
         self.config = Config()
-        self.db_manager = DatabaseManager()
+    
+    @property
+    def db_manager(self):
+        """The shared DatabaseManager, looked up each time so a registry reload is picked up"""
+        return get_database_manager()
     
     def check_and_award_badges(self, user_id: str) -> List[str]:
         """
@@ -75,8 +79,8 @@ class GamificationManager:
     def _award_badge(self, user_id: str, badge_key: str):
         """Award a badge to user"""
         try:
-            # This would typically update the user's badge list in the database
-            # For now, we'll store it in session state
+            # Persist to the user's stats; session state covers the current visit
+            self.db_manager.award_badge(user_id, badge_key)
             if "user_badges" not in st.session_state:
                 st.session_state.user_badges = []
             
@@ -128,35 +132,8 @@ class GamificationManager:
     def calculate_user_streak(self, user_id: str) -> int:
         """Calculate user's current submission streak"""
         try:
-            # Get user's submissions ordered by date
-            submissions = self.db_manager.get_submissions(
-                filters={"user_id": user_id}
-            )
-            
-            if not submissions:
-                return 0
-            
-            # Sort by timestamp
-            submissions.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            
-            # Calculate streak
-            streak = 0
-            current_date = datetime.now().date()
-            
-            for submission in submissions:
-                submission_date = datetime.fromisoformat(
-                    submission.get("timestamp", "")
-                ).date()
-                
-                # Check if submission is from current date or consecutive previous days
-                expected_date = current_date - timedelta(days=streak)
-                
-                if submission_date == expected_date:
-                    streak += 1
-                elif submission_date < expected_date:
-                    break  # Gap in streak
-            
-            return streak
+            # Maintained from submission days in the per-user stats
+            return self.db_manager.get_user_stats(user_id).get("streak", 0)
             
         except Exception as e:
             st.warning(f"Error calculating streak: {str(e)}")
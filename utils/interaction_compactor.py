@@ -0,0 +1,318 @@
+"""
+Compaction of old raw interactions into per-story, per-user and per-day rollups
+"""
+
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+from gspread.utils import rowcol_to_a1
+
+from utils.quota import ANALYTICS, lane
+
+# Columns of the "interaction_rollups" worksheet
+ROLLUP_HEADERS = ["scope", "key", "date", "interaction_type", "count"]
+
+# Rollup scopes; "key" holds the submission id, the user id, or is blank for whole days
+STORY = "story"
+USER = "user"
+DAY = "day"
+
+# Scope of the row recording the id of the last interaction folded in
+WATERMARK = "compacted_through"
+
+# Scope of the row naming the process that is compacting, and until when
+LEASE = "compaction_lease"
+
+# Google Sheets allows 10 million cells per spreadsheet
+SHEETS_CELL_LIMIT = 10_000_000
+
+class InteractionCompactor:
+    """
+    Folds raw interaction rows older than a retention window into daily
+    counts and deletes them from the interactions worksheet.
+    
+    Each expired interaction adds one to three rollup rows: its story's,
+    its user's and the whole day's count for its interaction type.
+    Interactions inside the window stay as raw rows. Rows are appended in
+    time order, so only the leading run of expired rows is compacted and
+    removed with one delete_rows; rows appended meanwhile are below it and
+    unaffected. Rollups are written before the delete along with a
+    watermark holding the last folded id, so a run interrupted between the
+    two does not count those rows again.
+    
+    A row with a blank or malformed timestamp ends the expired run, so it
+    is kept rather than deleted uncounted. Before deleting, the ids at
+    both ends of the run are re-read and the delete is skipped if they
+    moved. Only one process compacts at a time: a lease row in the
+    rollups worksheet names the holder until it expires, and a run that
+    finds another holder's unexpired lease does nothing.
+    """
+    
+    def __init__(self, interactions_ws, rollups_ws, retention_days: int = 30,
+                 lease_seconds: float = 900, lease_settle_seconds: float = 2):
+        self.interactions_ws = interactions_ws
+        self.rollups_ws = rollups_ws
+        self.retention_days = retention_days
+        self.lease_seconds = lease_seconds
+        self.lease_settle_seconds = lease_settle_seconds
+        self._holder = uuid.uuid4().hex
+        self._lease_row: Optional[int] = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_run: Optional[float] = None
+        
+        self.stats = {
+            "runs": 0,
+            "skipped_runs": 0,
+            "aborted_deletes": 0,
+            "rows_compacted": 0,
+            "cells_reclaimed": 0,
+            "last_run": {},
+            "last_error": ""
+        }
+    
+    def compact(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Fold expired interactions into rollups, delete them and report the space reclaimed"""
+        with self._lock:
+            if not self._acquire_lease():
+                self._last_run = time.monotonic()
+                self.stats["skipped_runs"] += 1
+                return {"skipped": "another process holds the compaction lease"}
+            try:
+                return self._compact(now)
+            finally:
+                self._release_lease()
+    
+    def _compact(self, now: Optional[datetime]) -> Dict[str, Any]:
+        """One compaction run, with the lease held"""
+        started = time.monotonic()
+        now = now or datetime.now(timezone.utc)
+        cutoff_day = (now - timedelta(days=self.retention_days)).date().isoformat()
+        
+        values = self.interactions_ws.get_all_values()
+        headers, rows = (values[0], values[1:]) if values else ([], [])
+        columns = {name: position for position, name in enumerate(headers) if name}
+        
+        def cell(row: List[str], name: str) -> str:
+            position = columns.get(name)
+            return row[position] if position is not None and position < len(row) else ""
+        
+        expired = 0
+        while expired < len(rows) and _interaction_day(cell(rows[expired], "timestamp")) < cutoff_day:
+            expired += 1
+        
+        rollups, watermark = self._read_rollups()
+        
+        # Rows up to the watermark were folded in by a run that did not get to delete them
+        folded = 0
+        if watermark:
+            for position in range(expired):
+                if cell(rows[position], "id") == watermark[1]:
+                    folded = position + 1
+                    break
+        
+        counts = Counter()
+        for row in rows[folded:expired]:
+            day = cell(row, "timestamp")[:10]
+            interaction_type = cell(row, "interaction_type")
+            if not day:
+                continue
+            counts[(STORY, cell(row, "submission_id"), day, interaction_type)] += 1
+            counts[(USER, cell(row, "user_id"), day, interaction_type)] += 1
+            counts[(DAY, "", day, interaction_type)] += 1
+        
+        rollup_rows_written = 0
+        if expired > folded:
+            rollup_rows_written = self._write_rollups(rollups, watermark, counts, cell(rows[expired - 1], "id"))
+        
+        deleted = 0
+        if expired:
+            # Rows are deleted by position, so first check nothing moved since the read
+            if self._run_unmoved(columns, rows, expired):
+                self.interactions_ws.delete_rows(2, expired + 1)  # Row 1 is the header
+                deleted = expired
+            else:
+                self.stats["aborted_deletes"] += 1
+        
+        remaining_cells = (len(rows) - deleted + 1) * len(headers)
+        report = {
+            "cutoff_day": cutoff_day,
+            "rows_compacted": deleted,
+            "rows_not_deleted": expired - deleted,
+            "rollup_rows_written": rollup_rows_written,
+            "cells_reclaimed": deleted * len(headers),
+            "rows_remaining": len(rows) - deleted,
+            "cells_remaining": remaining_cells,
+            "cell_limit_used": remaining_cells / SHEETS_CELL_LIMIT,
+            "seconds": time.monotonic() - started
+        }
+        
+        self._last_run = time.monotonic()
+        self.stats["runs"] += 1
+        self.stats["rows_compacted"] += deleted
+        self.stats["cells_reclaimed"] += report["cells_reclaimed"]
+        self.stats["last_run"] = report
+        return report
+    
+    def _run_unmoved(self, columns: Dict[str, int], rows: List[List[str]], expired: int) -> bool:
+        """Check that the first and last rows of the expired run still hold the ids read earlier"""
+        position = columns.get("id")
+        if position is None:
+            return False
+        column = rowcol_to_a1(1, position + 1).rstrip("0123456789")
+        
+        def stored_id(row: List[str]) -> str:
+            return row[position] if position < len(row) else ""
+        
+        first, last = self.interactions_ws.batch_get([f"{column}2", f"{column}{expired + 1}"])
+        return (
+            (first[0][0] if first and first[0] else "") == stored_id(rows[0])
+            and (last[0][0] if last and last[0] else "") == stored_id(rows[expired - 1])
+        )
+    
+    def _acquire_lease(self) -> bool:
+        """
+        Take the lease row unless another process holds an unexpired lease
+        
+        Sheets has no compare-and-set, so after writing the lease the row
+        is re-read once writes from other processes have settled; whoever
+        is named then holds it.
+        """
+        now = datetime.now(timezone.utc)
+        row_number, holder, expires = self._read_lease()
+        if holder and holder != self._holder and expires > now.isoformat():
+            return False
+        
+        lease = [LEASE, self._holder, (now + timedelta(seconds=self.lease_seconds)).isoformat(), "", ""]
+        if row_number:
+            self.rollups_ws.batch_update([{"range": f"A{row_number}", "values": [lease]}], value_input_option="RAW")
+        else:
+            self.rollups_ws.append_rows([lease], value_input_option="RAW")
+        
+        time.sleep(self.lease_settle_seconds)
+        self._lease_row, holder, _ = self._read_lease()
+        return holder == self._holder
+    
+    def _release_lease(self):
+        """Clear the lease row if this process still holds it"""
+        if not self._lease_row:
+            return
+        try:
+            row_number, holder, _ = self._read_lease()
+            if row_number == self._lease_row and holder == self._holder:
+                self.rollups_ws.batch_update(
+                    [{"range": f"A{row_number}", "values": [[LEASE, "", "", "", ""]]}], value_input_option="RAW"
+                )
+        finally:
+            self._lease_row = None
+    
+    def _read_lease(self) -> Tuple[Optional[int], str, str]:
+        """Get the first lease row's number, holder and expiry, reading only the columns needed"""
+        scopes = self.rollups_ws.col_values(1)
+        if LEASE not in scopes:
+            return None, "", ""
+        row_number = scopes.index(LEASE) + 1
+        values = self.rollups_ws.get_values(f"A{row_number}:C{row_number}")
+        row = (list(values[0]) if values else []) + ["", "", ""]
+        return row_number, row[1], row[2]
+    
+    def _read_rollups(self) -> Tuple[Dict[Tuple[str, str, str, str], Tuple[int, int]], Optional[Tuple[int, str]]]:
+        """
+        Read stored rollups and the watermark
+        
+        Returns a map of (scope, key, date, interaction_type) to (row
+        number, count), and (row number, last folded id) of the watermark
+        if there is one.
+        """
+        values = self.rollups_ws.get_all_values()
+        rollups = {}
+        watermark = None
+        for row_number, row in enumerate(values[1:], start=2):
+            row = list(row) + [""] * (len(ROLLUP_HEADERS) - len(row))
+            scope, key, day, interaction_type, count = row[:len(ROLLUP_HEADERS)]
+            if scope == WATERMARK:
+                watermark = (row_number, key)
+                continue
+            if scope == LEASE:
+                continue
+            try:
+                rollups[(scope, key, day, interaction_type)] = (row_number, int(count or 0))
+            except ValueError:
+                continue
+        return rollups, watermark
+    
+    def _write_rollups(self, rollups: Dict[Tuple[str, str, str, str], Tuple[int, int]],
+                       watermark: Optional[Tuple[int, str]], counts: Counter, last_id: str) -> int:
+        """Add counts to stored rollups in one batch_update and one append_rows, moving the watermark"""
+        updates = []
+        appends = []
+        for rollup_key, count in sorted(counts.items()):
+            stored = rollups.get(rollup_key)
+            row = list(rollup_key) + [count + (stored[1] if stored else 0)]
+            if stored:
+                updates.append({"range": f"A{stored[0]}", "values": [row]})
+            else:
+                appends.append(row)
+        
+        watermark_row = [WATERMARK, last_id, datetime.now(timezone.utc).isoformat(), "", ""]
+        if watermark:
+            updates.append({"range": f"A{watermark[0]}", "values": [watermark_row]})
+        else:
+            appends.append(watermark_row)
+        
+        if updates:
+            self.rollups_ws.batch_update(updates, value_input_option="RAW")
+        if appends:
+            self.rollups_ws.append_rows(appends, value_input_option="RAW")
+        return len(updates) + len(appends)
+    
+    def compaction_due(self, interval: float) -> bool:
+        """Check whether ``interval`` seconds have passed since the last run in this process"""
+        return self._last_run is None or time.monotonic() - self._last_run >= interval
+    
+    def start(self):
+        """Compact in a background thread unless a run is already in progress"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._last_run = time.monotonic()  # Do not start another run while this one is going
+        self._thread = threading.Thread(target=self._run, name="interaction-compactor", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Compact once, keeping the error for get_stats()"""
+        with lane(ANALYTICS):
+            try:
+                self.compact()
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get totals and the report of the last run"""
+        stats = dict(self.stats)
+        stats["running"] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+def _interaction_day(timestamp: str) -> str:
+    """ISO day of an interaction's timestamp, or "~" (after every date) if it does not parse"""
+    try:
+        return date.fromisoformat(timestamp[:10]).isoformat()
+    except ValueError:
+        return "~"
+
+_compactors: Dict[Tuple[str, int], InteractionCompactor] = {}
+_compactors_lock = threading.Lock()
+
+def get_interaction_compactor(interactions_ws, rollups_ws, retention_days: int = 30) -> InteractionCompactor:
+    """Get the process-wide compactor for an interactions worksheet, creating it on first use"""
+    key = (interactions_ws.spreadsheet_id, interactions_ws.id)
+    
+    with _compactors_lock:
+        compactor = _compactors.get(key)
+        if compactor is None:
+            compactor = InteractionCompactor(interactions_ws, rollups_ws, retention_days)
+            _compactors[key] = compactor
+        return compactor
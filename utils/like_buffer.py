@@ -0,0 +1,266 @@
+"""
+Write-behind buffer that coalesces likes and interactions into batched Sheets writes
+"""
+
+import atexit
+import threading
+import time
+from typing import Dict, List, Any, Tuple
+
+from gspread.utils import rowcol_to_a1
+
+from utils.quota import BACKGROUND, lane
+
+class LikeBuffer:
+    """
+    Accumulates like deltas and interaction rows in memory and flushes them
+    as one batch_update and one append_rows call.
+    
+    A background thread flushes every ``flush_interval`` seconds, or sooner
+    once ``max_events`` events are pending, so a crash loses at most one
+    flush window. Failed writes, and likes for rows not yet in the index
+    or moved since it was built, are kept and retried on the next flush.
+    
+    With a snapshot, each recorded delta is added to the cached count at
+    once and the buffer registers as an overlay, so a snapshot reload
+    shows the sheet's value plus every delta not yet written. The cache
+    is set to the written count only after the batch_update succeeds.
+    """
+    
+    def __init__(self, submissions_ws, interactions_ws, row_index, snapshot=None,
+                 flush_interval: float = 5, max_events: int = 50):
+        self.submissions_ws = submissions_ws
+        self.interactions_ws = interactions_ws
+        self.row_index = row_index
+        self.snapshot = snapshot
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        
+        self._pending_likes: Dict[str, int] = {}
+        self._in_flight_likes: Dict[str, int] = {}  # Taken by the running flush, not yet written
+        self._pending_rows: List[List[Any]] = []
+        self._pending_events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        
+        self.stats = {
+            "flushes": 0,
+            "failed_flushes": 0,
+            "events_flushed": 0,
+            "last_flush_events": 0,
+            "last_flush_submissions": 0,
+            "last_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0,
+            "last_error": ""
+        }
+        
+        if snapshot:
+            snapshot.add_overlay("likes", self.outstanding)
+    
+    def record(self, submission_id: str, like_delta: int, interaction_row: List[Any] = None,
+               row_number: int = None):
+        """Queue a like delta and/or an interaction row, adding the delta to the cached count at ``row_number``"""
+        if self.snapshot and like_delta and row_number:
+            # Snapshot lock first, as reloads take it before calling outstanding()
+            with self.snapshot.hold():
+                should_flush = self._queue(submission_id, like_delta, interaction_row)
+                self.snapshot.adjust_local(row_number, "likes", like_delta)
+        else:
+            should_flush = self._queue(submission_id, like_delta, interaction_row)
+        
+        self.start()
+        if should_flush:
+            self._wake.set()
+    
+    def _queue(self, submission_id: str, like_delta: int, interaction_row: List[Any] = None) -> bool:
+        """Add to the pending writes; returns whether the event threshold is reached"""
+        with self._lock:
+            if like_delta:
+                self._pending_likes[submission_id] = self._pending_likes.get(submission_id, 0) + like_delta
+            if interaction_row:
+                self._pending_rows.append(interaction_row)
+            self._pending_events += 1
+            return self._pending_events >= self.max_events
+    
+    def outstanding(self) -> Dict[str, int]:
+        """Like deltas not yet written to the sheet, pending and in-flight, per submission id"""
+        with self._lock:
+            deltas = dict(self._in_flight_likes)
+            for submission_id, delta in self._pending_likes.items():
+                deltas[submission_id] = deltas.get(submission_id, 0) + delta
+            return deltas
+    
+    def flush(self) -> Dict[str, Any]:
+        """Write all pending likes and interactions to Google Sheets"""
+        with self._flush_lock:
+            with self._lock:
+                likes, self._pending_likes = self._pending_likes, {}
+                self._in_flight_likes = dict(likes)
+                rows, self._pending_rows = self._pending_rows, []
+                events, self._pending_events = self._pending_events, 0
+            
+            if not events:
+                return self.get_stats()
+            
+            started = time.monotonic()
+            try:
+                if likes:
+                    unwritten = self._write_likes(likes)
+                    likes = {}
+                    self._requeue_likes(unwritten)
+                if rows:
+                    self.interactions_ws.append_rows(rows, value_input_option="RAW")
+                    rows = []
+                
+                elapsed = time.monotonic() - started
+                self.stats["flushes"] += 1
+                self.stats["events_flushed"] += events
+                self.stats["last_flush_events"] = events
+                self.stats["last_flush_seconds"] = elapsed
+                self.stats["max_flush_seconds"] = max(self.stats["max_flush_seconds"], elapsed)
+                self.stats["last_error"] = ""
+            
+            except Exception as e:
+                # Put back whatever was not written so the next flush retries it
+                self._requeue_likes(likes)
+                with self._lock:
+                    self._pending_rows = rows + self._pending_rows
+                    self._pending_events += len(rows)
+                self.stats["failed_flushes"] += 1
+                self.stats["last_error"] = str(e)
+            
+            with self._lock:
+                self._in_flight_likes = {}
+            return self.get_stats()
+    
+    def _requeue_likes(self, likes: Dict[str, int]):
+        """Move unwritten deltas from in-flight back to pending so the overlay keeps them"""
+        if not likes:
+            return
+        with self._lock:
+            for submission_id, delta in likes.items():
+                self._in_flight_likes.pop(submission_id, None)
+                self._pending_likes[submission_id] = self._pending_likes.get(submission_id, 0) + delta
+            self._pending_events += len(likes)
+    
+    def _write_likes(self, likes: Dict[str, int]) -> Dict[str, int]:
+        """
+        Read current counts in one batch_get and write new counts in one batch_update
+        
+        Returns the deltas that were not written because their row is not in
+        the index yet or has moved; the caller queues them for the next flush.
+        """
+        id_col = self.row_index.column("id")
+        likes_col = self.row_index.column("likes")
+        
+        unwritten: Dict[str, int] = {}
+        targets: List[Tuple[str, int, int]] = []
+        for submission_id, delta in likes.items():
+            row_number = self.row_index.find_row(submission_id)
+            if row_number is not None:
+                targets.append((submission_id, row_number, delta))
+            else:
+                unwritten[submission_id] = delta
+        
+        if not targets:
+            return unwritten
+        
+        ranges = []
+        for _, row_number, _ in targets:
+            ranges.append(rowcol_to_a1(row_number, id_col))
+            ranges.append(rowcol_to_a1(row_number, likes_col))
+        values = self.submissions_ws.batch_get(ranges)
+        
+        updates = []
+        written: List[Tuple[str, int, int]] = []
+        for position, (submission_id, row_number, delta) in enumerate(targets):
+            id_range, likes_range = values[2 * position], values[2 * position + 1]
+            stored_id = id_range[0][0] if id_range and id_range[0] else ""
+            if stored_id != submission_id:
+                # Row moved since the index was built; rebuild lazily and retry next flush
+                self.row_index.invalidate()
+                unwritten[submission_id] = delta
+                continue
+            
+            current_likes = int(likes_range[0][0] or 0) if likes_range and likes_range[0] else 0
+            new_likes = max(0, current_likes + delta)
+            updates.append({"range": rowcol_to_a1(row_number, likes_col), "values": [[new_likes]]})
+            written.append((submission_id, row_number, new_likes))
+        
+        if updates:
+            self.submissions_ws.batch_update(updates, value_input_option="RAW")
+        self.stats["last_flush_submissions"] = len(updates)
+        
+        if self.snapshot:
+            # The written count, plus likes recorded since this flush began
+            with self.snapshot.hold():
+                with self._lock:
+                    for submission_id, row_number, new_likes in written:
+                        self._in_flight_likes.pop(submission_id, None)
+                        pending = self._pending_likes.get(submission_id, 0)
+                        self.snapshot.update_local(row_number, "likes", max(0, new_likes + pending))
+        
+        return unwritten
+    
+    def pending(self) -> int:
+        """Number of events waiting to be flushed"""
+        with self._lock:
+            return self._pending_events
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get flush size, latency and backlog"""
+        stats = dict(self.stats)
+        stats["pending_events"] = self.pending()
+        return stats
+    
+    def start(self):
+        """Start the background flush thread if it is not running"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="like-buffer-flush", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        """Stop the background thread after a final flush"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+    
+    def _run(self):
+        """Flush on a timer, or early when the event threshold is reached"""
+        with lane(BACKGROUND):
+            while not self._stopped.is_set():
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self.flush()
+
+_buffers: Dict[str, LikeBuffer] = {}
+_buffers_lock = threading.Lock()
+
+def get_like_buffer(submissions_ws, interactions_ws, row_index, snapshot=None,
+                    flush_interval: float = 5, max_events: int = 50) -> LikeBuffer:
+    """Get the process-wide like buffer for a spreadsheet, creating it on first use"""
+    key = submissions_ws.spreadsheet_id
+    
+    with _buffers_lock:
+        buffer = _buffers.get(key)
+        if buffer is None:
+            buffer = LikeBuffer(submissions_ws, interactions_ws, row_index, snapshot, flush_interval, max_events)
+            _buffers[key] = buffer
+        return buffer
+
+@atexit.register
+def _flush_all():
+    """Flush pending likes when the process exits cleanly"""
+    for buffer in list(_buffers.values()):
+        buffer.flush()
@@ -0,0 +1,281 @@
+"""
+Quota-aware scheduling of outbound Google Sheets and Airtable requests
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Optional, Tuple
+
+# Priority lanes, lowest value first
+INTERACTIVE = 0  # Reads and writes a user is waiting on
+ANALYTICS = 1    # Rollups and stats write-back
+BACKGROUND = 2   # Like flushes and Airtable mirroring
+
+LANE_NAMES = {INTERACTIVE: "interactive", ANALYTICS: "analytics", BACKGROUND: "background"}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Methods that add or remove rows by position, so repeating one that already
+# took effect writes twice; they are retried only on 429, which the server
+# returns before doing anything
+NON_IDEMPOTENT_METHODS = (
+    "append_row", "append_rows", "insert_row", "insert_rows", "insert_cols",
+    "delete_rows", "delete_columns", "add_worksheet", "create", "batch_create"
+)
+
+_lane = threading.local()
+
+@contextmanager
+def lane(priority: int):
+    """Run the enclosed requests from this thread in a priority lane"""
+    previous = getattr(_lane, "priority", INTERACTIVE)
+    _lane.priority = priority
+    try:
+        yield
+    finally:
+        _lane.priority = previous
+
+def current_lane() -> int:
+    """Get this thread's priority lane"""
+    return getattr(_lane, "priority", INTERACTIVE)
+
+@contextmanager
+def retry_limit(max_retries: int):
+    """Cap retries of the enclosed requests from this thread, e.g. at 0 when another source can answer instead"""
+    previous = getattr(_lane, "max_retries", None)
+    _lane.max_retries = max_retries
+    try:
+        yield
+    finally:
+        _lane.max_retries = previous
+
+def current_retry_limit() -> Optional[int]:
+    """Get this thread's retry cap, or None if the scheduler's own applies"""
+    return getattr(_lane, "max_retries", None)
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts up to ``capacity``"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+    
+    def take(self) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+    
+    def drain(self):
+        """Empty the bucket after the server reports we are over quota"""
+        self.tokens = 0
+        self._updated = time.monotonic()
+
+class QuotaScheduler:
+    """
+    Admits requests for one API credential through a token bucket.
+    
+    When tokens run short, waiting requests are admitted by lane
+    (interactive, then analytics, then background) and in arrival order
+    within a lane. Calls that fail with 429 or 5xx are retried with
+    exponential backoff and full jitter; a 429 also drains the bucket so
+    other callers slow down instead of piling on. Calls that are not
+    idempotent are retried on 429 only, since a 5xx may come after the
+    write was applied.
+    """
+    
+    def __init__(self, name: str, rate: float, burst: float, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 32.0):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._bucket = TokenBucket(rate, burst)
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._recent = deque()
+        
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "lanes": {name: 0 for name in LANE_NAMES.values()}
+        }
+    
+    def call(self, function: Callable, *args, idempotent: bool = True, **kwargs) -> Any:
+        """Run an API call once quota allows, retrying throttled and (if idempotent) server errors"""
+        priority = current_lane()
+        limit = current_retry_limit()
+        max_retries = self.max_retries if limit is None else min(self.max_retries, limit)
+        
+        for attempt in range(max_retries + 1):
+            self._acquire(priority)
+            try:
+                return function(*args, **kwargs)
+            
+            except Exception as e:
+                status = _status_code(e)
+                if status not in RETRYABLE_STATUS or (status != 429 and not idempotent):
+                    raise
+                
+                with self._condition:
+                    if status == 429:
+                        self.stats["throttled"] += 1
+                        self._bucket.drain()
+                    else:
+                        self.stats["server_errors"] += 1
+                    
+                    if attempt == max_retries:
+                        self.stats["failures"] += 1
+                        raise
+                    self.stats["retries"] += 1
+                
+                time.sleep(_retry_after(e) or random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+    
+    def _acquire(self, priority: int):
+        """Wait for a token; only the highest-priority waiter takes one"""
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        wait = self._bucket.take()
+                        if wait == 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+            
+            waited = time.monotonic() - started
+            now = time.monotonic()
+            self._recent.append(now)
+            self.stats["requests"] += 1
+            self.stats["lanes"][LANE_NAMES.get(priority, str(priority))] += 1
+            self.stats["wait_seconds"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counts, waits and quota usage over the last minute"""
+        with self._condition:
+            cutoff = time.monotonic() - 60
+            while self._recent and self._recent[0] < cutoff:
+                self._recent.popleft()
+            
+            stats = dict(self.stats)
+            stats["lanes"] = dict(self.stats["lanes"])
+            stats["requests_last_minute"] = len(self._recent)
+            stats["quota_per_minute"] = self._bucket.rate * 60
+            stats["quota_used"] = len(self._recent) / stats["quota_per_minute"]
+            stats["queued"] = len(self._waiters)
+            return stats
+
+class ScheduledProxy:
+    """
+    Wraps a client object so its method calls go through a QuotaScheduler.
+    
+    Attribute reads and writes pass through. Methods named in ``local``
+    make no request and are called directly; methods named in
+    ``non_idempotent`` are not retried after server errors. Results that
+    are instances of ``wrap_types`` (worksheets, tables) are wrapped in
+    turn.
+    """
+    
+    def __init__(self, target, scheduler: QuotaScheduler, local: Tuple[str, ...] = (),
+                 wrap_types: Tuple[type, ...] = (), non_idempotent: Tuple[str, ...] = NON_IDEMPOTENT_METHODS):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_scheduler", scheduler)
+        object.__setattr__(self, "_local", local)
+        object.__setattr__(self, "_wrap_types", wrap_types)
+        object.__setattr__(self, "_non_idempotent", non_idempotent)
+    
+    def __getattr__(self, name: str):
+        attribute = getattr(self._target, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+        
+        def scheduled(*args, **kwargs):
+            if name in self._local:
+                result = attribute(*args, **kwargs)
+            else:
+                result = self._scheduler.call(attribute, *args, idempotent=name not in self._non_idempotent, **kwargs)
+            return self._wrap(result)
+        
+        return scheduled
+    
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._target, name, value)
+    
+    def __repr__(self) -> str:
+        return f"<scheduled {self._target!r}>"
+    
+    def _wrap(self, result: Any) -> Any:
+        """Wrap returned handles so their requests are scheduled too"""
+        if self._wrap_types and isinstance(result, self._wrap_types):
+            return ScheduledProxy(result, self._scheduler, self._local, self._wrap_types, self._non_idempotent)
+        if self._wrap_types and isinstance(result, list) and result and isinstance(result[0], self._wrap_types):
+            return [
+                ScheduledProxy(item, self._scheduler, self._local, self._wrap_types, self._non_idempotent)
+                for item in result
+            ]
+        return result
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of a gspread APIError or requests HTTPError"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header, if the server sent one"""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+_schedulers: Dict[Tuple[str, str], QuotaScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+def get_scheduler(api: str, credential: str, rate: float, burst: float, max_retries: int = 5) -> QuotaScheduler:
+    """Get the process-wide scheduler for an API and credential, creating it on first use"""
+    key = (api, credential)
+    
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = QuotaScheduler(f"{api}:{credential}", rate, burst, max_retries)
+            _schedulers[key] = scheduler
+        return scheduler
+
+def get_all_stats() -> Dict[str, Dict[str, Any]]:
+    """Get metrics for every scheduler in the process"""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return {scheduler.name: scheduler.get_stats() for scheduler in schedulers}
@@ -0,0 +1,149 @@
+"""
+Routing of reads between a primary store and a mirror by recent health
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from utils.quota import retry_limit
+
+# Source names
+PRIMARY = "primary"
+FALLBACK = "fallback"
+
+class SourceHealth:
+    """Latency and success of a source's most recent reads"""
+    
+    def __init__(self, window: int = 20):
+        self.outcomes = deque(maxlen=window)  # (seconds, succeeded)
+        self.last_error = ""
+    
+    def record(self, seconds: float, succeeded: bool, error: str = ""):
+        """Add one read's outcome, dropping the oldest beyond the window"""
+        self.outcomes.append((seconds, succeeded))
+        if error:
+            self.last_error = error
+    
+    def error_rate(self) -> float:
+        """Share of recent reads that failed"""
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, succeeded in self.outcomes if not succeeded) / len(self.outcomes)
+    
+    def latency(self) -> float:
+        """Mean seconds of recent reads, failed ones included"""
+        if not self.outcomes:
+            return 0.0
+        return sum(seconds for seconds, _ in self.outcomes) / len(self.outcomes)
+
+class ReadRouter:
+    """
+    Sends each read to the primary store while it is healthy and to the
+    fallback mirror while it is not.
+    
+    The primary counts as unhealthy once the error rate or mean latency of
+    its recent reads crosses a threshold. A read that fails on the chosen
+    source is retried once on the other, so a quota error becomes a slower
+    answer rather than no answer. A source with another behind it gets no
+    quota retries, so the user waits for one failed call rather than a
+    full backoff before the failover. While reads go to the fallback, one read
+    every ``probe_interval`` seconds still tries the primary so the router
+    notices when it recovers.
+    """
+    
+    def __init__(self, max_error_rate: float = 0.3, max_latency: float = 2.0,
+                 probe_interval: float = 30, window: int = 20):
+        self.max_error_rate = max_error_rate
+        self.max_latency = max_latency
+        self.probe_interval = probe_interval
+        self.health = {PRIMARY: SourceHealth(window), FALLBACK: SourceHealth(window)}
+        self._last_probe = 0.0
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            "primary_reads": 0,
+            "fallback_reads": 0,
+            "failovers": 0,
+            "probes": 0
+        }
+    
+    def healthy(self, source: str) -> bool:
+        """Check whether a source's recent reads are within the error rate and latency thresholds"""
+        health = self.health[source]
+        return health.error_rate() <= self.max_error_rate and health.latency() <= self.max_latency
+    
+    def choose(self) -> str:
+        """Pick the source for the next read"""
+        with self._lock:
+            if self.healthy(PRIMARY):
+                return PRIMARY
+            
+            now = time.monotonic()
+            if now - self._last_probe >= self.probe_interval:
+                self._last_probe = now
+                self.stats["probes"] += 1
+                return PRIMARY
+            
+            # With both unhealthy, the primary is still the one with complete data
+            return FALLBACK if self.healthy(FALLBACK) else PRIMARY
+    
+    def read(self, primary: Callable[[], Any], fallback: Optional[Callable[[], Any]] = None) -> Tuple[Any, str]:
+        """
+        Run a read on the chosen source, retrying on the other if it raises
+        
+        Returns the result and the source that produced it. Without a
+        ``fallback`` (e.g. filters the mirror cannot answer) the read goes
+        to the primary. Raises the last error if every source failed.
+        """
+        readers = {PRIMARY: primary, FALLBACK: fallback}
+        first = self.choose() if fallback else PRIMARY
+        order = [first] + ([PRIMARY if first == FALLBACK else FALLBACK] if fallback else [])
+        
+        for attempt, source in enumerate(order):
+            started = time.monotonic()
+            last = attempt == len(order) - 1
+            try:
+                with nullcontext() if last else retry_limit(0):
+                    result = readers[source]()
+            except Exception as e:
+                with self._lock:
+                    self.health[source].record(time.monotonic() - started, False, str(e))
+                if last:
+                    raise
+                continue
+            
+            with self._lock:
+                self.health[source].record(time.monotonic() - started, True)
+                self.stats[f"{source}_reads"] += 1
+                if attempt:
+                    self.stats["failovers"] += 1
+            return result, source
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get read counts per source and each source's recent error rate and latency"""
+        with self._lock:
+            stats = dict(self.stats)
+            for source, health in self.health.items():
+                stats[source] = {
+                    "healthy": self.healthy(source),
+                    "error_rate": health.error_rate(),
+                    "latency": health.latency(),
+                    "last_error": health.last_error
+                }
+            return stats
+
+_routers: Dict[str, ReadRouter] = {}
+_routers_lock = threading.Lock()
+
+def get_read_router(key: str, max_error_rate: float = 0.3, max_latency: float = 2.0,
+                    probe_interval: float = 30) -> ReadRouter:
+    """Get the process-wide router for a primary/fallback pair, creating it on first use"""
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = ReadRouter(max_error_rate, max_latency, probe_interval)
+            _routers[key] = router
+        return router
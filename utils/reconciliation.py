@@ -0,0 +1,323 @@
+"""
+Merkle-tree reconciliation of the Sheets submissions with their Airtable mirror
+"""
+
+import hashlib
+import math
+import threading
+import time
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+from utils.airtable_mirror import AIRTABLE_FIELDS, to_airtable_fields
+
+# Fields compared between the stores; likes are not kept current in the mirror
+RECONCILED_FIELDS = tuple(field for field in AIRTABLE_FIELDS if field != "likes")
+
+# Children per tree node: one per hex digit of the hashed id
+FANOUT = 16
+
+# Ids per leaf range the tree depth aims for
+LEAF_SIZE = 32
+
+# Ids per Airtable request when re-reading mismatched ranges
+FETCH_BATCH_SIZE = 50
+
+# "Last modified time" field of the Submissions table; its newest value is the incremental sync cursor
+LAST_MODIFIED_FIELD = "Last Modified"
+
+def row_digest(record: Dict[str, Any], fields: Iterable[str] = RECONCILED_FIELDS) -> bytes:
+    """Digest of a record's compared fields, as text so both stores' typing agrees"""
+    canonical = "\x1f".join(str(record.get(field, "")).strip() for field in fields)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+def range_key(record_id: str) -> str:
+    """Position of an id in the tree's order: its hashed hex digits"""
+    return hashlib.md5(str(record_id).encode("utf-8")).hexdigest()
+
+class MerkleTree:
+    """
+    Hash tree over record digests keyed by id.
+    
+    Ids are ordered by ``range_key()`` and split into FANOUT-way ranges by
+    successive hex digits, down to ``depth`` digits. A node's hash covers
+    every (id, digest) in its range, so two trees built with the same
+    depth agree on a range exactly when its records agree.
+    """
+    
+    def __init__(self, digests: Dict[str, bytes], depth: int):
+        self.depth = depth
+        self.leaves: Dict[str, Dict[str, bytes]] = {}
+        for record_id, digest in digests.items():
+            self.leaves.setdefault(range_key(record_id)[:depth], {})[record_id] = digest
+        
+        self.nodes: Dict[str, bytes] = {}
+        for prefix, members in self.leaves.items():
+            leaf = hashlib.blake2b(digest_size=16)
+            for record_id in sorted(members):
+                leaf.update(record_id.encode("utf-8") + b"\x1f" + members[record_id])
+            self.nodes[prefix] = leaf.digest()
+        
+        # Only non-empty ranges get a node; an absent child hashes as nothing
+        for level in range(depth - 1, -1, -1):
+            parents = sorted({prefix[:level] for prefix in self.nodes if len(prefix) == level + 1})
+            for parent in parents:
+                node = hashlib.blake2b(digest_size=16)
+                for digit in "0123456789abcdef":
+                    node.update(self.nodes.get(parent + digit, b""))
+                self.nodes[parent] = node.digest()
+    
+    def node(self, prefix: str) -> bytes:
+        """Hash of the range of ids whose key starts with ``prefix``"""
+        return self.nodes.get(prefix, b"")
+    
+    def leaf(self, prefix: str) -> Dict[str, bytes]:
+        """Digests of the ids in a leaf range"""
+        return self.leaves.get(prefix, {})
+
+def tree_depth(size: int) -> int:
+    """Depth giving about LEAF_SIZE ids per leaf range"""
+    return max(1, math.ceil(math.log(max(size, LEAF_SIZE) / LEAF_SIZE, FANOUT)))
+
+def mismatched_ranges(left: MerkleTree, right: MerkleTree) -> Tuple[List[str], int]:
+    """Get the leaf ranges whose hashes differ, descending only into differing nodes, and the nodes compared"""
+    mismatched = []
+    compared = 0
+    pending = [""]
+    while pending:
+        prefix = pending.pop()
+        compared += 1
+        if left.node(prefix) == right.node(prefix):
+            continue
+        if len(prefix) == left.depth:
+            mismatched.append(prefix)
+        else:
+            pending.extend(prefix + digit for digit in "0123456789abcdef")
+    return sorted(mismatched), compared
+
+class AirtableReconciler:
+    """
+    Finds and repairs submissions that differ between the Sheets snapshot
+    and the Airtable mirror.
+    
+    Attach it to the SheetSnapshot with ``snapshot.add_view()`` to keep
+    the Sheets side's digests current without re-reading the sheet. The
+    Airtable side is a local copy of digests kept current by asking only
+    for records modified since the newest modification time Airtable
+    reported, read from the table's LAST_MODIFIED_FIELD so no local clock
+    is involved, with a full listing every ``full_sync_interval`` seconds
+    to catch deleted records. Without that field every sync is full.
+    
+    Each check builds a hash tree per side and descends only into ranges
+    whose hashes differ. The ids that differ within those ranges are
+    re-read from Airtable to confirm, so a check moves data in proportion
+    to what changed and differs, not to the size of the table. Missing and
+    different records are re-sent from Sheets through the mirror; records
+    only in Airtable are reported, and deleted only when asked, after
+    ``confirm_extra`` has checked Sheets itself still lacks them.
+    """
+    
+    def __init__(self, table, mirror, full_sync_interval: float = 86400,
+                 last_modified_field: str = LAST_MODIFIED_FIELD):
+        self.table = table
+        self.mirror = mirror
+        self.full_sync_interval = full_sync_interval
+        self.last_modified_field = last_modified_field
+        
+        self.sheets_digests: Dict[str, bytes] = {}
+        self.airtable_digests: Dict[str, bytes] = {}
+        self.airtable_record_ids: Dict[str, str] = {}  # submission id -> Airtable record id
+        self._cursor: Optional[str] = None  # Newest modification time seen, as Airtable formats it
+        self._last_full_sync: Optional[float] = None
+        self._lock = threading.RLock()
+        
+        self.stats = {
+            "runs": 0,
+            "full_syncs": 0,
+            "airtable_records_fetched": 0,
+            "records_repaired": 0,
+            "last_run": {}
+        }
+    
+    def rebuild(self, records: List[Dict[str, Any]]):
+        """Digest every Sheets record"""
+        with self._lock:
+            self.sheets_digests = {}
+            self.extend(records)
+    
+    def extend(self, records: List[Dict[str, Any]], start: int = 0):
+        """Digest newly loaded Sheets records"""
+        with self._lock:
+            for record in records:
+                if record.get("id"):
+                    self.sheets_digests[str(record["id"])] = row_digest(record)
+    
+    def update(self, position: int, record: Dict[str, Any], field: str, old_value: Any, new_value: Any):
+        """Re-digest a Sheets record edited locally"""
+        if field in RECONCILED_FIELDS and record.get("id"):
+            with self._lock:
+                self.sheets_digests[str(record["id"])] = row_digest(record)
+    
+    def reconcile(self, sheets_records: List[Dict[str, Any]], repair: bool = True, delete_extra: bool = False,
+                  confirm_extra: Optional[Callable[[List[str]], List[str]]] = None) -> Dict[str, Any]:
+        """
+        Compare both stores and, with ``repair``, re-send what Airtable is missing or has wrong
+        
+        ``sheets_records`` are the snapshot's current records, used for the
+        repair payloads. With ``delete_extra``, records only in Airtable are
+        deleted if ``confirm_extra(ids)``, which should ask Sheets rather
+        than the snapshot, returns them as still absent; without it nothing
+        is deleted. Returns a report of the ranges compared and the ids
+        found missing, extra and different.
+        """
+        with self._lock:
+            started = time.monotonic()
+            fetched = self._sync_airtable()
+            
+            depth = tree_depth(max(len(self.sheets_digests), len(self.airtable_digests)))
+            sheets_tree = MerkleTree(self.sheets_digests, depth)
+            airtable_tree = MerkleTree(self.airtable_digests, depth)
+            ranges, compared = mismatched_ranges(sheets_tree, airtable_tree)
+            
+            candidates = set()
+            for prefix in ranges:
+                sheets_leaf, airtable_leaf = sheets_tree.leaf(prefix), airtable_tree.leaf(prefix)
+                candidates.update(
+                    record_id for record_id in set(sheets_leaf) | set(airtable_leaf)
+                    if sheets_leaf.get(record_id) != airtable_leaf.get(record_id)
+                )
+            
+            # Confirm against Airtable's current rows, in case the local copy is behind
+            fetched += self._refetch(sorted(candidates))
+            
+            missing, extra, different = [], [], []
+            for record_id in sorted(candidates):
+                sheets_digest = self.sheets_digests.get(record_id)
+                airtable_digest = self.airtable_digests.get(record_id)
+                if airtable_digest is None and sheets_digest is not None:
+                    missing.append(record_id)
+                elif sheets_digest is None and airtable_digest is not None:
+                    extra.append(record_id)
+                elif sheets_digest != airtable_digest:
+                    different.append(record_id)
+            
+            repaired = 0
+            deleted = 0
+            if repair:
+                wanted = set(missing) | set(different)
+                for record in sheets_records:
+                    if str(record.get("id", "")) in wanted:
+                        self.mirror.enqueue(to_airtable_fields(record))
+                        repaired += 1
+                # The snapshot may be behind Sheets, so only delete what Sheets confirms it lacks
+                absent = confirm_extra(extra) if delete_extra and extra and confirm_extra else []
+                if absent:
+                    self.table.batch_delete([self.airtable_record_ids[record_id] for record_id in absent])
+                    for record_id in absent:
+                        self.airtable_digests.pop(record_id, None)
+                        self.airtable_record_ids.pop(record_id, None)
+                    deleted = len(absent)
+            
+            report = {
+                "sheets_records": len(self.sheets_digests),
+                "airtable_records": len(self.airtable_digests),
+                "airtable_records_fetched": fetched,
+                "tree_depth": depth,
+                "nodes_compared": compared,
+                "ranges_mismatched": len(ranges),
+                "missing_in_airtable": missing,
+                "extra_in_airtable": extra,
+                "different": different,
+                "repaired": repaired,
+                "deleted": deleted,
+                "seconds": time.monotonic() - started
+            }
+            
+            self.stats["runs"] += 1
+            self.stats["airtable_records_fetched"] += fetched
+            self.stats["records_repaired"] += repaired
+            self.stats["last_run"] = report
+            return report
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get totals and the report of the last check"""
+        with self._lock:
+            return dict(self.stats)
+    
+    def _sync_airtable(self) -> int:
+        """Bring the local Airtable digests up to date; returns the records fetched"""
+        full = (
+            self._cursor is None
+            or self._last_full_sync is None
+            or time.monotonic() - self._last_full_sync >= self.full_sync_interval
+        )
+        
+        options: Dict[str, Any] = {
+            "fields": [AIRTABLE_FIELDS[field] for field in RECONCILED_FIELDS] + [self.last_modified_field]
+        }
+        if not full:
+            # Not strictly after: records modified in the cursor's millisecond may not have been listed yet
+            field = "{" + self.last_modified_field + "}"
+            options["formula"] = f"NOT(IS_BEFORE({field}, DATETIME_PARSE('{self._cursor}')))"
+        
+        records = self.table.all(**options)
+        if full:
+            self.airtable_digests = {}
+            self.airtable_record_ids = {}
+            self._last_full_sync = time.monotonic()
+            self.stats["full_syncs"] += 1
+        for record in records:
+            self._store(record)
+        
+        modified = [
+            str(record.get("fields", {}).get(self.last_modified_field, "")) for record in records
+        ]
+        if records and not all(modified):
+            # The table has no usable modification times; list it in full next time
+            self._cursor = None
+        elif modified:
+            self._cursor = max(modified + ([self._cursor] if self._cursor else []))
+        return len(records)
+    
+    def _refetch(self, record_ids: List[str]) -> int:
+        """Re-read records by submission id, forgetting those Airtable no longer has"""
+        fetched = 0
+        for start in range(0, len(record_ids), FETCH_BATCH_SIZE):
+            batch = record_ids[start:start + FETCH_BATCH_SIZE]
+            quoted = ", ".join("{ID}='" + record_id.replace("\\", "\\\\").replace("'", "\\'") + "'" for record_id in batch)
+            records = self.table.all(
+                formula=f"OR({quoted})",
+                fields=[AIRTABLE_FIELDS[field] for field in RECONCILED_FIELDS]
+            )
+            for record_id in batch:
+                self.airtable_digests.pop(record_id, None)
+                self.airtable_record_ids.pop(record_id, None)
+            for record in records:
+                self._store(record)
+            fetched += len(records)
+        return fetched
+    
+    def _store(self, record: Dict[str, Any]):
+        """Digest one Airtable record under its submission id"""
+        fields = record.get("fields", {})
+        record_id = str(fields.get("ID", ""))
+        if not record_id:
+            return
+        submission = {field: fields.get(name, "") for field, name in AIRTABLE_FIELDS.items()}
+        self.airtable_digests[record_id] = row_digest(submission)
+        self.airtable_record_ids[record_id] = record.get("id", "")
+
+_reconcilers: Dict[Tuple[str, int, str], AirtableReconciler] = {}
+_reconcilers_lock = threading.Lock()
+
+def get_reconciler(snapshot, base, mirror, table_name: str = "Submissions",
+                   full_sync_interval: float = 86400) -> AirtableReconciler:
+    """Get the process-wide reconciler for a snapshot and Airtable table, attaching it on first use"""
+    key = (snapshot.worksheet.spreadsheet_id, snapshot.worksheet.id, f"{base.id}/{table_name}")
+    
+    with _reconcilers_lock:
+        reconciler = _reconcilers.get(key)
+        if reconciler is None:
+            reconciler = AirtableReconciler(base.table(table_name), mirror, full_sync_interval)
+            snapshot.add_view(reconciler)
+            _reconcilers[key] = reconciler
+        return reconciler
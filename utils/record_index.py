@@ -0,0 +1,72 @@
+"""
+In-memory secondary hash indexes over cached worksheet records
+"""
+
+from typing import Dict, List, Any, Iterable, Optional, Set
+
+class RecordIndex:
+    """
+    Maps field values to the positions of the records that hold them.
+    
+    Each indexed field keeps a posting set per distinct value. Equality
+    filters on several fields are answered by intersecting posting sets,
+    smallest first, so a query touches only as many positions as its
+    most selective filter matches.
+    """
+    
+    def __init__(self, fields: Iterable[str]):
+        self.fields = tuple(fields)
+        self.postings: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self.fields}
+    
+    def rebuild(self, records: List[Dict[str, Any]]):
+        """Index every record from scratch"""
+        self.postings = {field: {} for field in self.fields}
+        self.extend(records, 0)
+    
+    def extend(self, records: List[Dict[str, Any]], start: int):
+        """Index records appended at positions start, start + 1, ..."""
+        for position, record in enumerate(records, start=start):
+            for field in self.fields:
+                if field in record:
+                    self.postings[field].setdefault(record[field], set()).add(position)
+    
+    def update(self, position: int, record: Dict[str, Any], field: str, old_value: Any, new_value: Any):
+        """Re-file a record after one of its indexed fields changed"""
+        if field not in self.postings or old_value == new_value:
+            return
+        
+        values = self.postings[field]
+        positions = values.get(old_value)
+        if positions is not None:
+            positions.discard(position)
+            if not positions:
+                del values[old_value]
+        values.setdefault(new_value, set()).add(position)
+    
+    def lookup(self, filters: Dict[str, Any]) -> Optional[List[int]]:
+        """
+        Get the sorted positions matching every indexed filter
+        
+        Returns None when no filter is on an indexed field, meaning the
+        caller has to scan.
+        """
+        postings = []
+        for field, value in filters.items():
+            if field in self.postings:
+                postings.append(self.postings[field].get(value, set()))
+        
+        if not postings:
+            return None
+        
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for positions in postings[1:]:
+            if not matches:
+                break
+            matches &= positions
+        
+        return sorted(matches)
+    
+    def distinct(self, field: str) -> Dict[Any, int]:
+        """Get each indexed value of a field with its record count"""
+        return {value: len(positions) for value, positions in self.postings.get(field, {}).items()}
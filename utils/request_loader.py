@@ -0,0 +1,127 @@
+"""
+Request-scoped memoization and batching of DatabaseManager reads within one Streamlit rerun
+"""
+
+import copy
+import functools
+from typing import Dict, List, Any, Callable, Hashable, Iterable, Optional
+
+import streamlit as st
+from streamlit import runtime
+
+SESSION_KEY = "_request_loader"
+PREVIOUS_STATS_KEY = "_request_loader_previous"
+
+class RequestLoader:
+    """
+    Deduplicates identical reads made while rendering one script run.
+    
+    Results are cached by (method, arguments) until the rerun ends or a
+    write invalidates them. Batch loads fetch only the keys not already
+    cached, in one call. Calls and fetches are counted per method. Each
+    caller gets a deep copy, so editing a nested value (e.g. a stats
+    dict's badge list) cannot change what later callers read.
+    """
+    
+    def __init__(self):
+        self._cache: Dict[Hashable, Any] = {}
+        self.stats: Dict[str, Dict[str, int]] = {"calls": {}, "fetches": {}}
+    
+    def load(self, name: str, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Get a cached result, calling fetch() on the first request"""
+        self._count("calls", name)
+        cache_key = (name, key)
+        if cache_key not in self._cache:
+            self._count("fetches", name)
+            self._cache[cache_key] = fetch()
+        return copy.deepcopy(self._cache[cache_key])
+    
+    def load_many(self, name: str, keys: Iterable[Hashable],
+                  fetch_many: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """
+        Get cached results for several keys, fetching all missing ones in one call
+        
+        Results are cached under the same (name, key) entries as load(), so
+        single and batched reads of the same method share the cache.
+        """
+        keys = list(dict.fromkeys(keys))
+        self._count("calls", name)
+        missing = [key for key in keys if (name, key) not in self._cache]
+        if missing:
+            self._count("fetches", name)
+            for key, value in fetch_many(missing).items():
+                self._cache[(name, key)] = value
+        return {key: copy.deepcopy(self._cache.get((name, key))) for key in keys}
+    
+    def invalidate(self):
+        """Drop cached results after a write"""
+        self._cache.clear()
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get per-method call and fetch counts for this rerun"""
+        return {kind: dict(counts) for kind, counts in self.stats.items()}
+    
+    def _count(self, kind: str, name: str):
+        self.stats[kind][name] = self.stats[kind].get(name, 0) + 1
+
+def begin_request():
+    """Start a fresh loader for this script run; call once at the top of the app"""
+    if not runtime.exists():
+        return
+    
+    previous = st.session_state.get(SESSION_KEY)
+    if previous is not None:
+        st.session_state[PREVIOUS_STATS_KEY] = previous.get_stats()
+    st.session_state[SESSION_KEY] = RequestLoader()
+
+def get_request_loader() -> Optional[RequestLoader]:
+    """Get the loader for the current script run, or None outside a Streamlit session"""
+    if not runtime.exists():
+        return None
+    return st.session_state.get(SESSION_KEY)
+
+def get_request_stats() -> Dict[str, Any]:
+    """Get call counts for the current and previous script runs"""
+    loader = get_request_loader()
+    return {
+        "current": loader.get_stats() if loader else {},
+        "previous": st.session_state.get(PREVIOUS_STATS_KEY, {}) if runtime.exists() else {}
+    }
+
+def request_scoped(method: Callable) -> Callable:
+    """Memoize a DatabaseManager read for the rest of the script run"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        loader = get_request_loader()
+        if loader is None:
+            return method(self, *args, **kwargs)
+        
+        key = call_key(*args, **kwargs)
+        return loader.load(method.__name__, key, lambda: method(self, *args, **kwargs))
+    
+    return wrapper
+
+def invalidates_request(method: Callable) -> Callable:
+    """Drop the run's memoized reads after a DatabaseManager write"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            loader = get_request_loader()
+            if loader is not None:
+                loader.invalidate()
+    
+    return wrapper
+
+def call_key(*args, **kwargs) -> Hashable:
+    """Cache key request_scoped() uses for a call with these arguments"""
+    return _freeze((args, kwargs))
+
+def _freeze(value: Any) -> Hashable:
+    """Turn arguments, including dict filters, into a hashable cache key"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
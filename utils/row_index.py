@@ -0,0 +1,134 @@
+"""
+Persistent id-to-row index and header column map for Google Sheets worksheets
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from gspread.utils import rowcol_to_a1
+
+class RowIndex:
+    """Maps record ids to sheet row numbers and header names to column numbers"""
+    
+    def __init__(self, worksheet, key_column: str = "id", miss_reload_interval: float = 5):
+        self.worksheet = worksheet
+        self.key_column = key_column
+        self.miss_reload_interval = miss_reload_interval
+        self.headers: List[str] = []
+        self.columns: Dict[str, int] = {}
+        self.rows: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._next_row = 2  # First row below the indexed ones
+        self._last_tail_read: Optional[float] = None
+    
+    def load(self):
+        """Build the index from the header row and the id column only"""
+        with self._lock:
+            self.headers = self.worksheet.row_values(1)
+            self.columns = {name: position for position, name in enumerate(self.headers, start=1) if name}
+            
+            ids = self.worksheet.col_values(self.columns[self.key_column])
+            self.rows = {
+                record_id: row_number
+                for row_number, record_id in enumerate(ids[1:], start=2)  # Row 1 is the header
+                if record_id
+            }
+            self._next_row = len(ids) + 1
+            self._loaded = True
+    
+    def column(self, name: str) -> int:
+        """Get the 1-based column position of a header"""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            return self.columns[name]
+    
+    def find_row(self, record_id: str) -> Optional[int]:
+        """
+        Get the sheet row for a record id
+        
+        Ids not seen yet may have been appended by another process, so a
+        miss reads the id column below the last indexed row before giving
+        up. Misses on unknown or deleted ids would otherwise cost a request
+        each, so the tail is read at most once every
+        ``miss_reload_interval`` seconds.
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            
+            row_number = self.rows.get(record_id)
+            if row_number is None and self._tail_read_due():
+                self._load_tail()
+                row_number = self.rows.get(record_id)
+            
+            return row_number
+    
+    def _tail_read_due(self) -> bool:
+        """Check whether the last tail read is at least miss_reload_interval seconds old"""
+        return self._last_tail_read is None or time.monotonic() - self._last_tail_read >= self.miss_reload_interval
+    
+    def _load_tail(self):
+        """Index ids appended below the last indexed row"""
+        self._last_tail_read = time.monotonic()
+        column = rowcol_to_a1(1, self.columns[self.key_column]).rstrip("0123456789")
+        values = self.worksheet.get_values(f"{column}{self._next_row}:{column}")
+        for offset, row in enumerate(values):
+            if row and row[0]:
+                self.rows[row[0]] = self._next_row + offset
+        self._next_row += len(values)
+    
+    def missing(self, record_ids: List[str]) -> List[str]:
+        """Get the ids that have no row, re-reading the id column once so rows appended elsewhere count"""
+        with self._lock:
+            self.load()
+            return [record_id for record_id in record_ids if record_id not in self.rows]
+    
+    def add(self, record_id: str, row_number: int):
+        """Register a row appended by this process"""
+        with self._lock:
+            self.rows[record_id] = row_number
+            self._next_row = max(self._next_row, row_number + 1)
+    
+    def add_from_append(self, record_id: str, append_response: dict):
+        """Register a row using the range reported by append_row()"""
+        updated_range = (append_response or {}).get("updates", {}).get("updatedRange", "")
+        match = re.search(r"![A-Z]+(\d+)", updated_range)
+        
+        if match:
+            self.add(record_id, int(match.group(1)))
+        else:
+            self.invalidate()
+    
+    def add_from_append_rows(self, record_ids: List[str], append_response: dict):
+        """Register consecutive rows using the range reported by append_rows()"""
+        updated_range = (append_response or {}).get("updates", {}).get("updatedRange", "")
+        match = re.search(r"![A-Z]+(\d+)", updated_range)
+        
+        if match:
+            for offset, record_id in enumerate(record_ids):
+                self.add(record_id, int(match.group(1)) + offset)
+        else:
+            self.invalidate()
+    
+    def invalidate(self):
+        """Force a rebuild on next lookup"""
+        with self._lock:
+            self._loaded = False
+
+_indexes: Dict[Tuple[str, int], RowIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_row_index(worksheet, key_column: str = "id") -> RowIndex:
+    """Get the process-wide row index for a worksheet, creating it on first use"""
+    key = (worksheet.spreadsheet_id, worksheet.id)
+    
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = RowIndex(worksheet, key_column)
+            _indexes[key] = index
+        return index
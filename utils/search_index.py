@@ -0,0 +1,119 @@
+"""
+Inverted index with BM25 ranking for searching cached records
+"""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Any, Iterable, Tuple
+
+# Letters and digits (\w) plus the combining vowel signs, viramas and nuktas
+# of Indic and Arabic scripts, which \w alone would split words on
+TOKEN_PATTERN = re.compile(
+    r"[\w"
+    r"\u0900-\u0963\u0966-\u0DFF"  # Devanagari through Sinhala, minus the danda marks
+    r"\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED"  # Arabic-script marks (Urdu, Kashmiri, Sindhi)
+    r"\u200C\u200D"  # Zero-width (non-)joiners used inside Indic words
+    r"]+"
+)
+
+def tokenize(text: str) -> List[str]:
+    """Split text into case-folded, NFC-normalised word tokens in any script"""
+    normalized = unicodedata.normalize("NFC", str(text)).casefold()
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(normalized):
+        # Joiners only change glyph shaping, so drop them to match either spelling
+        token = match.group(0).replace("\u200c", "").replace("\u200d", "").strip("_")
+        if token:
+            tokens.append(token)
+    return tokens
+
+class SearchIndex:
+    """
+    Maps terms to the positions of the records containing them, with term
+    frequencies, and ranks matches with Okapi BM25.
+    
+    Query cost depends on the length of the posting lists for the query
+    terms, not on the number of records.
+    """
+    
+    def __init__(self, fields: Iterable[str], k1: float = 1.2, b: float = 0.75):
+        self.fields = tuple(fields)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: Dict[int, int] = {}
+        self.total_length = 0
+    
+    def rebuild(self, records: List[Dict[str, Any]]):
+        """Index every record from scratch"""
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.extend(records, 0)
+    
+    def extend(self, records: List[Dict[str, Any]], start: int):
+        """Index records appended at positions start, start + 1, ..."""
+        for position, record in enumerate(records, start=start):
+            tokens = []
+            for field in self.fields:
+                if record.get(field):
+                    tokens.extend(tokenize(record[field]))
+            
+            for term, frequency in Counter(tokens).items():
+                self.postings.setdefault(term, {})[position] = frequency
+            self.lengths[position] = len(tokens)
+            self.total_length += len(tokens)
+    
+    def update(self, position: int, record: Dict[str, Any], field: str, old_value: Any, new_value: Any):
+        """Local edits only touch counters such as likes, which are not indexed"""
+    
+    def search(self, query: str, allowed: Iterable[int] = None) -> List[Tuple[int, float]]:
+        """
+        Get (position, score) for records matching any query term, best first
+        
+        Args:
+            query: Free text, tokenized the same way as the records
+            allowed: Optional set of positions to restrict results to
+        """
+        if not self.lengths:
+            return []
+        
+        allowed = set(allowed) if allowed is not None else None
+        document_count = len(self.lengths)
+        average_length = self.total_length / document_count or 1
+        scores: Dict[int, float] = {}
+        
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, frequency in postings.items():
+                if allowed is not None and position not in allowed:
+                    continue
+                length_norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / average_length)
+                scores[position] = scores.get(position, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + length_norm)
+        
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size"""
+        return {
+            "documents": len(self.lengths),
+            "terms": len(self.postings),
+            "postings": sum(len(postings) for postings in self.postings.values())
+        }
+
+def rank_records(records: List[Dict[str, Any]], query: str, fields: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Order records a store pre-filtered by query terms by BM25 score, best first
+    
+    Term statistics come from the given records only, and records without
+    a whole-token match are dropped, as in the snapshot's search.
+    """
+    index = SearchIndex(fields)
+    index.rebuild(records)
+    return [records[position] for position, _ in index.search(query)]
@@ -0,0 +1,170 @@
+"""
+Process-wide registry of shared services (database, AI models, card generator)
+"""
+
+import threading
+import time
+from typing import Dict, Any, Callable, Optional, Tuple
+
+import streamlit as st
+
+def _create_database_manager():
+    """Connect to the configured storage"""
+    from utils.database import DatabaseManager
+    return DatabaseManager()
+
+def _create_translation_service():
+    """Load translation models"""
+    from utils.translation import TranslationService
+    return TranslationService()
+
+def _create_categorization_service():
+    """Load the categorization model"""
+    from utils.categorization import CategorizationService
+    return CategorizationService()
+
+def _create_audio_processor():
+    """Load Whisper"""
+    from utils.audio import AudioProcessor
+    return AudioProcessor()
+
+def _create_social_card_generator():
+    """Create the card generator"""
+    from utils.social_cards import SocialCardGenerator
+    return SocialCardGenerator()
+
+def _create_gamification_manager():
+    """Create the gamification manager"""
+    from utils.gamification import GamificationManager
+    return GamificationManager()
+
+def _check_database(db_manager) -> Tuple[bool, str]:
+    """Storage is usable when a backend or spreadsheet is connected"""
+    if db_manager.backend:
+        return True, f"{type(db_manager.backend).__name__} backend"
+    if db_manager.spreadsheet:
+        return True, "Google Sheets connected"
+    return False, "no storage configured"
+
+def _check_translation(service) -> Tuple[bool, str]:
+    """Translation always has a fallback; report which path is active"""
+    if getattr(service, "hf_headers", None):
+        return True, "Hugging Face API"
+    if service.hf_translator is not None:
+        return True, "local model loaded"
+    return True, "web translators only"
+
+def _check_categorization(service) -> Tuple[bool, str]:
+    """Categorization always has keyword rules; report which path is active"""
+    if getattr(service, "hf_headers", None):
+        return True, "Hugging Face API"
+    if service.classifier is not None:
+        return True, "local model loaded"
+    return True, "keyword rules only"
+
+def _check_audio(processor) -> Tuple[bool, str]:
+    """Transcription needs the Whisper model"""
+    if processor.whisper_model is None:
+        return False, "Whisper model not loaded"
+    return True, f"Whisper '{processor.config.WHISPER_MODEL}' loaded"
+
+# name -> (factory, health check)
+SERVICES: Dict[str, Tuple[Callable[[], Any], Optional[Callable[[Any], Tuple[bool, str]]]]] = {
+    "database": (_create_database_manager, _check_database),
+    "translation": (_create_translation_service, _check_translation),
+    "categorization": (_create_categorization_service, _check_categorization),
+    "audio": (_create_audio_processor, _check_audio),
+    "social_cards": (_create_social_card_generator, None),
+    "gamification": (_create_gamification_manager, None)
+}
+
+class ServiceRegistry:
+    """
+    Owns one instance of each service for the whole process.
+    
+    Services are created on first use, each under its own lock so a slow
+    model load does not hold up unrelated services. ``reload()`` discards
+    an instance so the next ``get()`` builds it again.
+    """
+    
+    def __init__(self, services: Dict[str, Tuple[Callable[[], Any], Optional[Callable[[Any], Tuple[bool, str]]]]] = None):
+        self.services = dict(services or SERVICES)
+        self._instances: Dict[str, Any] = {}
+        self._init_seconds: Dict[str, float] = {}
+        self._locks = {name: threading.Lock() for name in self.services}
+    
+    def get(self, name: str) -> Any:
+        """Get a service, creating it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory, _ = self.services[name]
+                started = time.monotonic()
+                instance = factory()
+                self._init_seconds[name] = time.monotonic() - started
+                self._instances[name] = instance
+            return instance
+    
+    def reload(self, name: str = None):
+        """Drop one service (or all) so it is rebuilt on next use"""
+        for service_name in ([name] if name else list(self.services)):
+            with self._locks[service_name]:
+                self._instances.pop(service_name, None)
+                self._init_seconds.pop(service_name, None)
+    
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Report which services are loaded and whether they work"""
+        report = {}
+        for name, (_, check) in self.services.items():
+            instance = self._instances.get(name)
+            entry = {
+                "initialized": instance is not None,
+                "init_seconds": self._init_seconds.get(name),
+                "healthy": None,
+                "detail": "not loaded yet"
+            }
+            
+            if instance is not None:
+                if check is None:
+                    entry["healthy"], entry["detail"] = True, "ready"
+                else:
+                    try:
+                        entry["healthy"], entry["detail"] = check(instance)
+                    except Exception as e:
+                        entry["healthy"], entry["detail"] = False, str(e)
+            
+            report[name] = entry
+        return report
+
+@st.cache_resource
+def get_registry() -> ServiceRegistry:
+    """Get the process-wide service registry"""
+    return ServiceRegistry()
+
+def get_database_manager():
+    """Get the shared DatabaseManager"""
+    return get_registry().get("database")
+
+def get_translation_service():
+    """Get the shared TranslationService"""
+    return get_registry().get("translation")
+
+def get_categorization_service():
+    """Get the shared CategorizationService"""
+    return get_registry().get("categorization")
+
+def get_audio_processor():
+    """Get the shared AudioProcessor"""
+    return get_registry().get("audio")
+
+def get_social_card_generator():
+    """Get the shared SocialCardGenerator"""
+    return get_registry().get("social_cards")
+
+def get_gamification_manager():
+    """Get the shared GamificationManager"""
+    return get_registry().get("gamification")
@@ -0,0 +1,440 @@
+"""
+Time- or size-sharded worksheets presented as one worksheet
+"""
+
+import json
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+import gspread
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+
+# Shard policies
+MONTH = "month"  # One worksheet per calendar month, e.g. "submissions_2025_03"
+ROWS = "rows"    # A new worksheet every max_rows rows, e.g. "submissions_0002"
+
+# How often to look for a shard another process created, when the current month's is missing
+DISCOVERY_INTERVAL = 60
+
+RANGE_PATTERN = re.compile(r"^([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?$")
+
+class ClosedShard:
+    """
+    Compressed copy of a shard that no longer receives appends, with this
+    process's cell edits (likes) laid over it until the next fetch.
+    """
+    
+    def __init__(self, rows: List[List[str]], timestamp_column: Optional[int]):
+        self.size = len(rows)
+        self.fetched_at = time.monotonic()
+        self._packed = zlib.compress(json.dumps(rows).encode("utf-8"))
+        self._edits: Dict[Tuple[int, int], str] = {}  # (local row number, column) -> value
+        self._columns: Dict[int, List[str]] = {}
+        
+        stamps = [
+            row[timestamp_column] for row in rows
+            if timestamp_column is not None and timestamp_column < len(row) and row[timestamp_column]
+        ]
+        self.first_timestamp = min(stamps) if stamps else ""
+        self.last_timestamp = max(stamps) if stamps else ""
+    
+    def rows(self) -> List[List[str]]:
+        """Get the shard's data rows, with local edits applied"""
+        rows = json.loads(zlib.decompress(self._packed).decode("utf-8"))
+        for (row_number, column), value in self._edits.items():
+            row = rows[row_number - 2]
+            if len(row) < column:
+                row.extend([""] * (column - len(row)))
+            row[column - 1] = value
+        return rows
+    
+    def column(self, column: int) -> List[str]:
+        """Get one column of the data rows, kept uncompressed once asked for"""
+        values = self._columns.get(column)
+        if values is None:
+            values = [row[column - 1] if column <= len(row) else "" for row in self.rows()]
+            self._columns[column] = values
+        return values
+    
+    def edit(self, row_number: int, column: int, value: Any):
+        """Record a cell this process wrote"""
+        self._edits[(row_number, column)] = str(value)
+        self._columns.pop(column, None)
+
+class ShardedWorksheet:
+    """
+    Spreads one logical worksheet over a base worksheet and shards named
+    after it, and answers the gspread Worksheet calls the app makes as if
+    they were one sheet.
+    
+    Rows are numbered across shards, oldest shard first, so snapshots,
+    row indexes and like buffers work unchanged. Appends always go to the
+    newest shard, creating the next one when the month changes or the
+    newest is full, so only the newest shard ever grows and row numbers
+    of older rows stay put. Row numbering needs only each closed shard's
+    row count and timestamp range, read once from two of its columns.
+    A closed shard's rows are fetched the first time a read lands in it,
+    kept compressed and re-fetched every ``closed_reload_interval``
+    seconds; reads below the last row, which is all an incremental
+    refresh or a recent feed needs, touch only the newest shard.
+    """
+    
+    def __init__(self, worksheets, base_title: str, shard_by: str = MONTH, max_rows: int = 50000,
+                 closed_reload_interval: float = 3600):
+        self.worksheets = worksheets
+        self.spreadsheet = worksheets.spreadsheet
+        self.base_title = base_title
+        self.shard_by = shard_by
+        self.max_rows = max_rows
+        self.closed_reload_interval = closed_reload_interval
+        
+        base = worksheets.get(base_title)
+        self.id = base.id
+        self.spreadsheet_id = base.spreadsheet_id
+        self.title = base_title
+        
+        self._pattern = re.compile(rf"^{re.escape(base_title)}_(\d{{4}}_\d{{2}}|\d{{4}})$")
+        self._titles: List[str] = [base_title]
+        self._closed: Dict[str, ClosedShard] = {}
+        self._sizes: Dict[str, Tuple[int, str, str]] = {}  # Closed shard -> (data rows, first timestamp, last timestamp)
+        self._open_rows: Optional[int] = None  # Data rows in the newest shard, when known
+        self._last_discovery: Optional[float] = None
+        self._lock = threading.RLock()
+        
+        self.stats = {"shards_created": 0, "closed_fetches": 0, "closed_size_fetches": 0}
+        self._discover(refresh=False)
+    
+    def shards(self) -> List[str]:
+        """Titles of the shards, oldest first"""
+        with self._lock:
+            return list(self._titles)
+    
+    def spans(self) -> List[Tuple[str, int, Optional[int], str, str]]:
+        """
+        Get (title, start, stop, first timestamp, last timestamp) for each shard, oldest first
+        
+        start and stop are 0-based positions of the shard's rows among all
+        records; the newest shard has stop None and blank timestamps, as
+        it is still growing.
+        """
+        with self._lock:
+            spans = []
+            for title, offset, size in self._layout():
+                if size is None:
+                    spans.append((title, offset, None, "", ""))
+                else:
+                    _, first, last = self._closed_size(title)
+                    spans.append((title, offset, offset + size, first, last))
+            return spans
+    
+    def spans_between(self, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None) -> List[Tuple[int, Optional[int]]]:
+        """Get (start, stop) positions of the shards that can hold rows timestamped from ``since`` to ``until``"""
+        return [
+            (start, stop) for _, start, stop, first, last in self.spans()
+            if stop is None or _overlaps(first, last, since, until)
+        ]
+    
+    def closed_sizes(self) -> Dict[str, Tuple[int, str, str]]:
+        """Get (data rows, first timestamp, last timestamp) of each closed shard, e.g. to store with a snapshot"""
+        with self._lock:
+            return {title: self._closed_size(title) for title in self._titles[:-1]}
+    
+    def seed_closed_sizes(self, sizes: Dict[str, Any]):
+        """Take closed shard sizes saved by closed_sizes() instead of reading them, where none are known yet"""
+        with self._lock:
+            for title in self._titles[:-1]:
+                if title in sizes and title not in self._sizes:
+                    size, first, last = sizes[title]
+                    self._sizes[title] = (int(size), first, last)
+    
+    def get_all_values(self, **kwargs) -> List[List[str]]:
+        """Get every row of every shard under the base worksheet's header"""
+        with self._lock:
+            self._discover()
+            rows = []
+            for title in self._titles[:-1]:
+                rows.extend(self._closed_shard(title, refresh=True).rows())
+            
+            values = self.worksheets.get(self._titles[-1]).get_all_values(**kwargs)
+            self._open_rows = max(0, len(values) - 1)
+            headers = values[0] if values and len(self._titles) == 1 else self.worksheets.headers(self.base_title)
+            return [headers] + rows + values[1:]
+    
+    def get_values(self, range_name: str, **kwargs) -> List[List[str]]:
+        """Get a range of rows numbered across shards, e.g. "A1200:Q" for every row from 1200 on"""
+        first_column, first_row, last_column, last_row = self._parse_range(range_name)
+        
+        with self._lock:
+            self._maybe_discover()
+            results = []
+            for title, offset, size in self._layout():
+                start = max(first_row - offset, 1 if offset == 0 else 2)
+                end = last_row - offset if last_row else None
+                if size is not None and start > size + 1:
+                    continue
+                if end is not None and end < start:
+                    break
+                
+                if size is None:
+                    local_range = f"{first_column}{start}:{last_column or first_column}{end or ''}"
+                    results.extend(self.worksheets.get(title).get_values(local_range, **kwargs))
+                else:
+                    first = a1_to_rowcol(f"{first_column}1")[1]
+                    last = a1_to_rowcol(f"{last_column or first_column}1")[1]
+                    rows = ([self.worksheets.headers(self.base_title)] if start == 1 else []) + \
+                        self._closed_shard(title).rows()[max(start, 2) - 2:(end - 1 if end else size)]
+                    results.extend(row[first - 1:last] for row in rows)
+            return results
+    
+    def row_values(self, row: int, **kwargs) -> List[str]:
+        """Get one row by its number across shards"""
+        with self._lock:
+            title, local_row = self._locate(row)
+        return self.worksheets.get(title).row_values(local_row, **kwargs)
+    
+    def col_values(self, col: int, **kwargs) -> List[str]:
+        """Get a column of every shard under the base worksheet's header"""
+        with self._lock:
+            if len(self._titles) == 1:
+                return self.worksheets.get(self.base_title).col_values(col, **kwargs)
+            
+            values = [self.worksheets.headers(self.base_title)[col - 1]]
+            for title in self._titles[:-1]:
+                column = self._closed_shard(title).column(col)
+                values.extend(column)
+            values.extend(self.worksheets.get(self._titles[-1]).col_values(col, **kwargs)[1:])
+            return values
+    
+    def batch_get(self, ranges: List[str], **kwargs) -> List[Any]:
+        """Get several ranges, with one batch_get per shard they fall in"""
+        with self._lock:
+            located = [self._translate(range_name) for range_name in ranges]
+        
+        by_shard: Dict[str, List[int]] = {}
+        for position, (title, _) in enumerate(located):
+            by_shard.setdefault(title, []).append(position)
+        
+        results: List[Any] = [None] * len(ranges)
+        for title, positions in by_shard.items():
+            values = self.worksheets.get(title).batch_get([located[position][1] for position in positions], **kwargs)
+            for position, value in zip(positions, values):
+                results[position] = value
+        return results
+    
+    def batch_update(self, data: List[Dict[str, Any]], **kwargs):
+        """Write several ranges, with one batch_update per shard they fall in"""
+        with self._lock:
+            by_shard: Dict[str, List[Dict[str, Any]]] = {}
+            for update in data:
+                title, local_range = self._translate(update["range"])
+                by_shard.setdefault(title, []).append(dict(update, range=local_range))
+            
+            for title, updates in by_shard.items():
+                self.worksheets.get(title).batch_update(updates, **kwargs)
+                if title in self._closed:
+                    for update in updates:
+                        row_number, column = a1_to_rowcol(update["range"].split(":")[0])
+                        for row_offset, row in enumerate(update["values"]):
+                            for column_offset, value in enumerate(row):
+                                self._closed[title].edit(row_number + row_offset, column + column_offset, value)
+    
+    def update_cell(self, row: int, col: int, value: Any):
+        """Write one cell by its row number across shards"""
+        with self._lock:
+            title, local_row = self._locate(row)
+            response = self.worksheets.get(title).update_cell(local_row, col, value)
+            if title in self._closed:
+                self._closed[title].edit(local_row, col, value)
+            return response
+    
+    def append_rows(self, values: List[List[Any]], **kwargs) -> Dict[str, Any]:
+        """Append rows to the newest shard, opening a new one first if it is due"""
+        with self._lock:
+            title = self._open_shard()
+            offset = self._layout()[-1][1]
+            response = self.worksheets.get(title).append_rows(values, **kwargs)
+            
+            # Report the rows by their numbers across shards, as callers index them
+            updated_range = (response or {}).get("updates", {}).get("updatedRange", "")
+            match = re.search(r"!([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?", updated_range)
+            if not match:
+                self._open_rows = None
+                return response
+            
+            last_local_row = int(match.group(4) or match.group(2))
+            self._open_rows = last_local_row - 1
+            first_row = int(match.group(2)) + offset
+            last_row = last_local_row + offset
+            global_range = f"{title}!{match.group(1)}{first_row}" + (f":{match.group(3)}{last_row}" if match.group(3) else "")
+            return dict(response, updates=dict(response["updates"], updatedRange=global_range))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the shards and their sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["shards"] = list(self._titles)
+            stats["closed_rows"] = sum(self._closed_size(title)[0] for title in self._titles[:-1])
+            stats["closed_shards_cached"] = len(self._closed)
+            stats["open_rows"] = self._open_rows
+            return stats
+    
+    def _discover(self, refresh: bool = True):
+        """List the shards, re-listing worksheets first so shards made by other processes are found"""
+        if refresh:
+            self.worksheets.invalidate()
+        shards = sorted(title for title in self.worksheets.titles() if self._pattern.match(title))
+        self._titles = [self.base_title] + shards
+        self._last_discovery = time.monotonic()
+        for cache in (self._closed, self._sizes):
+            for title in list(cache):
+                if title not in self._titles[:-1]:
+                    del cache[title]
+    
+    def _maybe_discover(self):
+        """Look for a new month's shard now and then once the month has turned"""
+        if self.shard_by != MONTH or self._month_title() in self._titles:
+            return
+        if time.monotonic() - self._last_discovery >= DISCOVERY_INTERVAL:
+            self._discover()
+    
+    def _month_title(self) -> str:
+        """Title of the current month's shard"""
+        return f"{self.base_title}_{datetime.now(timezone.utc):%Y_%m}"
+    
+    def _open_shard(self) -> str:
+        """Get the shard that takes appends, creating the next one when the current one is done"""
+        self._maybe_discover()
+        newest = self._titles[-1]
+        
+        if self.shard_by == MONTH:
+            # The base title sorts before every month's, so a sheet without shards gets one now
+            wanted = self._month_title()
+            if wanted <= newest:
+                return newest
+        elif self.shard_by == ROWS:
+            if self._open_rows is None:
+                self._open_rows = max(0, len(self.worksheets.get(newest).col_values(1)) - 1)
+            if self._open_rows < self.max_rows:
+                return newest
+            number = int(newest.rsplit("_", 1)[1]) + 1 if newest != self.base_title else 2
+            wanted = f"{self.base_title}_{number:04d}"
+        else:
+            return newest
+        
+        self._create(wanted)
+        return self._titles[-1]
+    
+    def _create(self, title: str):
+        """Add a shard with the base worksheet's header row; the previous newest shard is then closed"""
+        previous = self._titles[-1]
+        headers = self.worksheets.headers(self.base_title)
+        try:
+            worksheet = self.spreadsheet.add_worksheet(title=title, rows=1000, cols=len(headers))
+            worksheet.append_row(headers)
+            self.worksheets.add(title, worksheet)
+            self.stats["shards_created"] += 1
+            self._titles.append(title)
+        except gspread.exceptions.APIError:
+            # Another process created it first
+            self._discover()
+        
+        # The previous shard's rows may have grown since its size was last read
+        self._closed.pop(previous, None)
+        self._sizes.pop(previous, None)
+        self._open_rows = None
+    
+    def _closed_shard(self, title: str, refresh: bool = False) -> ClosedShard:
+        """Get a closed shard's cached rows, fetching them if missing or, with ``refresh``, when due"""
+        shard = self._closed.get(title)
+        if shard is None or (refresh and time.monotonic() - shard.fetched_at >= self.closed_reload_interval):
+            values = self.worksheets.get(title).get_all_values()
+            headers = self.worksheets.headers(self.base_title)
+            timestamp_column = headers.index("timestamp") if "timestamp" in headers else None
+            shard = ClosedShard(values[1:], timestamp_column)
+            self._closed[title] = shard
+            self._sizes[title] = (shard.size, shard.first_timestamp, shard.last_timestamp)
+            self.stats["closed_fetches"] += 1
+        return shard
+    
+    def _closed_size(self, title: str) -> Tuple[int, str, str]:
+        """Get a closed shard's data rows and timestamp range, reading only its id and timestamp columns"""
+        size = self._sizes.get(title)
+        if size is None:
+            headers = self.worksheets.headers(self.base_title)
+            columns = [1] + ([headers.index("timestamp") + 1] if "timestamp" in headers else [])
+            letters = [rowcol_to_a1(1, column).rstrip("0123456789") for column in columns]
+            values = self.worksheets.get(title).batch_get([f"{letter}2:{letter}" for letter in letters])
+            
+            stamps = [row[0] for row in (values[1] if len(values) > 1 else []) if row and row[0]]
+            size = (max(len(column) for column in values), min(stamps) if stamps else "", max(stamps) if stamps else "")
+            self._sizes[title] = size
+            self.stats["closed_size_fetches"] += 1
+        return size
+    
+    def _layout(self) -> List[Tuple[str, int, Optional[int]]]:
+        """Get (title, rows before it, data rows or None for the newest) of each shard"""
+        layout = []
+        offset = 0
+        for title in self._titles[:-1]:
+            size = self._closed_size(title)[0]
+            layout.append((title, offset, size))
+            offset += size
+        layout.append((self._titles[-1], offset, None))
+        return layout
+    
+    def _locate(self, row: int) -> Tuple[str, int]:
+        """Map a row number across shards to (shard title, row number in the shard)"""
+        for title, offset, size in self._layout():
+            if size is None or row - offset <= size + 1:
+                return title, row - offset
+        raise ValueError(f"Row {row} is outside the sharded worksheet")
+    
+    def _translate(self, range_name: str) -> Tuple[str, str]:
+        """Map an A1 range within one shard's rows to (shard title, range in the shard)"""
+        first_column, first_row, last_column, last_row = self._parse_range(range_name)
+        title, local_row = self._locate(first_row)
+        local_range = f"{first_column}{local_row}"
+        if last_column:
+            local_range += f":{last_column}{local_row + (last_row - first_row) if last_row else ''}"
+        return title, local_range
+    
+    @staticmethod
+    def _parse_range(range_name: str) -> Tuple[str, int, str, Optional[int]]:
+        """Split "A5", "A5:Q9" or "A5:Q" into columns and rows"""
+        match = RANGE_PATTERN.match(range_name)
+        if not match:
+            raise ValueError(f"Unsupported range for a sharded worksheet: {range_name}")
+        first_column, first_row, last_column, last_row = match.groups()
+        return first_column, int(first_row), last_column or "", int(last_row) if last_row else None
+
+def _overlaps(first: str, last: str, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    """Check whether ISO timestamps first..last can overlap since..until; unparseable bounds overlap"""
+    try:
+        if since is not None and last and datetime.fromisoformat(last) < since:
+            return False
+        if until is not None and first and datetime.fromisoformat(first) > until:
+            return False
+    except (TypeError, ValueError):
+        pass
+    return True
+
+_sharded: Dict[Tuple[str, int], ShardedWorksheet] = {}
+_sharded_lock = threading.Lock()
+
+def get_sharded_worksheet(worksheets, base_title: str, shard_by: str = MONTH, max_rows: int = 50000,
+                          closed_reload_interval: float = 3600) -> ShardedWorksheet:
+    """Get the process-wide sharded view of a worksheet, creating it on first use"""
+    base = worksheets.get(base_title)
+    key = (base.spreadsheet_id, base.id)
+    
+    with _sharded_lock:
+        sharded = _sharded.get(key)
+        if sharded is None:
+            sharded = ShardedWorksheet(worksheets, base_title, shard_by, max_rows, closed_reload_interval)
+            _sharded[key] = sharded
+        return sharded
@@ -0,0 +1,65 @@
+"""
+Column-wise parsing of raw worksheet values into typed pandas DataFrames
+"""
+
+from typing import Dict, List, Any, Callable, Tuple
+
+import pandas as pd
+
+# dtypes of the typed columns of the "submissions" worksheet; other columns stay text
+SUBMISSION_DTYPES = {
+    "timestamp": "datetime64[ns, UTC]",
+    "likes": "int32",
+    "featured": "bool",
+    "ai_translated": "bool",
+    "ai_categorized": "bool"
+}
+
+def apply_dtypes(frame: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Convert each typed column in one vectorized pass; blanks and bad values become 0, False or NaT"""
+    for column, dtype in dtypes.items():
+        if column not in frame.columns:
+            continue
+        
+        values = frame[column]
+        if dtype == "bool":
+            frame[column] = values.astype(str).str.strip().str.upper().isin(["TRUE", "1"])
+        elif dtype.startswith("datetime64"):
+            frame[column] = pd.to_datetime(values.astype(str), utc=True, errors="coerce", format="ISO8601")
+        else:
+            frame[column] = pd.to_numeric(values, errors="coerce").fillna(0).astype(dtype)
+    return frame
+
+def parse_rows(headers: List[str], rows: List[List[str]], dtypes: Dict[str, str],
+               record_type: Callable = dict) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Parse get_all_values() rows into a typed DataFrame and matching records
+    
+    Records get the typed value of numeric and boolean columns as plain
+    Python ints and bools. Timestamps and text columns keep the sheet's
+    strings, so cursors and display code see exactly what was written.
+    Records are built by calling ``record_type`` with (header, value) pairs.
+    """
+    width = len(headers)
+    if any(len(row) != width for row in rows):
+        rows = [list(row[:width]) + [""] * (width - len(row)) for row in rows]
+    
+    return parse_frame(headers, pd.DataFrame(rows, columns=headers, dtype=object), dtypes, record_type)
+
+def parse_frame(headers: List[str], raw: pd.DataFrame, dtypes: Dict[str, str],
+                record_type: Callable = dict) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Parse a DataFrame of raw text values, one column per header, as parse_rows() does"""
+    frame = apply_dtypes(raw.copy(), dtypes)
+    
+    columns = []
+    for position, header in enumerate(headers):
+        dtype = dtypes.get(header, "")
+        source = frame if dtype and not dtype.startswith("datetime64") else raw
+        columns.append(source.iloc[:, position].tolist())
+    
+    records = [record_type(zip(headers, values)) for values in zip(*columns)]
+    return frame, records
+
+def frame_from_records(records: List[Dict[str, Any]], dtypes: Dict[str, str]) -> pd.DataFrame:
+    """Build a typed DataFrame from records that are already in memory"""
+    return apply_dtypes(pd.DataFrame.from_records(records), dtypes)
@@ -0,0 +1,410 @@
+"""
+Process-wide snapshot of Google Sheets worksheets with incremental refresh
+"""
+
+import bisect
+import heapq
+import threading
+import time
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+import pandas as pd
+from gspread.utils import numericise_all, rowcol_to_a1
+
+from utils.record_index import RecordIndex
+from utils.search_index import SearchIndex
+from utils.sheet_frame import frame_from_records, parse_frame, parse_rows
+
+class SheetSnapshot:
+    """Keeps a worksheet's records in memory and fetches only newly appended rows"""
+    
+    def __init__(self, worksheet, refresh_interval: float = 30, full_reload_interval: float = 600,
+                 indexed_fields: Tuple[str, ...] = (), order_fields: Tuple[str, str] = ("timestamp", "id"),
+                 search_fields: Tuple[str, ...] = (), dtypes: Dict[str, str] = None,
+                 record_type: Callable = dict, store=None):
+        self.worksheet = worksheet
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.headers: List[str] = []
+        self.records: List[Dict[str, Any]] = []
+        self.dtypes = dtypes or {}
+        self.record_type = record_type
+        self._frame: Optional[pd.DataFrame] = None
+        self.index = RecordIndex(indexed_fields)
+        self.search_index = SearchIndex(search_fields)
+        self._views = [self.index, self.search_index]
+        self._overlays: List[Tuple[str, Callable[[], Dict[str, int]]]] = []
+        self.order_fields = order_fields
+        self._order: List[Tuple[str, str, int]] = []  # (timestamp, id, position), ascending
+        self._lock = threading.RLock()
+        self._last_refresh: Optional[float] = None
+        self._last_full_load: Optional[float] = None
+        self._verify_tail = False
+        self.stats = {
+            "full_loads": 0,
+            "incremental_loads": 0,
+            "stored_loads": 0,
+            "rows_fetched": 0,
+            "last_refresh_rows": 0,
+            "last_refresh_seconds": 0.0,
+            "total_refresh_seconds": 0.0
+        }
+    
+    def get_records(self) -> List[Dict[str, Any]]:
+        """
+        Return cached records, refreshing first if the snapshot is stale
+        
+        The returned list is shared by every caller in the process and must
+        be treated as read-only.
+        """
+        with self._lock:
+            if self._needs_refresh():
+                self.refresh()
+            return self.records
+    
+    def get_frame(self) -> pd.DataFrame:
+        """
+        Get the records as a DataFrame with the snapshot's dtypes, refreshing first if stale
+        
+        The frame from the last full load is reused until rows are appended
+        or changed locally, then rebuilt from the records once.
+        """
+        with self._lock:
+            records = self.get_records()
+            if self._frame is None:
+                self._frame = frame_from_records(records, self.dtypes) if records else pd.DataFrame(columns=self.headers)
+            return self._frame
+    
+    def select(self, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Get cached records matching equality filters, in sheet order
+        
+        Filters on indexed fields are answered from the index; any others
+        are checked against the indexed matches only. As with a scan, a
+        filter on a field the sheet does not have is ignored.
+        """
+        with self._lock:
+            records = self.get_records()
+            filters = {key: value for key, value in (filters or {}).items() if key in self.headers}
+            if not filters:
+                return list(records)
+            
+            positions = self.index.lookup(filters)
+            candidates = records if positions is None else [records[position] for position in positions]
+            remaining = [(key, value) for key, value in filters.items() if key not in self.index.fields]
+            
+            return [
+                record for record in candidates
+                if all(record.get(key) == value for key, value in remaining)
+            ]
+    
+    def page(self, filters: Dict[str, Any] = None, limit: int = 50,
+             after: Optional[Tuple[Any, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Get one page of matching records, newest first
+        
+        Args:
+            filters: Equality filters, as for select()
+            limit: Page size
+            after: (timestamp, id) of the last record on the previous page
+        
+        Unfiltered pages seek into the timestamp order and walk back
+        ``limit`` records. Indexed filters take the top ``limit`` of the
+        matching postings with a bounded heap instead of sorting them.
+        """
+        with self._lock:
+            records = self.get_records()
+            filters = {key: value for key, value in (filters or {}).items() if key in self.headers}
+            cursor = (str(after[0]), str(after[1])) if after else None
+            
+            positions = self.index.lookup(filters) if filters else None
+            remaining = [(key, value) for key, value in filters.items() if key not in self.index.fields]
+            
+            def matches(record):
+                return all(record.get(key) == value for key, value in remaining)
+            
+            if positions is not None:
+                candidates = (
+                    records[position] for position in positions
+                    if matches(records[position]) and (cursor is None or self._order_key(records[position]) < cursor)
+                )
+                return heapq.nlargest(limit, candidates, key=self._order_key)
+            
+            end = bisect.bisect_left(self._order, cursor) if cursor else len(self._order)
+            results = []
+            for order_position in range(end - 1, -1, -1):
+                if len(results) >= limit:
+                    break
+                record = records[self._order[order_position][2]]
+                if matches(record):
+                    results.append(record)
+            return results
+    
+    def search(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Get records matching the query's terms, best BM25 score first, restricted by filters"""
+        with self._lock:
+            records = self.get_records()
+            filters = {key: value for key, value in (filters or {}).items() if key in self.headers}
+            
+            allowed = None
+            if filters:
+                allowed = self.index.lookup(filters)
+                remaining = [(key, value) for key, value in filters.items() if key not in self.index.fields]
+                if remaining:
+                    candidates = range(len(records)) if allowed is None else allowed
+                    allowed = [
+                        position for position in candidates
+                        if all(records[position].get(key) == value for key, value in remaining)
+                    ]
+            
+            return [records[position] for position, _ in self.search_index.search(query, allowed)]
+    
+    def add_view(self, view):
+        """
+        Keep a derived structure in step with the records
+        
+        The view must provide rebuild(records), called after full loads,
+        extend(records, start), called with appended rows, and
+        update(position, record, field, old_value, new_value), called after
+        update_local() and adjust_local().
+        """
+        with self._lock:
+            self._views.append(view)
+            if self.records:
+                view.rebuild(self.records)
+    
+    def add_overlay(self, field: str, deltas: Callable[[], Dict[str, int]]):
+        """
+        Add not-yet-written numeric changes on top of every value loaded from the sheet
+        
+        ``deltas()`` returns the outstanding change per record id. It is
+        called with the snapshot's lock held, so it must not wait on a lock
+        held by a caller of hold().
+        """
+        with self._lock:
+            self._overlays.append((field, deltas))
+    
+    def hold(self):
+        """Get the snapshot's lock, to make a read and local update of cached values atomic"""
+        return self._lock
+    
+    def refresh(self, force_full: bool = False):
+        """Refresh the snapshot, loading the full sheet only when required"""
+        with self._lock:
+            started = time.monotonic()
+            
+            if not self.headers and not force_full and self._load_stored():
+                # Catch up on rows appended since the stored copy was written
+                fetched = self._load_appended()
+                self.stats["stored_loads"] += 1
+            elif force_full or self._needs_full_load():
+                fetched = self._load_full()
+                self.stats["full_loads"] += 1
+            else:
+                fetched = self._load_appended()
+                self.stats["incremental_loads"] += 1
+            
+            elapsed = time.monotonic() - started
+            self._last_refresh = time.monotonic()
+            self.stats["rows_fetched"] += fetched
+            self.stats["last_refresh_rows"] = fetched
+            self.stats["last_refresh_seconds"] = elapsed
+            self.stats["total_refresh_seconds"] += elapsed
+    
+    def invalidate(self):
+        """Mark the snapshot stale so the next read checks for appended rows"""
+        with self._lock:
+            self._last_refresh = None
+    
+    def adjust_local(self, row_number: int, field: str, delta: int):
+        """Apply a pending numeric change to the cached record ahead of the remote write"""
+        with self._lock:
+            index = row_number - 2
+            if 0 <= index < len(self.records):
+                current = self.records[index].get(field) or 0
+                self._apply_local(index, field, max(0, int(current) + delta))
+    
+    def update_local(self, row_number: int, field: str, value: Any):
+        """Apply a single-cell write made by this process to the cached record"""
+        with self._lock:
+            index = row_number - 2
+            if 0 <= index < len(self.records):
+                self._apply_local(index, field, value)
+    
+    def _apply_local(self, index: int, field: str, value: Any):
+        """Set a cached field and tell the views about the change"""
+        record = self.records[index]
+        old_value = record.get(field)
+        record[field] = value
+        self._frame = None
+        for view in self._views:
+            view.update(index, record, field, old_value, value)
+    
+    def staleness(self) -> Optional[float]:
+        """Seconds since the last successful refresh, or None if never loaded"""
+        if self._last_refresh is None:
+            return None
+        return time.monotonic() - self._last_refresh
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot size, staleness and refresh cost"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["rows_cached"] = len(self.records)
+            stats["staleness_seconds"] = self.staleness()
+            if self.store:
+                stats["store"] = self.store.get_stats()
+            return stats
+    
+    def _needs_refresh(self) -> bool:
+        """Check whether the refresh interval has elapsed"""
+        if self._last_refresh is None:
+            return True
+        return time.monotonic() - self._last_refresh >= self.refresh_interval
+    
+    def _needs_full_load(self) -> bool:
+        """Full loads pick up in-place edits made outside this process"""
+        if not self.headers or self._last_full_load is None:
+            return True
+        return time.monotonic() - self._last_full_load >= self.full_reload_interval
+    
+    def _load_full(self) -> int:
+        """Download the entire worksheet"""
+        values = self.worksheet.get_all_values()
+        self.headers = values[0] if values else []
+        if self.dtypes:
+            # Column-wise parse; the frame is kept for get_frame()
+            self._frame, self.records = parse_rows(self.headers, values[1:], self.dtypes, self.record_type)
+        else:
+            self._frame = None
+            self.records = [self._to_record(row) for row in values[1:]]
+        self._apply_overlays(self.records)
+        self._index_records()
+        self._verify_tail = False
+        if self.store and self.headers:
+            self.store.save_in_background(self.headers, values[1:], self._shard_layout())
+        return len(self.records)
+    
+    def _load_stored(self) -> bool:
+        """
+        Load the records from the store's file instead of the sheet
+        
+        In-place edits made elsewhere since the file was written show up
+        at the next full reload, as they do between refreshes.
+        """
+        try:
+            stored = self.store.load()
+        except Exception:
+            return False
+        if not stored:
+            return False
+        
+        self.headers, raw, _, layout = stored
+        if layout and hasattr(self.worksheet, "seed_closed_sizes"):
+            # Lets the tail check number rows without reading the closed shards
+            self.worksheet.seed_closed_sizes(layout)
+        if self.dtypes:
+            self._frame, self.records = parse_frame(self.headers, raw, self.dtypes, self.record_type)
+        else:
+            self._frame = None
+            self.records = [self._to_record(row) for row in raw.values.tolist()]
+        self._apply_overlays(self.records)
+        self._index_records()
+        self._verify_tail = bool(self.records)
+        return True
+    
+    def _apply_overlays(self, records: List[Dict[str, Any]]):
+        """Add the overlays' outstanding changes to freshly loaded records"""
+        id_field = self.order_fields[-1]
+        for field, deltas in self._overlays:
+            outstanding = deltas()
+            if not outstanding:
+                continue
+            for record in records:
+                delta = outstanding.get(str(record.get(id_field, "")))
+                if delta:
+                    record[field] = max(0, int(record.get(field) or 0) + delta)
+                    self._frame = None
+    
+    def _shard_layout(self) -> Optional[Dict[str, Any]]:
+        """Closed shard sizes of a sharded worksheet, to store with its snapshot"""
+        if hasattr(self.worksheet, "closed_sizes"):
+            return self.worksheet.closed_sizes()
+        return None
+    
+    def _index_records(self):
+        """Rebuild the views and the timestamp order after loading every record"""
+        for view in self._views:
+            view.rebuild(self.records)
+        self._order = sorted(
+            self._order_key(record) + (position,) for position, record in enumerate(self.records)
+        )
+        self._last_full_load = time.monotonic()
+    
+    def _load_appended(self) -> int:
+        """Download only the rows below the last known record"""
+        first_row = len(self.records) + 2  # Header is row 1
+        last_cell = rowcol_to_a1(1, len(self.headers))
+        last_column = last_cell.rstrip("0123456789")
+        
+        if self._verify_tail:
+            # Re-read the last stored row to check the sheet still lines up with the stored copy
+            values = self.worksheet.get_values(f"A{first_row - 1}:{last_column}")
+            if not values or not self._same_record(values[0], self.records[-1]):
+                fetched = self._load_full()
+                self.stats["full_loads"] += 1
+                return fetched
+            values = values[1:]
+            self._verify_tail = False
+        else:
+            values = self.worksheet.get_values(f"A{first_row}:{last_column}")
+        if self.dtypes:
+            _, new_records = parse_rows(self.headers, values, self.dtypes, self.record_type)
+        else:
+            new_records = [self._to_record(row) for row in values]
+        self._apply_overlays(new_records)
+        if new_records:
+            self._frame = None
+        for view in self._views:
+            view.extend(new_records, len(self.records))
+        for position, record in enumerate(new_records, start=len(self.records)):
+            # New rows are usually the newest, so this is normally an append
+            bisect.insort(self._order, self._order_key(record) + (position,))
+        self.records.extend(new_records)
+        return len(new_records)
+    
+    def _same_record(self, row: List[str], record: Dict[str, Any]) -> bool:
+        """Check whether a raw row holds the same record, by its id order field"""
+        field = self.order_fields[-1]
+        if field not in self.headers:
+            return True
+        position = self.headers.index(field)
+        return position < len(row) and str(row[position]) == str(record.get(field, ""))
+    
+    def _order_key(self, record: Dict[str, Any]) -> Tuple[str, str]:
+        """Sort key for newest-first pages: (timestamp, id) as strings"""
+        return tuple(str(record.get(field, "")) for field in self.order_fields)
+    
+    def _to_record(self, row: List[str]) -> Dict[str, Any]:
+        """Convert a raw row into a record the same way get_all_records() does"""
+        padded = list(row) + [""] * (len(self.headers) - len(row))
+        return self.record_type(zip(self.headers, numericise_all(padded[:len(self.headers)])))
+
+_snapshots: Dict[Tuple[str, int], SheetSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+def get_snapshot(worksheet, refresh_interval: float = 30, full_reload_interval: float = 600,
+                 indexed_fields: Tuple[str, ...] = (), order_fields: Tuple[str, str] = ("timestamp", "id"),
+                 search_fields: Tuple[str, ...] = (), dtypes: Dict[str, str] = None,
+                 record_type: Callable = dict, store=None) -> SheetSnapshot:
+    """Get the process-wide snapshot for a worksheet, creating it on first use"""
+    key = (worksheet.spreadsheet_id, worksheet.id)
+    
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = SheetSnapshot(worksheet, refresh_interval, full_reload_interval, indexed_fields, order_fields,
+                                     search_fields, dtypes, record_type, store)
+            _snapshots[key] = snapshot
+        return snapshot
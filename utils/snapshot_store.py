@@ -0,0 +1,138 @@
+"""
+Compressed on-disk copy of a worksheet snapshot for fast cold starts
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+class SnapshotStore:
+    """
+    Saves a worksheet's raw values to a zstd-compressed Arrow IPC file and
+    reads them back on the next start.
+    
+    Every column is stored as the sheet's text, so a stored snapshot is
+    parsed exactly like a fresh download. The file is memory-mapped on
+    load and converted to a DataFrame column by column, without building
+    a row list first. Files are replaced atomically, so a reader never
+    sees a half-written one; files older than ``max_age`` seconds or
+    written for another worksheet are ignored. For a sharded worksheet the
+    closed shards' sizes are stored too, so rows can be numbered on the
+    next start without reading those shards.
+    """
+    
+    def __init__(self, path: str, key: str, max_age: float = 86400, compression: str = "zstd"):
+        self.path = path
+        self.key = key
+        self.max_age = max_age
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._thread = None
+        
+        self.stats = {
+            "saves": 0,
+            "loads": 0,
+            "last_save_seconds": 0.0,
+            "last_load_seconds": 0.0,
+            "file_bytes": 0,
+            "last_error": ""
+        }
+    
+    def load(self) -> Optional[Tuple[List[str], pd.DataFrame, float, Optional[Dict[str, Any]]]]:
+        """Get the stored headers, raw values, age in seconds and shard layout, or None if there is no usable file"""
+        started = time.monotonic()
+        try:
+            with pa.memory_map(self.path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
+        
+        metadata = table.schema.metadata or {}
+        if metadata.get(b"key", b"").decode("utf-8") != self.key:
+            return None
+        age = time.time() - float(metadata.get(b"saved_at", b"0"))
+        if age > self.max_age:
+            return None
+        
+        headers = json.loads(metadata[b"headers"].decode("utf-8"))
+        layout = json.loads(metadata.get(b"layout", b"null").decode("utf-8"))
+        raw = table.to_pandas()
+        raw.columns = headers
+        
+        self.stats["loads"] += 1
+        self.stats["last_load_seconds"] = time.monotonic() - started
+        return headers, raw, age, layout
+    
+    def save(self, headers: List[str], rows: List[List[str]], layout: Optional[Dict[str, Any]] = None):
+        """Write raw values, and the shard layout they were read with, to the file, replacing the previous one"""
+        with self._lock:
+            started = time.monotonic()
+            width = len(headers)
+            rows = [row if len(row) == width else list(row[:width]) + [""] * (width - len(row)) for row in rows]
+            columns = list(zip(*rows)) if rows else [()] * width
+            
+            metadata = {
+                "key": self.key,
+                "saved_at": str(time.time()),
+                "headers": json.dumps(headers),
+                "layout": json.dumps(layout)
+            }
+            table = pa.table(
+                [pa.array(column, type=pa.string()) for column in columns],
+                names=[str(position) for position in range(width)],
+                metadata=metadata
+            )
+            
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"  # Workers may save at once
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            with pa.OSFile(temporary, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+            os.replace(temporary, self.path)
+            
+            self.stats["saves"] += 1
+            self.stats["last_save_seconds"] = time.monotonic() - started
+            self.stats["file_bytes"] = os.path.getsize(self.path)
+    
+    def save_in_background(self, headers: List[str], rows: List[List[str]], layout: Optional[Dict[str, Any]] = None):
+        """Write raw values from a background thread unless a save is already running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._save, args=(headers, rows, layout), name="snapshot-store", daemon=True
+        )
+        self._thread.start()
+    
+    def _save(self, headers: List[str], rows: List[List[str]], layout: Optional[Dict[str, Any]] = None):
+        """Save, keeping the error for get_stats()"""
+        try:
+            self.save(headers, rows, layout)
+        except Exception as e:
+            self.stats["last_error"] = str(e)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get save and load timings and the file size"""
+        return dict(self.stats)
+
+_stores: Dict[str, SnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+def get_snapshot_store(directory: str, worksheet, max_age: float = 86400) -> SnapshotStore:
+    """Get the process-wide store for a worksheet's snapshot file, creating it on first use"""
+    key = f"{worksheet.spreadsheet_id}/{worksheet.id}"
+    path = os.path.join(directory, f"{worksheet.spreadsheet_id}_{worksheet.id}.arrow")
+    
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = SnapshotStore(path, key, max_age)
+            _stores[key] = store
+        return store
@@ -0,0 +1,124 @@
+"""
+Compact in-memory submission record for cached worksheet rows
+"""
+
+import sys
+import zlib
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Any, Iterable, Iterator, Optional, Union
+
+from utils.backends.base import SUBMISSION_FIELDS
+
+# Fields whose values repeat across many rows; interned so each distinct value is stored once
+INTERNED_FIELDS = ("user_id", "content_type", "language", "dialect", "category", "location")
+
+# Long free text, stored zlib-compressed and decoded on access
+LARGE_TEXT_FIELDS = ("content", "english_translation", "cultural_context")
+
+# Shorter text is not worth compressing
+COMPRESS_MIN_LENGTH = 200
+
+# Record field -> slot holding it
+_SLOTS = {field: f"_{field}" if field in LARGE_TEXT_FIELDS else field for field in SUBMISSION_FIELDS}
+
+def _encode(value: Any) -> Any:
+    """Compress long text when that makes it smaller"""
+    if isinstance(value, str) and len(value) >= COMPRESS_MIN_LENGTH:
+        packed = zlib.compress(value.encode("utf-8"))
+        if sys.getsizeof(packed) < sys.getsizeof(value):
+            return packed
+    return value
+
+def _decode(value: Any) -> Any:
+    """Undo _encode()"""
+    return zlib.decompress(value).decode("utf-8") if isinstance(value, bytes) else value
+
+def _text_field(field: str) -> property:
+    """Attribute access to a large text field that decodes on read"""
+    slot = _SLOTS[field]
+    
+    def getter(self):
+        return _decode(getattr(self, slot))
+    
+    def setter(self, value):
+        setattr(self, slot, _encode(value))
+    
+    return property(getter, setter, doc=f"The submission's {field}, decompressed on access")
+
+class Submission(MutableMapping):
+    """
+    One submission held in a few hundred bytes instead of a 17-key dict.
+    
+    Known columns live in ``__slots__``. Columns the app does not know
+    yet go into a small overflow dict. Categorical values are interned,
+    and content, english_translation and cultural_context are kept
+    compressed until read. It is a MutableMapping, so code written for
+    the dict records (``record.get("title")``, ``record["likes"] = 3``,
+    ``dict(record)``) works unchanged, and fields are also attributes.
+    Columns the sheet does not have are absent, as with a dict. It is
+    not a dict, so ``json.dumps()`` rejects it; DatabaseManager hands
+    pages ``dict(record)`` copies.
+    """
+    
+    __slots__ = tuple(_SLOTS.values()) + ("_extra",)
+    
+    content = _text_field("content")
+    english_translation = _text_field("english_translation")
+    cultural_context = _text_field("cultural_context")
+    
+    def __init__(self, items: Union[Mapping, Iterable] = ()):
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in (items.items() if isinstance(items, Mapping) else items):
+            self[key] = value
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOTS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+    
+    def __setitem__(self, key: str, value: Any):
+        if key in _SLOTS:
+            if key in INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+    
+    def __delitem__(self, key: str):
+        if key in _SLOTS:
+            try:
+                delattr(self, _SLOTS[key])
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+    
+    def __contains__(self, key: object) -> bool:
+        if key in _SLOTS:
+            return hasattr(self, _SLOTS[key])
+        return self._extra is not None and key in self._extra
+    
+    def __iter__(self) -> Iterator[str]:
+        for field, slot in _SLOTS.items():
+            if hasattr(self, slot):
+                yield field
+        if self._extra:
+            yield from self._extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"Submission({dict(self)!r})"
+    
+    def __reduce__(self):
+        return (Submission, (dict(self),))
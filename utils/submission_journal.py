@@ -0,0 +1,322 @@
+"""
+Durable local journal of submissions awaiting a write to the primary store
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable
+
+from utils.quota import BACKGROUND, RETRYABLE_STATUS, _status_code, lane
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+  sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+  submission_id TEXT NOT NULL UNIQUE,
+  payload TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS dead_letters (
+  sequence INTEGER PRIMARY KEY,
+  submission_id TEXT NOT NULL UNIQUE,
+  payload TEXT NOT NULL,
+  created_at TEXT NOT NULL,
+  attempts INTEGER NOT NULL,
+  last_error TEXT,
+  failed_at TEXT NOT NULL
+);
+"""
+
+class SubmissionJournal:
+    """
+    Accepts submissions into a local SQLite journal and replays them to
+    the primary store from a background worker.
+    
+    ``append()`` returns once the entry is committed with synchronous=FULL,
+    so an accepted submission survives a crash or restart. The worker
+    hands pending entries, oldest first, to ``replay`` in batches and
+    removes them once it returns. Each entry's submission id is its
+    idempotency key: ``replay`` must skip ids the store already has, so a
+    batch that landed but was not yet removed is never written twice.
+    Failed batches are retried with exponential backoff.
+    
+    After a batch fails, entries are replayed one at a time until one
+    succeeds, so a bad entry is isolated instead of holding back its
+    batch. Only failures that belong to the entry count towards
+    ``max_attempts``: an error the store would not retry, or a transient
+    one (429/5xx, connection errors) that repeats right after the entry
+    behind it went through. While the whole store is failing nothing is
+    counted and the worker just backs off. An entry that has failed
+    ``max_attempts`` times and fails again on its own moves to the
+    dead-letter table and the entries behind it carry on;
+    ``requeue_dead_letters()`` puts it back once it is fixed.
+    """
+    
+    def __init__(self, path: str, replay: Callable[[List[Dict[str, Any]]], None],
+                 batch_size: int = 25, max_backoff: float = 300, max_attempts: int = 5):
+        self.path = path
+        self.replay = replay
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.executescript(SCHEMA)
+        
+        self._condition = threading.Condition()
+        self._thread = None
+        self._backoff = 0.0
+        self._isolating = False
+        
+        self.stats = {
+            "appended": 0,
+            "replayed": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "dead_lettered": 0,
+            "last_batch_size": 0,
+            "last_replay_seconds": 0.0,
+            "last_error": ""
+        }
+        
+        # Entries left by a previous process are replayed right away
+        if self.pending_count():
+            self.start()
+    
+    def append(self, submission_data: Dict[str, Any]):
+        """Durably record a submission; its "id" is the idempotency key"""
+        with self._condition:
+            with self._connection:
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO journal (submission_id, payload, created_at) VALUES (?, ?, ?)",
+                    (submission_data["id"], json.dumps(submission_data), datetime.now(timezone.utc).isoformat())
+                )
+            self.stats["appended"] += 1
+            self._condition.notify()
+        
+        self.start()
+    
+    def is_pending(self, submission_id: str) -> bool:
+        """Check whether a submission is not yet in the primary store, dead-lettered ones included"""
+        with self._condition:
+            row = self._connection.execute(
+                "SELECT 1 FROM journal WHERE submission_id = ? "
+                "UNION ALL SELECT 1 FROM dead_letters WHERE submission_id = ?",
+                (submission_id, submission_id)
+            ).fetchone()
+            return row is not None
+    
+    def is_dead_lettered(self, submission_id: str) -> bool:
+        """Check whether the worker gave up replaying a submission"""
+        with self._condition:
+            row = self._connection.execute(
+                "SELECT 1 FROM dead_letters WHERE submission_id = ?", (submission_id,)
+            ).fetchone()
+            return row is not None
+    
+    def pending_count(self) -> int:
+        """Number of submissions not yet in the primary store"""
+        with self._condition:
+            return self._connection.execute("SELECT COUNT(*) FROM journal").fetchone()[0]
+    
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Get the entries given up on, oldest first, without their payloads"""
+        with self._condition:
+            rows = self._connection.execute(
+                "SELECT submission_id, created_at, attempts, last_error, failed_at FROM dead_letters ORDER BY sequence"
+            ).fetchall()
+        return [
+            {"submission_id": submission_id, "created_at": created_at, "attempts": attempts,
+             "last_error": last_error or "", "failed_at": failed_at}
+            for submission_id, created_at, attempts, last_error, failed_at in rows
+        ]
+    
+    def requeue_dead_letters(self) -> int:
+        """Move every dead-lettered entry back into the journal with its attempts reset; returns how many"""
+        with self._condition:
+            with self._connection:
+                requeued = self._connection.execute(
+                    "INSERT OR IGNORE INTO journal (sequence, submission_id, payload, created_at) "
+                    "SELECT sequence, submission_id, payload, created_at FROM dead_letters"
+                ).rowcount
+                self._connection.execute("DELETE FROM dead_letters")
+            self._condition.notify()
+        
+        self.start()
+        return requeued
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backlog size and age, dead letters, and replay throughput"""
+        with self._condition:
+            count, oldest = self._connection.execute("SELECT COUNT(*), MIN(created_at) FROM journal").fetchone()
+            dead = self._connection.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+            stats = dict(self.stats)
+        
+        stats["pending"] = count
+        stats["dead_letters"] = dead
+        stats["oldest_pending_seconds"] = (
+            (datetime.now(timezone.utc) - datetime.fromisoformat(oldest)).total_seconds() if oldest else None
+        )
+        return stats
+    
+    def start(self):
+        """Start the background worker if it is not running"""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="submission-journal", daemon=True)
+            self._thread.start()
+    
+    def drain(self, timeout: float = 30) -> bool:
+        """Block until every entry is replayed; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self.pending_count():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
+    def _run(self):
+        """Replay pending entries in batches, backing off while the store is unreachable"""
+        with lane(BACKGROUND):
+            while True:
+                with self._condition:
+                    rows = self._connection.execute(
+                        "SELECT sequence, payload, attempts FROM journal ORDER BY sequence LIMIT ?",
+                        (1 if self._isolating else self.batch_size,)
+                    ).fetchall()
+                    if not rows:
+                        self._condition.wait()
+                        continue
+                
+                self._replay_batch(rows)
+                
+                if self._backoff:
+                    time.sleep(self._backoff)
+    
+    def _replay_batch(self, rows: List[tuple]):
+        """Send one batch and remove it from the journal, or record the failure"""
+        error = self._replay(rows)
+        if error is None:
+            self._backoff = 0.0
+            self._isolating = False
+            return
+        
+        sequences = [sequence for sequence, _, _ in rows]
+        self._record_failure(sequences, error)
+        self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+        
+        if len(rows) > 1:
+            # Find the entry at fault by replaying one at a time
+            self._isolating = True
+            return
+        
+        if _is_transient(error):
+            if not self._next_entry_replays(sequences[0]):
+                # The store itself is failing; wait it out without counting
+                return
+            if self._replay(rows) is None:
+                # The store came back between the two tries
+                self._backoff = 0.0
+                self._isolating = False
+                return
+        
+        with self._condition, self._connection:
+            self._connection.execute("UPDATE journal SET attempts = attempts + 1 WHERE sequence = ?", sequences)
+            if rows[0][2] + 1 >= self.max_attempts:
+                self._dead_letter(sequences[0])
+    
+    def _replay(self, rows: List[tuple]):
+        """Send rows to ``replay`` and remove them once it returns; returns the error if it raised"""
+        sequences = [sequence for sequence, _, _ in rows]
+        placeholders = ", ".join("?" * len(sequences))
+        started = time.monotonic()
+        
+        try:
+            self.replay([json.loads(payload) for _, payload, _ in rows])
+        except Exception as e:
+            return e
+        
+        with self._condition, self._connection:
+            self._connection.execute(f"DELETE FROM journal WHERE sequence IN ({placeholders})", sequences)
+            self.stats["replayed"] += len(rows)
+            self.stats["batches"] += 1
+            self.stats["last_batch_size"] = len(rows)
+            self.stats["last_replay_seconds"] = time.monotonic() - started
+        return None
+    
+    def _next_entry_replays(self, sequence: int) -> bool:
+        """Replay the entry behind ``sequence`` on its own; True if it went through"""
+        with self._condition:
+            rows = self._connection.execute(
+                "SELECT sequence, payload, attempts FROM journal WHERE sequence > ? ORDER BY sequence LIMIT 1",
+                (sequence,)
+            ).fetchall()
+        if not rows:
+            return False
+        
+        error = self._replay(rows)
+        if error is not None:
+            self._record_failure([rows[0][0]], error)
+            return False
+        return True
+    
+    def _record_failure(self, sequences: List[int], error: Exception):
+        """Note the error against entries without counting an attempt"""
+        placeholders = ", ".join("?" * len(sequences))
+        with self._condition, self._connection:
+            self._connection.execute(
+                f"UPDATE journal SET last_error = ? WHERE sequence IN ({placeholders})",
+                [str(error)] + sequences
+            )
+            self.stats["failed_batches"] += 1
+            self.stats["last_error"] = str(error)
+    
+    def _dead_letter(self, sequence: int):
+        """Move an entry from the journal to the dead-letter table; the caller holds the lock"""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO dead_letters "
+            "(sequence, submission_id, payload, created_at, attempts, last_error, failed_at) "
+            "SELECT sequence, submission_id, payload, created_at, attempts, last_error, ? FROM journal WHERE sequence = ?",
+            (datetime.now(timezone.utc).isoformat(), sequence)
+        )
+        self._connection.execute("DELETE FROM journal WHERE sequence = ?", (sequence,))
+        self.stats["dead_lettered"] += 1
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an error says the store is unavailable rather than that the entry is bad"""
+    return _status_code(error) in RETRYABLE_STATUS or isinstance(error, OSError)
+
+_journals: Dict[str, SubmissionJournal] = {}
+_journals_lock = threading.Lock()
+
+def get_submission_journal(path: str, replay: Callable[[List[Dict[str, Any]]], None],
+                           batch_size: int = 25, max_attempts: int = 5) -> SubmissionJournal:
+    """
+    Get the process-wide journal for a file, creating it on first use
+    
+    The journal replays through the most recently supplied ``replay``, so
+    a reloaded DatabaseManager takes over from the one it replaced.
+    """
+    key = os.path.abspath(path)
+    
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = SubmissionJournal(path, replay, batch_size, max_attempts=max_attempts)
+            _journals[key] = journal
+        else:
+            journal.replay = replay
+        return journal
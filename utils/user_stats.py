@@ -0,0 +1,291 @@
+"""
+Materialized per-user statistics backed by the users worksheet
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from gspread.utils import rowcol_to_a1
+
+from utils.quota import ANALYTICS, lane
+
+# Columns of the users worksheet this store owns; the rest belong to profiles
+STAT_COLUMNS = ["total_submissions", "total_likes", "badges", "streak"]
+
+class UserStatsStore:
+    """
+    Keeps each user's submission count, likes, languages, categories,
+    submission days and badges in memory, so a profile read is a single
+    dict lookup.
+    
+    Attach it to the submissions SheetSnapshot with ``add_view()``: it is
+    rebuilt on full loads, extended with new submissions and told about
+    local likes changes. Badges are read from and, with the counters,
+    written back to the users worksheet by a background worker that
+    ``schedule_persist()`` wakes, so reads never wait on the sheet.
+    """
+    
+    def __init__(self, users_worksheet):
+        self.users_worksheet = users_worksheet
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.badges: Dict[str, List[str]] = {}
+        self.dirty_users: Set[str] = set()
+        self._lock = threading.RLock()
+        self._badges_loaded = False
+        self._last_persist: Optional[float] = None
+        self._wake = threading.Event()
+        self._thread = None
+        
+        self.stats = {
+            "persists": 0,
+            "failed_persists": 0,
+            "last_users_checked": 0,
+            "last_persist_seconds": 0.0,
+            "last_error": ""
+        }
+    
+    def rebuild(self, records: List[Dict[str, Any]]):
+        """Recount every submission, marking only users whose counts changed"""
+        with self._lock:
+            previous, dirty = self.users, set(self.dirty_users)
+            self.users = {}
+            self.extend(records, 0)
+            changed = {
+                user_id for user_id in set(previous) | set(self.users)
+                if previous.get(user_id) != self.users.get(user_id)
+            }
+            self.dirty_users = dirty | changed
+    
+    def extend(self, records: List[Dict[str, Any]], start: int = 0):
+        """Count newly loaded or saved submissions"""
+        with self._lock:
+            for record in records:
+                user_id = str(record.get("user_id", ""))
+                stats = self._stats_for(user_id)
+                stats["total_submissions"] += 1
+                stats["total_likes"] += int(record.get("likes") or 0)
+                if record.get("language"):
+                    stats["languages_used"].add(record["language"])
+                if record.get("category"):
+                    stats["categories_used"].add(record["category"])
+                day = self._submission_day(record.get("timestamp", ""))
+                if day:
+                    stats["days"].add(day)
+                self.dirty_users.add(user_id)
+    
+    def update(self, position: int, record: Dict[str, Any], field: str, old_value: Any, new_value: Any):
+        """Follow a local likes change on one of the user's submissions"""
+        if field != "likes":
+            return
+        
+        with self._lock:
+            user_id = str(record.get("user_id", ""))
+            stats = self._stats_for(user_id)
+            stats["total_likes"] += int(new_value or 0) - int(old_value or 0)
+            self.dirty_users.add(user_id)
+    
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """Get a user's stats in the shape get_user_stats() returns"""
+        with self._lock:
+            self._ensure_badges()
+            stats = self.users.get(user_id)
+            if stats is None:
+                return {
+                    "total_submissions": 0,
+                    "total_likes": 0,
+                    "languages_used": [],
+                    "categories_used": [],
+                    "streak": 0,
+                    "badges": list(self.badges.get(user_id, []))
+                }
+            
+            return {
+                "total_submissions": stats["total_submissions"],
+                "total_likes": stats["total_likes"],
+                "languages_used": list(stats["languages_used"]),
+                "categories_used": list(stats["categories_used"]),
+                "streak": self._streak(stats["days"]),
+                "badges": list(self.badges.get(user_id, []))
+            }
+    
+    def add_badge(self, user_id: str, badge_key: str) -> bool:
+        """Record an awarded badge; returns False if the user already had it"""
+        with self._lock:
+            self._ensure_badges()
+            badges = self.badges.setdefault(user_id, [])
+            if badge_key in badges:
+                return False
+            badges.append(badge_key)
+            self.dirty_users.add(user_id)
+            return True
+    
+    def writes_due(self, interval: float) -> bool:
+        """Check whether some user changed and ``interval`` seconds have passed since the last write"""
+        if not self.dirty_users:
+            return False
+        return self._last_persist is None or time.monotonic() - self._last_persist >= interval
+    
+    def schedule_persist(self, interval: float, force: bool = False):
+        """Wake the background writer if writes are due, or now with ``force``"""
+        if force or self.writes_due(interval):
+            self.start()
+            self._wake.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write counts and the backlog of changed users"""
+        stats = dict(self.stats)
+        stats["dirty_users"] = len(self.dirty_users)
+        return stats
+    
+    def start(self):
+        """Start the background writer if it is not running"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="user-stats-persist", daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        """Persist whenever woken; a failed write keeps its users dirty for the next wake"""
+        with lane(ANALYTICS):
+            while True:
+                self._wake.wait()
+                self._wake.clear()
+                started = time.monotonic()
+                try:
+                    self.stats["last_users_checked"] = self.persist()
+                    self.stats["persists"] += 1
+                    self.stats["last_persist_seconds"] = time.monotonic() - started
+                    self.stats["last_error"] = ""
+                except Exception as e:
+                    self.stats["failed_persists"] += 1
+                    self.stats["last_error"] = str(e)
+    
+    def persist(self) -> int:
+        """
+        Write changed users' stat columns to the users worksheet
+        
+        Stat cells that differ from the sheet are updated in one batch_update
+        and users without a row are added with one append_rows. Returns the
+        number of users checked.
+        """
+        with self._lock:
+            self._ensure_badges()
+            user_ids, self.dirty_users = self.dirty_users, set()
+            values = {user_id: self._stat_values(user_id) for user_id in user_ids if user_id}
+        
+        try:
+            rows = self.users_worksheet.get_all_values()
+            headers = rows[0] if rows else []
+            columns = {name: position for position, name in enumerate(headers, start=1) if name}
+            stored = {
+                row[columns["user_id"] - 1]: (row_number, row)
+                for row_number, row in enumerate(rows[1:], start=2)  # Row 1 is the header
+                if len(row) >= columns["user_id"]
+            }
+            
+            updates = []
+            appends = []
+            for user_id, stat_values in values.items():
+                if user_id not in stored:
+                    row = [""] * len(headers)
+                    row[columns["user_id"] - 1] = user_id
+                    if "join_date" in columns:
+                        row[columns["join_date"] - 1] = self._join_date(user_id)
+                    for name, value in zip(STAT_COLUMNS, stat_values):
+                        row[columns[name] - 1] = value
+                    appends.append(row)
+                    continue
+                
+                row_number, row = stored[user_id]
+                for name, value in zip(STAT_COLUMNS, stat_values):
+                    column = columns[name]
+                    current = row[column - 1] if column <= len(row) else ""
+                    if current != str(value):
+                        updates.append({"range": rowcol_to_a1(row_number, column), "values": [[value]]})
+            
+            if updates:
+                self.users_worksheet.batch_update(updates, value_input_option="RAW")
+            if appends:
+                self.users_worksheet.append_rows(appends, value_input_option="RAW")
+            
+            self._last_persist = time.monotonic()
+            return len(values)
+        
+        except Exception:
+            with self._lock:
+                self.dirty_users |= user_ids
+            raise
+    
+    def _stats_for(self, user_id: str) -> Dict[str, Any]:
+        """Get or create the counters for a user"""
+        stats = self.users.get(user_id)
+        if stats is None:
+            stats = {
+                "total_submissions": 0,
+                "total_likes": 0,
+                "languages_used": set(),
+                "categories_used": set(),
+                "days": set()
+            }
+            self.users[user_id] = stats
+        return stats
+    
+    def _stat_values(self, user_id: str) -> List[Any]:
+        """Get the STAT_COLUMNS values for a user"""
+        stats = self.get(user_id)
+        return [stats["total_submissions"], stats["total_likes"], ",".join(stats["badges"]), stats["streak"]]
+    
+    def _join_date(self, user_id: str) -> str:
+        """Day of the user's first submission"""
+        days = self.users.get(user_id, {}).get("days")
+        return min(days).isoformat() if days else ""
+    
+    def _ensure_badges(self):
+        """Load stored badges from the users worksheet once"""
+        if self._badges_loaded:
+            return
+        
+        rows = self.users_worksheet.get_all_values()
+        headers = rows[0] if rows else []
+        for row in rows[1:]:
+            record = dict(zip(headers, row))
+            user_id = record.get("user_id", "")
+            badges = record.get("badges", "")
+            if user_id and badges:
+                self.badges[user_id] = [badge for badge in badges.split(",") if badge]
+        self._badges_loaded = True
+    
+    @staticmethod
+    def _submission_day(timestamp: Any) -> Optional[date]:
+        """Parse the UTC day of a submission timestamp"""
+        try:
+            return datetime.fromisoformat(str(timestamp)).date()
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _streak(days: Set[date]) -> int:
+        """Count consecutive submission days ending today"""
+        streak = 0
+        current_date = datetime.now(timezone.utc).date()
+        while current_date - timedelta(days=streak) in days:
+            streak += 1
+        return streak
+
+_stores: Dict[Tuple[str, int], UserStatsStore] = {}
+_stores_lock = threading.Lock()
+
+def get_user_stats_store(snapshot, users_worksheet) -> UserStatsStore:
+    """Get the process-wide stats store for a spreadsheet, attaching it to the submissions snapshot on first use"""
+    key = (users_worksheet.spreadsheet_id, users_worksheet.id)
+    
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = UserStatsStore(users_worksheet)
+            snapshot.add_view(store)
+            _stores[key] = store
+        return store
@@ -0,0 +1,104 @@
+"""
+Cached worksheet handles and header maps for a Google Sheets spreadsheet
+"""
+
+import threading
+from typing import Dict, List
+
+import gspread
+
+class WorksheetCache:
+    """
+    Resolves worksheet titles to handles with one metadata call and keeps
+    them, with each worksheet's header row, until invalidated.
+    
+    Handles are remembered by sheet id as well as title. After
+    ``invalidate()``, a worksheet renamed in the spreadsheet is found again
+    by id, and the existing handle object is refreshed in place so every
+    holder of it (snapshots, indexes, buffers) uses the new title.
+    """
+    
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self._handles: Dict[str, gspread.Worksheet] = {}
+        self._ids: Dict[str, int] = {}
+        self._headers: Dict[str, List[str]] = {}
+        self._stale = True
+        self._lock = threading.RLock()
+        self.stats = {"metadata_fetches": 0, "header_fetches": 0, "invalidations": 0}
+    
+    def get(self, title: str) -> gspread.Worksheet:
+        """Get a worksheet handle by the title the app knows it by"""
+        with self._lock:
+            handle = self._handles.get(title)
+            if handle is not None and not self._stale:
+                return handle
+            
+            self._load()
+            handle = self._handles.get(title)
+            if handle is None:
+                raise gspread.WorksheetNotFound(title)
+            return handle
+    
+    def headers(self, title: str) -> List[str]:
+        """Get a worksheet's header row"""
+        with self._lock:
+            headers = self._headers.get(title)
+            if headers is None or self._stale:
+                headers = self.get(title).row_values(1)
+                self.stats["header_fetches"] += 1
+                self._headers[title] = headers
+            return headers
+    
+    def columns(self, title: str) -> Dict[str, int]:
+        """Get a worksheet's header name to 1-based column map"""
+        return {name: position for position, name in enumerate(self.headers(title), start=1) if name}
+    
+    def titles(self) -> List[str]:
+        """Get the titles of every worksheet in the spreadsheet"""
+        with self._lock:
+            if self._stale:
+                self._load()
+            return list(self._handles)
+    
+    def add(self, title: str, worksheet: gspread.Worksheet):
+        """Register a worksheet this process just created"""
+        with self._lock:
+            self._handles[title] = worksheet
+            self._ids[title] = worksheet.id
+            self._headers.pop(title, None)
+    
+    def invalidate(self):
+        """Re-list worksheets and re-read headers on next use, e.g. after an API error"""
+        with self._lock:
+            self._stale = True
+            self._headers.clear()
+            self.stats["invalidations"] += 1
+    
+    def _load(self):
+        """List every worksheet in one metadata call"""
+        fresh = self.spreadsheet.worksheets()
+        self.stats["metadata_fetches"] += 1
+        by_id = {worksheet.id: worksheet for worksheet in fresh}
+        by_title = {worksheet.title: worksheet for worksheet in fresh}
+        
+        handles = {}
+        for title, worksheet in by_title.items():
+            cached = self._handles.get(title)
+            handles[title] = cached if cached is not None and cached.id == worksheet.id else worksheet
+        
+        # Follow renames: a title we used before now maps to the same sheet id
+        for title, sheet_id in self._ids.items():
+            if title not in by_title and sheet_id in by_id:
+                handles[title] = self._handles.get(title, by_id[sheet_id])
+        
+        for title, handle in handles.items():
+            current = by_id.get(handle.id)
+            if current is None:
+                continue
+            if handle is not current:
+                handle._properties = current._properties  # Keep shared handles current
+            self._ids[title] = handle.id
+        
+        self._handles = handles
+        self._stale = False